@@ -0,0 +1,69 @@
+"""Clasificador de actividad: apply por fila (original) frente a la versión vectorizada
+
+Uso: python -m benchmarks.bench_activity
+"""
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from grepolis_intel.activity import estimate_activity
+
+
+def simulate_activity_status(players_data):
+    """Implementación original con apply(axis=1) y random.random(), como referencia"""
+    players_with_status = players_data.copy()
+
+    def assign_status(row):
+        score = row['Puntos'] / 1000 + (len(players_data) - row['Ranking']) / 100
+        final_score = score + random.random() * 0.3
+        if final_score > 8:
+            return "🟢 Activo", "Últimas 4h"
+        elif final_score > 5:
+            return "🟡 Reciente", "6-12h"
+        elif final_score > 2:
+            return "🟠 Inactivo", "12-24h"
+        else:
+            return "🔴 Offline", "+24h"
+
+    status_data = players_with_status.apply(assign_status, axis=1, result_type='expand')
+    players_with_status['Estado'] = status_data[0]
+    players_with_status['Ultima_Actividad'] = status_data[1]
+    return players_with_status
+
+
+def _players(n, seed=137):
+    rng = np.random.default_rng(seed)
+    ranking = np.arange(1, n + 1)
+    return pd.DataFrame({
+        'ID': rng.permutation(n * 3)[:n] + 1,
+        'Nombre': [f"Jugador {i}" for i in range(n)],
+        'ID_Alianza': rng.integers(0, 500, n),
+        'Puntos': (2_000_000 / ranking).astype(int),
+        'Ranking': ranking,
+        'Ciudades': rng.integers(1, 60, n),
+    })
+
+
+def _best_of(func, arg, repeat):
+    mejor = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func(arg)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main():
+    for n in (10_000, 100_000):
+        players = _players(n)
+        t_apply = _best_of(simulate_activity_status, players, 1)
+        t_vector = _best_of(estimate_activity, players, 5)
+        assert estimate_activity(players)['Estado'].equals(estimate_activity(players)['Estado'])
+        print(f"{n:>7,} jugadores  apply {t_apply * 1000:9.1f} ms  vectorizado {t_vector * 1000:7.2f} ms  "
+              f"(x{t_apply / t_vector:,.0f})")
+
+
+if __name__ == '__main__':
+    main()
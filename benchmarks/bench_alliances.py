@@ -0,0 +1,65 @@
+"""Estadísticas de todas las alianzas: máscara por alianza frente a una sola pasada
+
+Uso: python -m benchmarks.bench_alliances [--players 40000] [--alliances 600]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from grepolis_intel.activity import estimate_activity
+from grepolis_intel.alliances import alliance_summary
+from grepolis_intel.metrics import add_player_metrics
+from grepolis_intel.parse import parse_alliances, parse_players
+
+from .standin import write_fixture_dumps
+
+
+def _por_alianza(players, alliances):
+    """Como la pestaña ALIANZA, repetido para cada alianza del servidor"""
+    filas = []
+    for alianza in alliances['ID_Alianza']:
+        miembros = players[players['ID_Alianza'] == alianza]
+        if miembros.empty:
+            continue
+        filas.append((
+            alianza, len(miembros), int(miembros['Puntos'].median()),
+            int(miembros['Ranking'].min()), int(miembros['Ranking'].max()),
+            int(miembros['Ciudades'].sum()),
+            miembros['Categoria_Militar'].value_counts().to_dict(),
+            miembros['Estado'].value_counts().to_dict(),
+        ))
+    return filas
+
+
+def _ms(func, repeat):
+    mejor = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=40_000)
+    parser.add_argument('--alliances', type=int, default=600)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        write_fixture_dumps(root, players=args.players, alliances=args.alliances)
+        with open(os.path.join(root, 'players.txt'), 'rb') as f:
+            players = add_player_metrics(estimate_activity(parse_players(f.read())))
+        with open(os.path.join(root, 'alliances.txt'), 'rb') as f:
+            alliances = parse_alliances(f.read())
+
+    t_bucle = _ms(lambda: _por_alianza(players, alliances), repeat=1)
+    t_pasada = _ms(lambda: alliance_summary(players, alliances), repeat=5)
+    print(f"{len(players):,} jugadores, {len(alliances):,} alianzas")
+    print(f"máscara por alianza  {t_bucle:9.1f} ms")
+    print(f"una sola pasada      {t_pasada:9.1f} ms  (x{t_bucle / t_pasada:.0f})")
+
+
+if __name__ == '__main__':
+    main()
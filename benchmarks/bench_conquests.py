@@ -0,0 +1,134 @@
+"""Conquistas de una temporada: releer conquers.txt entero frente al registro incremental
+
+Simula ``--days`` días de publicaciones horarias de conquers.txt (cada una
+con todas las conquistas de la temporada hasta ese momento) y mide la
+ingesta de cada descarga: guardar el dump completo como snapshot frente a
+añadir solo las filas nuevas al registro. Después compara las consultas de
+la app sobre la temporada completa con máscaras de pandas frente a
+``ConquestIndex``.
+
+Uso: python -m benchmarks.bench_conquests [--players 40000] [--days 90] [--per-hour 40]
+"""
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from grepolis_intel.conquests import ConquestIndex, ConquestLog
+from grepolis_intel.parse import parse_conquers
+from grepolis_intel.spatial import TownGrid
+from grepolis_intel.snapshots import SnapshotStore
+
+from .synthetic import generate_world
+
+
+def _ms(func, repeat=5):
+    mejor = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def _cuerpo(conquistas):
+    """Texto de conquers.txt para esas filas, como lo publica Grepolis"""
+    texto = pd.DataFrame(conquistas).astype(str).replace('0', '')
+    texto[0], texto[1], texto[2], texto[6] = (conquistas[:, i].astype(str) for i in (0, 1, 2, 6))
+    return texto.to_csv(header=False, index=False).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=40_000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--per-hour', type=int, default=40)
+    parser.add_argument('--sample', type=int, default=24, help="descargas medidas al final de la temporada")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(137)
+    mundo = generate_world(players=args.players, conquers=0)
+    horas = args.days * 24
+    fin = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    inicio_temporada = int((fin - timedelta(hours=horas)).timestamp())
+
+    # Toda la temporada de una vez: (ciudad, fecha, nuevo, anterior, alianza nueva, alianza anterior, puntos)
+    n = horas * args.per_hour
+    ciudades = rng.integers(0, len(mundo.town_ids), n)
+    nuevo = rng.choice(mundo.player_ids, n)
+    anterior = np.where(rng.random(n) < 0.15, 0, rng.choice(mundo.player_ids, n))
+    alianza = np.concatenate([[0], mundo.player_alliance])
+    fechas = np.sort(rng.integers(inicio_temporada, int(fin.timestamp()), n))
+    temporada = np.column_stack([
+        mundo.town_ids[ciudades], fechas, nuevo, anterior, alianza[nuevo], alianza[anterior], mundo.town_points[ciudades],
+    ])
+
+    with tempfile.TemporaryDirectory() as root:
+        registro = ConquestLog(root)
+        snapshots = SnapshotStore(root)
+        t_parseo = t_snapshot = t_registro = 0.0
+        medidas = nuevas = 0
+        for h in range(horas):
+            ts = fin - timedelta(hours=horas - 1 - h)
+            visibles = temporada[:np.searchsorted(fechas, int(ts.timestamp()), side='right')]
+            if h < horas - args.sample:
+                # La primera parte de la temporada solo se carga, sin medir
+                if len(visibles):
+                    registro.append('w', parse_conquers(_cuerpo(visibles[-args.per_hour * 2:])), ts)
+                continue
+            cuerpo = _cuerpo(visibles)
+            inicio = time.perf_counter()
+            conquistas = parse_conquers(cuerpo)
+            t_parseo += time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            snapshots.write('w', 'conquers', conquistas, ts)
+            t_snapshot += time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            nuevas += registro.append('w', conquistas, ts)
+            t_registro += time.perf_counter() - inicio
+            medidas += 1
+
+        todo = registro.read('w')
+        print(f"{args.days} días, {len(todo):,} conquistas en el registro; {medidas} descargas medidas "
+              f"con {len(visibles):,} filas y ~{nuevas // medidas} nuevas cada una")
+        print(f"parseo de conquers.txt:             {t_parseo / medidas * 1000:8.1f} ms (en los dos casos)")
+        print(f"guardar el dump como snapshot:      {t_snapshot / medidas * 1000:8.1f} ms por descarga")
+        print(f"añadir las nuevas al registro:      {t_registro / medidas * 1000:8.1f} ms por descarga")
+
+        t_leer = _ms(lambda: registro.read('w'), repeat=3)
+        t_indice = _ms(lambda: ConquestIndex(todo))
+        indice = ConquestIndex(todo)
+        print(f"leer la temporada del registro:     {t_leer:8.1f} ms")
+        print(f"ConquestIndex (una vez por versión):{t_indice:8.1f} ms")
+
+        aliada = int(np.bincount(alianza[1:]).argmax())
+        dia = int(fin.timestamp()) - 86_400
+        semana = int(fin.timestamp()) - 7 * 86_400
+        towns = pd.DataFrame({
+            'ID_Ciudad': mundo.town_ids, 'ID_Jugador': mundo.town_owner,
+            'Coord_X': mundo.town_x, 'Coord_Y': mundo.town_y,
+        })
+        grid = TownGrid(towns)
+        jugador = int(np.bincount(mundo.town_owner[mundo.town_owner != 0]).argmax())
+
+        def con_mascara_alianza():
+            return todo[((todo['ID_Alianza_Nueva'] == aliada) | (todo['ID_Alianza_Anterior'] == aliada))
+                        & (todo['Fecha'] >= dia)]
+
+        def con_mascara_cerca():
+            cerca = grid.within_player(jugador, 20)['ID_Ciudad'].to_numpy()
+            return todo[todo['ID_Ciudad'].isin(cerca) & (todo['Fecha'] >= semana)]
+
+        for nombre, antes, ahora in (
+            ("alianza, últimas 24h", con_mascara_alianza, lambda: indice.by_alliance(aliada, dia)),
+            ("20 campos de un jugador, 7 días", con_mascara_cerca, lambda: indice.near(grid, jugador, 20, semana)),
+        ):
+            t_antes, t_ahora = _ms(antes), _ms(ahora, repeat=20)
+            print(f"{nombre + ':':<33} máscara {t_antes:7.2f} ms -> índice {t_ahora:6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Dominio de océanos: merge + crosstab de pandas frente a OceanDominance (un bincount)
+
+El método con pandas cruza las ciudades con los jugadores por ``merge`` y
+suma ciudades y puntos con ``pd.crosstab``; ``OceanDominance`` hace el cruce
+con ``searchsorted`` y las dos matrices con un ``bincount`` sobre la celda
+(alianza, océano). También se mide el diff con el snapshot anterior.
+
+Uso: python -m benchmarks.bench_dominance [--players 40000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from grepolis_intel.parse import parse_players, parse_towns
+from grepolis_intel.spatial import OceanDominance, ocean_of
+
+from .synthetic import evolve, generate_world, write_world
+
+
+def _con_crosstab(towns, players):
+    cruce = towns.merge(players[['ID', 'ID_Alianza']], left_on='ID_Jugador', right_on='ID', how='left')
+    cruce = cruce[cruce['ID_Alianza'].fillna(0) != 0]
+    oceano = ocean_of(cruce['Coord_X'], cruce['Coord_Y'])
+    ciudades = pd.crosstab(cruce['ID_Alianza'], oceano)
+    puntos = pd.crosstab(cruce['ID_Alianza'], oceano, values=cruce['Puntos_Ciudad'], aggfunc='sum').fillna(0)
+    return ciudades, puntos
+
+
+def _ms(func, repeat=5):
+    mejor = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def _leer(root, mundo):
+    write_world(root, mundo, compress=False)
+    with open(os.path.join(root, 'towns.txt'), 'rb') as f:
+        towns = parse_towns(f.read())
+    with open(os.path.join(root, 'players.txt'), 'rb') as f:
+        players = parse_players(f.read())
+    return towns, players
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=40_000)
+    args = parser.parse_args()
+
+    antes = generate_world(players=args.players, seed=137)
+    with tempfile.TemporaryDirectory() as root:
+        towns_antes, players_antes = _leer(os.path.join(root, 'antes'), antes)
+        towns, players = _leer(os.path.join(root, 'despues'), evolve(antes, hours=24, seed=137))
+
+    ciudades, puntos = _con_crosstab(towns, players)
+    dominio = OceanDominance(towns, players)
+    ids = ciudades.index.to_numpy(dtype=np.int64)
+    oceanos = ciudades.columns.to_numpy()
+    assert np.array_equal(dominio.matrix(ids, 'towns')[:, oceanos], ciudades.to_numpy())
+    assert np.array_equal(dominio.matrix(ids, 'points')[:, oceanos], puntos.to_numpy(dtype=np.int64))
+
+    anterior = OceanDominance(towns_antes, players_antes)
+    t_crosstab = _ms(lambda: _con_crosstab(towns, players))
+    t_bincount = _ms(lambda: OceanDominance(towns, players))
+    t_cambios = _ms(lambda: dominio.changes(anterior))
+    cambios = dominio.changes(anterior)
+    print(f"{len(towns):,} ciudades, {len(dominio.alliances):,} alianzas x {int((dominio.ocean_towns > 0).sum())} océanos")
+    print(f"merge + crosstab (ciudades y puntos) {t_crosstab:8.2f} ms")
+    print(f"OceanDominance (un bincount)         {t_bincount:8.2f} ms  (x{t_crosstab / t_bincount:.1f})")
+    print(f"cambios frente al snapshot anterior  {t_cambios:8.2f} ms  ({len(cambios):,} celdas con ciudades ganadas o perdidas)")
+
+
+if __name__ == '__main__':
+    main()
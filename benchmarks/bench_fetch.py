@@ -0,0 +1,52 @@
+"""Latencia de descarga en frío y en caliente contra el servidor local de prueba
+
+Uso: python -m benchmarks.bench_fetch [--latency 0.2]
+"""
+import argparse
+import tempfile
+import time
+
+from grepolis_intel.fetch import DUMPS, WorldFetcher
+
+from .standin import serve_directory, write_fixture_dumps
+
+
+def _secuencial(fetcher):
+    return {name: fetcher.fetch(name) for name in DUMPS}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=0.2, help="latencia simulada por petición (s)")
+    parser.add_argument('--players', type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        write_fixture_dumps(root, players=args.players)
+        server, base_url = serve_directory(root, latency=args.latency)
+        try:
+            casos = [
+                ('secuencial, sin gzip', lambda f: _secuencial(f), False),
+                ('paralelo, sin gzip', lambda f: f.fetch_all(), False),
+                ('paralelo, gzip', lambda f: f.fetch_all(), True),
+            ]
+            for etiqueta, ejecutar, gzip in casos:
+                fetcher = WorldFetcher(base_url=base_url, prefer_gzip=gzip)
+                inicio = time.perf_counter()
+                frio = ejecutar(fetcher)
+                t_frio = time.perf_counter() - inicio
+                inicio = time.perf_counter()
+                caliente = ejecutar(fetcher)
+                t_caliente = time.perf_counter() - inicio
+                fetcher.close()
+
+                estados = ','.join(str(r.status) for r in caliente.values())
+                tamano = sum(len(r.body) for r in frio.values())
+                print(f"{etiqueta:<22} frío {t_frio * 1000:8.1f} ms  caliente {t_caliente * 1000:8.1f} ms  "
+                      f"({tamano / 1e6:.1f} MB, caliente={estados})")
+        finally:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
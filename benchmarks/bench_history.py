@@ -0,0 +1,76 @@
+"""Historial de una temporada: almacenamiento por niveles frente a releer cada snapshot
+
+Simula ``--days`` días de publicaciones horarias de ``--players`` jugadores,
+los pasa al historial (con la compactación que haría la app cada hora) y
+mide las consultas de los gráficos: la temporada entera de todos los
+jugadores, la de uno solo, y los ritmos de 7 días de todos.
+
+Uso: python -m benchmarks.bench_history [--players 10000] [--days 120]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from grepolis_intel.history import GROWTH_WINDOWS, HistoryStore, entity_series, growth_rates
+
+
+def _tamano(ruta):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(ruta) for f in fs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=10_000)
+    parser.add_argument('--days', type=int, default=120)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(137)
+    ids = np.arange(1, args.players + 1, dtype=np.int32)
+    puntos = rng.lognormal(8, 1.2, args.players).astype(np.int64)
+    ritmo = rng.exponential(20, args.players) * (rng.random(args.players) < 0.6)
+    alianza = rng.integers(0, 300, args.players).astype(np.int32)
+    fin = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    horas = args.days * 24
+
+    with tempfile.TemporaryDirectory() as root:
+        historial = HistoryStore(root)
+        inicio = time.perf_counter()
+        for h in range(horas):
+            ts = fin - timedelta(hours=horas - 1 - h)
+            puntos = puntos + rng.poisson(ritmo)
+            ranking = np.empty(args.players, dtype=np.int32)
+            ranking[np.argsort(-puntos, kind='stable')] = np.arange(1, args.players + 1)
+            historial.append('w', 'players', pd.DataFrame({
+                'ID': ids, 'Puntos': puntos.astype(np.int32), 'Ranking': ranking,
+                'Ciudades': np.maximum(puntos // 8000, 1).astype(np.int16), 'ID_Alianza': alianza,
+            }), ts)
+            historial.compact('w', 'players', now=ts)
+        ingesta = time.perf_counter() - inicio
+
+        filas_crudas = horas * args.players
+        todo = historial.read('w', 'players')
+        print(f"{args.players:,} jugadores, {args.days} días: {filas_crudas:,} filas en snapshots horarios -> "
+              f"{len(todo):,} en el historial ({_tamano(root) / 1e6:.1f} MB)")
+        print(f"añadir + compactar cada hora:     {ingesta / horas * 1000:8.1f} ms por snapshot")
+
+        for nombre, func in (
+            ("temporada de todos", lambda: historial.read('w', 'players')),
+            ("temporada de un jugador", lambda: entity_series(historial, 'w', 'players', args.players // 2)),
+            ("ritmo 7d de todos", lambda: growth_rates(
+                historial.read('w', 'players', start=fin - GROWTH_WINDOWS['7d'] - timedelta(hours=1)), 'players')),
+        ):
+            mejor = float('inf')
+            for _ in range(3):
+                inicio = time.perf_counter()
+                func()
+                mejor = min(mejor, time.perf_counter() - inicio)
+            print(f"{nombre + ':':<33} {mejor * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Tiempo de arranque en frío: importar el núcleo frente a Streamlit y Plotly
+
+Cada medida es un intérprete nuevo (mejor de --repeat). También comprueba
+que el núcleo completo no arrastra streamlit ni plotly.
+
+Uso: python -m benchmarks.bench_import [--repeat 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASOS = [
+    ("intérprete vacío", ['-c', 'pass']),
+    ("import grepolis_intel", ['-c', 'import grepolis_intel']),
+    ("python -m grepolis_intel --help", ['-m', 'grepolis_intel', '--help']),
+    ("núcleo completo (load_world)", ['-c', 'from grepolis_intel import load_world']),
+    ("import streamlit", ['-c', 'import streamlit']),
+    ("import plotly.express", ['-c', 'import plotly.express']),
+]
+
+SIN_UI = (
+    "import sys; from grepolis_intel import load_world, refresh_world, RefreshScheduler; "
+    "print(','.join(m for m in ('streamlit', 'plotly') if m in sys.modules))"
+)
+
+
+def _mejor(argumentos, repeat):
+    mejor = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, *argumentos], cwd=RAIZ, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for etiqueta, argumentos in CASOS:
+        print(f"{etiqueta:<34} {_mejor(argumentos, args.repeat):8.1f} ms")
+
+    cargados = subprocess.run([sys.executable, '-c', SIN_UI], cwd=RAIZ, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    print(f"módulos de UI cargados por el núcleo: {cargados or 'ninguno'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Búsquedas de cada rerun: máscaras booleanas sobre el DataFrame frente al índice por snapshot
+
+Uso: python -m benchmarks.bench_indexes [--players 40000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from grepolis_intel.activity import estimate_activity
+from grepolis_intel.indexes import PlayerIndex
+from grepolis_intel.parse import parse_alliances, parse_players
+
+from .standin import write_fixture_dumps
+
+
+def _con_mascaras(players, alliances, nombre, alianza):
+    yo = players[players['Nombre'] == nombre].iloc[0]
+    miembros = players[players['ID_Alianza'] == alianza]
+    mi_alianza = alliances[alliances['ID_Alianza'] == alianza].iloc[0]
+    cercanas = alliances[
+        (alliances['Ranking_Alianza'] >= mi_alianza['Ranking_Alianza'] - 3) &
+        (alliances['Ranking_Alianza'] <= mi_alianza['Ranking_Alianza'] + 3)
+    ]
+    competencia = players[
+        (players['Ranking'] >= yo['Ranking'] - 10) &
+        (players['Ranking'] <= yo['Ranking'] + 10) &
+        (players['Nombre'] != yo['Nombre'])
+    ].head(10)
+    activos = len(players[players['Estado'] == '🟢 Activo'])
+    return yo, miembros, cercanas, competencia, activos
+
+
+def _con_indice(players, alliances, indice, nombre, alianza):
+    fila = indice.row_by_name(nombre)
+    yo = players.iloc[fila]
+    miembros = players.iloc[indice.alliance_rows(alianza)]
+    mi_alianza = alliances.iloc[indice.alliance_row(alianza)]
+    ranking = mi_alianza['Ranking_Alianza']
+    cercanas = alliances.iloc[indice.alliance_rank_window(ranking - 3, ranking + 3)]
+    filas = indice.rank_window(yo['Ranking'] - 10, yo['Ranking'] + 10)
+    competencia = players.iloc[filas[filas != fila][:10]]
+    activos = indice.status_counts.get('🟢 Activo', 0)
+    return yo, miembros, cercanas, competencia, activos
+
+
+def _ms(func, repeat=50):
+    mejor = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=40_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        write_fixture_dumps(root, players=args.players)
+        with open(os.path.join(root, 'players.txt'), 'rb') as f:
+            players = estimate_activity(parse_players(f.read()))
+        with open(os.path.join(root, 'alliances.txt'), 'rb') as f:
+            alliances = parse_alliances(f.read())
+
+    nombre = players['Nombre'].iloc[len(players) // 2]
+    alianza = int(alliances['ID_Alianza'].iloc[len(alliances) // 2])
+
+    inicio = time.perf_counter()
+    indice = PlayerIndex(players, alliances)
+    t_build = (time.perf_counter() - inicio) * 1000
+
+    t_mascaras = _ms(lambda: _con_mascaras(players, alliances, nombre, alianza))
+    t_indice = _ms(lambda: _con_indice(players, alliances, indice, nombre, alianza))
+    print(f"{len(players):,} jugadores, {len(alliances):,} alianzas")
+    print(f"construir índice (una vez por snapshot) {t_build:7.2f} ms")
+    print(f"búsquedas por rerun con máscaras        {t_mascaras:7.2f} ms")
+    print(f"búsquedas por rerun con índice          {t_indice:7.2f} ms  (x{t_mascaras / t_indice:.0f})")
+
+
+if __name__ == '__main__':
+    main()
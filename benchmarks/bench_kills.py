@@ -0,0 +1,80 @@
+"""Puntos de combate de todos los jugadores: merge de pandas por dump frente a searchsorted
+
+El cruce con ``merge`` (uno por dump, más el del snapshot anterior para
+lo ganado) es lo que haría la tabla de jugadores en cada rerun;
+``add_kill_points`` lo hace con un ``searchsorted`` sobre los dumps ya
+ordenados por ID, una vez por snapshot.
+
+Uso: python -m benchmarks.bench_kills [--players 40000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from grepolis_intel.fetch import DUMPS
+from grepolis_intel.kills import DELTA_PREFIX, KILL_COLUMNS, add_kill_points
+from grepolis_intel.parse import PARSERS
+
+from .synthetic import evolve, generate_world, write_world
+
+
+def _con_merge(players, kills, previous):
+    resultado = players
+    for dump, columna in KILL_COLUMNS.items():
+        actual = kills[dump][['ID', 'Puntos_Combate']].rename(columns={'Puntos_Combate': columna})
+        anterior = previous[dump][['ID', 'Puntos_Combate']].rename(columns={'Puntos_Combate': 'anterior'})
+        resultado = resultado.merge(actual, on='ID', how='left').merge(anterior, on='ID', how='left')
+        resultado[columna] = resultado[columna].fillna(0).astype(np.int64)
+        resultado[DELTA_PREFIX + columna] = (resultado[columna] - resultado['anterior'].fillna(0)).clip(lower=0).astype(np.int64)
+        resultado = resultado.drop(columns='anterior')
+    return resultado
+
+
+def _ms(func, repeat=5):
+    mejor = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def _leer(root, mundo):
+    write_world(root, mundo, compress=False)
+    datos = {}
+    for name in ('players', *KILL_COLUMNS):
+        with open(os.path.join(root, DUMPS[name]), 'rb') as f:
+            datos[name] = PARSERS[name](f.read())
+    return datos
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=40_000)
+    args = parser.parse_args()
+
+    antes = generate_world(players=args.players, seed=137)
+    with tempfile.TemporaryDirectory() as root:
+        previous = _leer(os.path.join(root, 'antes'), antes)
+        actual = _leer(os.path.join(root, 'despues'), evolve(antes, seed=137))
+    players = actual.pop('players')
+    previous.pop('players')
+
+    con_merge = _con_merge(players, actual, previous)
+    directo = add_kill_points(players, actual, previous)
+    for columna in (*KILL_COLUMNS.values(), *(DELTA_PREFIX + c for c in KILL_COLUMNS.values())):
+        assert np.array_equal(con_merge[columna].to_numpy(), directo[columna].to_numpy()), columna
+
+    t_merge = _ms(lambda: _con_merge(players, actual, previous))
+    t_directo = _ms(lambda: add_kill_points(players, actual, previous))
+    combatiendo = int((directo[DELTA_PREFIX + 'Puntos_Combate'] > 0).sum())
+    print(f"{len(players):,} jugadores; {len(actual['kills_all']):,} en el dump de combate, {combatiendo:,} combatiendo")
+    print(f"merge por dump y snapshot          {t_merge:8.2f} ms")
+    print(f"searchsorted (add_kill_points)     {t_directo:8.2f} ms  (x{t_merge / t_directo:.1f})")
+
+
+if __name__ == '__main__':
+    main()
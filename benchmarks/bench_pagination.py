@@ -0,0 +1,83 @@
+"""Listas del servidor: filtrar + ``sort_values`` en cada rerun frente a páginas precalculadas
+
+El método anterior filtraba por estado, ordenaba una copia de la tabla
+entera y cortaba con ``head``; para llegar a la página N había que ordenar
+igual. Con ``SortedPages`` el orden se calcula una vez por snapshot y cada
+página es un slice, así que la página 500 cuesta lo mismo que la 1.
+
+Uso: python -m benchmarks.bench_pagination [--players 40000] [--page-size 50]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from grepolis_intel.activity import ActivityTracker
+from grepolis_intel.indexes import PlayerIndex
+from grepolis_intel.metrics import add_player_metrics
+from grepolis_intel.parse import parse_players, parse_towns
+from grepolis_intel.tables import PLAYER_PAGE_COLUMNS, player_pages, town_page, town_pages
+from grepolis_intel.targets import owner_column
+
+from .synthetic import generate_world, write_world
+
+
+def _ms(func, repeat=5):
+    mejor = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def _jugadores_con_sort(players, pagina, tamano):
+    filtrados = players[players['Estado'] == '🟢 Activo']
+    ordenados = filtrados.sort_values('Puntos', ascending=False)
+    return ordenados.iloc[pagina * tamano:(pagina + 1) * tamano][PLAYER_PAGE_COLUMNS]
+
+
+def _ciudades_con_sort(towns, players, pagina, tamano):
+    ciudades = towns.assign(Jugador=owner_column(towns, players, 'Nombre', None))
+    ordenadas = ciudades.sort_values('Puntos_Ciudad', ascending=False)
+    return ordenadas.iloc[pagina * tamano:(pagina + 1) * tamano]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=40_000)
+    parser.add_argument('--page-size', type=int, default=50)
+    args = parser.parse_args()
+    tamano = args.page_size
+
+    with tempfile.TemporaryDirectory() as root:
+        write_world(root, generate_world(players=args.players), compress=False)
+        with open(os.path.join(root, 'players.txt'), 'rb') as f:
+            players = add_player_metrics(ActivityTracker().classify(parse_players(f.read())))
+        with open(os.path.join(root, 'towns.txt'), 'rb') as f:
+            towns = parse_towns(f.read())
+
+    indice = PlayerIndex(players)
+    t_jugadores = _ms(lambda: player_pages(players))
+    t_ciudades = _ms(lambda: town_pages(towns, players), repeat=3)
+    paginas = player_pages(players)
+    paginas_ciudades = town_pages(towns, players)
+    ultima = paginas_ciudades.page_count('Puntos', tamano) - 1
+
+    print(f"{len(players):,} jugadores, {len(towns):,} ciudades; páginas de {tamano}")
+    print(f"órdenes de jugadores (una vez por snapshot)  {t_jugadores:8.2f} ms")
+    print(f"órdenes de ciudades (una vez por snapshot)   {t_ciudades:8.2f} ms")
+    ultima_activos = paginas.page_count('Puntos', tamano, '🟢 Activo') - 1
+    for pagina in (0, 499, ultima):
+        if pagina > ultima:
+            continue
+        antes = _ms(lambda: _ciudades_con_sort(towns, players, pagina, tamano))
+        ahora = _ms(lambda: town_page(towns, players, indice, paginas_ciudades.page('Puntos', pagina, tamano)), repeat=50)
+        print(f"ciudades por puntos, página {pagina + 1:>5}:       {antes:8.2f} -> {ahora:5.2f} ms")
+    for pagina in (0, ultima_activos):
+        antes = _ms(lambda: _jugadores_con_sort(players, pagina, tamano))
+        ahora = _ms(lambda: players.iloc[paginas.page('Puntos', pagina, tamano, '🟢 Activo')][PLAYER_PAGE_COLUMNS], repeat=50)
+        print(f"jugadores activos por puntos, página {pagina + 1:>4}: {antes:8.2f} -> {ahora:5.2f} ms")
+
+if __name__ == '__main__':
+    main()
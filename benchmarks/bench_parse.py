@@ -0,0 +1,49 @@
+"""Memoria y tiempo de parseo de towns.txt: read_csv original frente al parser tipado
+
+Uso: python -m benchmarks.bench_parse [--players 40000]
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from grepolis_intel.parse import TOWNS_SCHEMA, parse_towns
+
+from .standin import write_fixture_dumps
+
+
+def _read_csv_original(body):
+    """Como lo hacía la app: texto completo en un str y tipos inferidos"""
+    return pd.read_csv(io.StringIO(body.decode()), sep=',', names=list(TOWNS_SCHEMA))
+
+
+def _medir(func, body):
+    inicio = time.perf_counter()
+    df = func(body)
+    return df, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=40_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        write_fixture_dumps(root, players=args.players)
+        with open(os.path.join(root, 'towns.txt'), 'rb') as f:
+            body = f.read()
+
+    filas = body.count(b'\n')
+    print(f"towns.txt: {len(body) / 1e6:.1f} MB, {filas:,} ciudades")
+    for etiqueta, func in (('read_csv original', _read_csv_original), ('parser tipado', parse_towns)):
+        df, segundos = _medir(func, body)
+        memoria = df.memory_usage(deep=True).sum()
+        tipos = ', '.join(f"{c}={t}" for c, t in df.dtypes.items())
+        print(f"{etiqueta:<18} {memoria / 1e6:7.1f} MB  {segundos * 1000:7.1f} ms  [{tipos}]")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Objetivos de ranking de toda una alianza: un jugador por rerun con iloc frente a RankGaps
+
+El método anterior calculaba los saltos de un solo jugador con
+``players.iloc[ranking - salto - 1]``; aquí se repite para cada miembro,
+que es lo que pide la tabla de "más cerca de subir".
+
+Uso: python -m benchmarks.bench_rank_gaps [--players 40000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from grepolis_intel.indexes import RANK_JUMPS, PlayerIndex, RankGaps
+from grepolis_intel.parse import parse_alliances, parse_players
+from grepolis_intel.tables import closest_to_climb
+
+from .standin import write_fixture_dumps
+
+
+def _con_iloc(players, filas):
+    necesarios = []
+    for fila in filas:
+        yo = players.iloc[fila]
+        for salto in RANK_JUMPS:
+            posicion = int(yo['Ranking']) - salto - 1
+            if posicion >= 0:
+                necesarios.append(int(players.iloc[posicion]['Puntos'] - yo['Puntos']))
+    return necesarios
+
+
+def _ms(func, repeat=5):
+    mejor = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=40_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        write_fixture_dumps(root, players=args.players)
+        with open(os.path.join(root, 'players.txt'), 'rb') as f:
+            players = parse_players(f.read())
+        with open(os.path.join(root, 'alliances.txt'), 'rb') as f:
+            alliances = parse_alliances(f.read())
+
+    indice = PlayerIndex(players, alliances)
+    alianza = int(alliances['ID_Alianza'].iloc[0])
+    filas = indice.alliance_rows(alianza)
+
+    t_build = _ms(lambda: RankGaps(players))
+    saltos = RankGaps(players)
+    t_iloc = _ms(lambda: _con_iloc(players, filas))
+    t_tabla = _ms(lambda: closest_to_climb(players, saltos, filas, RANK_JUMPS[0]), repeat=50)
+    print(f"{len(players):,} jugadores; alianza con {len(filas)} miembros")
+    print(f"iloc por miembro y salto            {t_iloc:8.2f} ms")
+    print(f"RankGaps (una vez por snapshot)     {t_build:8.2f} ms  para todos los jugadores")
+    print(f"tabla 'más cerca de subir'          {t_tabla:8.2f} ms  por rerun (x{t_iloc / t_tabla:.0f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Figuras y tablas de un rerun sin cambios: construirlas de nuevo frente a sacarlas de RenderCache
+
+Se mide lo que la app repetía en cada rerun con el mismo snapshot y los
+mismos widgets: el histograma de puntos de la alianza (``px.histogram``)
+y la tabla de miembros, construida y convertida a Arrow para
+``st.dataframe``.
+
+Uso: python -m benchmarks.bench_render [--players 40000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import plotly.express as px
+
+from grepolis_intel.activity import ActivityTracker
+from grepolis_intel.indexes import PlayerIndex
+from grepolis_intel.kills import add_kill_points
+from grepolis_intel.metrics import add_player_metrics
+from grepolis_intel.parse import parse_alliances, parse_players
+from grepolis_intel.perf import PerfRecorder
+from grepolis_intel.render import RenderCache, table_payload
+from grepolis_intel.tables import alliance_roster
+
+from .standin import write_fixture_dumps
+
+
+def _ms(func, repeat=5):
+    mejor = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=40_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        write_fixture_dumps(root, players=args.players)
+        with open(os.path.join(root, 'players.txt'), 'rb') as f:
+            players = add_player_metrics(add_kill_points(ActivityTracker().classify(parse_players(f.read())), {}))
+        with open(os.path.join(root, 'alliances.txt'), 'rb') as f:
+            alliances = parse_alliances(f.read())
+
+    indice = PlayerIndex(players, alliances)
+    alianza = int(alliances['ID_Alianza'].iloc[0])
+    miembros = players.iloc[indice.alliance_rows(alianza)]
+
+    def figura():
+        return px.histogram(miembros, x='Puntos', nbins=15, color_discrete_sequence=['#667eea'])
+
+    def tabla():
+        return table_payload(alliance_roster(players, indice, alianza))
+
+    cache = RenderCache(recorder=PerfRecorder())
+    cache.figure('distribucion', figura)
+    cache.table('roster', lambda: alliance_roster(players, indice, alianza))
+
+    t_figura = _ms(figura)
+    t_tabla = _ms(tabla)
+    t_figura_cache = _ms(lambda: cache.figure('distribucion', figura), repeat=50)
+    t_tabla_cache = _ms(lambda: cache.table('roster', tabla), repeat=50)
+    estado = cache.stats()
+    print(f"{len(players):,} jugadores; alianza con {len(miembros)} miembros")
+    print(f"histograma construido               {t_figura:8.3f} ms")
+    print(f"histograma desde la caché           {t_figura_cache:8.3f} ms  (x{t_figura / t_figura_cache:.0f})")
+    print(f"tabla de miembros + Arrow           {t_tabla:8.3f} ms")
+    print(f"tabla de miembros desde la caché    {t_tabla_cache:8.3f} ms  (x{t_tabla / t_tabla_cache:.0f})")
+    print(f"caché: {estado['entries']} entradas, {estado['bytes'] / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
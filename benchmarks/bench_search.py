@@ -0,0 +1,60 @@
+"""Búsqueda de nombres a 100k: str.contains/startswith sobre la columna frente al índice
+
+Uso: python -m benchmarks.bench_search [--names 100000]
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from grepolis_intel.search import NameSearchIndex
+
+SILABAS = ['ka', 'lo', 'mi', 'tor', 'zeus', 'ares', 'dra', 'gon', 'ne', 'ón', 'ía', 'x', 'pe', 'ro', 'Ñu', 'hades', 'spar', 'ta']
+
+
+def _nombres(n, seed=137):
+    rnd = random.Random(seed)
+    return [
+        ''.join(rnd.choice(SILABAS) for _ in range(rnd.randint(2, 5))).capitalize()
+        + (str(rnd.randint(0, 99)) if rnd.random() < 0.3 else '')
+        for _ in range(n)
+    ]
+
+
+def _ms(func, repeat=50):
+    mejor = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--names', type=int, default=100_000)
+    args = parser.parse_args()
+
+    nombres = pd.Series(_nombres(args.names), dtype="string[pyarrow]")
+    inicio = time.perf_counter()
+    indice = NameSearchIndex(nombres, priority=np.arange(len(nombres)))
+    print(f"{len(nombres):,} nombres; construir índice {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    casos = [
+        ('Contiene', 'zeus', lambda q: nombres[nombres.str.contains(q, case=False, na=False)]),
+        ('Contiene', 'ka', lambda q: nombres[nombres.str.contains(q, case=False, na=False)]),
+        ('Empieza con', 'Zeusdra', lambda q: nombres[nombres.str.startswith(q, na=False)]),
+        ('Exacto', 'Zeusdra', lambda q: nombres[nombres == q]),
+        ('Aproximado', 'Zeusdar', None),
+    ]
+    for modo, consulta, columna in casos:
+        t_indice = _ms(lambda: indice.search(consulta, modo, limit=20))
+        t_columna = f"{_ms(lambda: columna(consulta), repeat=10):7.2f} ms" if columna else "      -   "
+        print(f"{modo:<12} {consulta!r:<10} columna {t_columna}  índice {t_indice:6.3f} ms  "
+              f"({len(indice.search(consulta, modo))} resultados)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Memoria (RSS) por sesión concurrente de la app con 1, 10 y 50 usuarios
+
+Cada usuario es un ``AppTest`` vivo que ha recorrido las tres pestañas.
+Todas las sesiones comparten proceso y cachés, como en un servidor real.
+
+Uso: python -m benchmarks.bench_sessions [--players 40000] [--users 1 10 50]
+"""
+import argparse
+import gc
+import os
+import tempfile
+
+from .standin import serve_directory, write_fixture_dumps
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'grepolis_app.py')
+TABS = ["🌍 SERVIDOR", "🛡️ ALIANZA", "👤 JUGADOR"]
+
+
+def _rss_mb():
+    """RSS actual del proceso en MB (Linux: /proc; si no, el pico de getrusage)"""
+    try:
+        with open('/proc/self/status') as f:
+            for linea in f:
+                if linea.startswith('VmRSS:'):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _sesion():
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=300)
+    at.run()
+    for tab in TABS[1:]:
+        at.sidebar.radio[0].set_value(tab).run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return at
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=40_000)
+    parser.add_argument('--users', type=int, nargs='+', default=[1, 10, 50])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as snapshots:
+        write_fixture_dumps(root, players=args.players)
+        server, url = serve_directory(root)
+        os.environ["GREPOLIS_DATA_URL"] = url
+        os.environ["GREPOLIS_SNAPSHOT_DIR"] = snapshots
+        try:
+            # Primera sesión aparte: llena las cachés compartidas por snapshot
+            sesiones = [_sesion()]
+            gc.collect()
+            base = _rss_mb()
+            print(f"{args.players:,} jugadores; RSS tras la primera sesión: {base:.0f} MB")
+
+            for usuarios in sorted(args.users):
+                while len(sesiones) < usuarios:
+                    sesiones.append(_sesion())
+                gc.collect()
+                rss = _rss_mb()
+                extra = (rss - base) / max(usuarios - 1, 1)
+                print(f"{usuarios:>3} usuarios  RSS {rss:7.0f} MB  (+{extra:6.2f} MB por sesión adicional)")
+        finally:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
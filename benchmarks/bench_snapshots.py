@@ -0,0 +1,41 @@
+"""Arranque en frío desde el snapshot local frente a descargar y parsear
+
+Uso: python -m benchmarks.bench_snapshots [--players 10000]
+"""
+import argparse
+import tempfile
+import time
+
+from grepolis_intel.fetch import DUMPS, WorldFetcher
+from grepolis_intel.ingest import LOGS, refresh_world
+from grepolis_intel.snapshots import SnapshotStore
+
+from .standin import serve_directory, write_fixture_dumps
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=10_000)
+    parser.add_argument('--latency', type=float, default=0.2, help="latencia simulada por petición (s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dumps, tempfile.TemporaryDirectory() as snapshots:
+        write_fixture_dumps(dumps, players=args.players)
+        server, base_url = serve_directory(dumps, latency=args.latency)
+        store = SnapshotStore(snapshots)
+        try:
+            fetcher = WorldFetcher(base_url=base_url)
+            inicio = time.perf_counter()
+            refresh_world(fetcher, store)
+            print(f"descarga + parseo + escritura: {(time.perf_counter() - inicio) * 1000:8.1f} ms")
+
+            inicio = time.perf_counter()
+            frames = {name: SnapshotStore(snapshots).read(fetcher.world, name) for name in DUMPS if name not in LOGS}
+            filas = sum(len(df) for df in frames.values())
+            print(f"lectura del último snapshot:   {(time.perf_counter() - inicio) * 1000:8.1f} ms ({filas:,} filas)")
+        finally:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Consultas espaciales sobre un mundo de tamaño completo
+
+Uso: python -m benchmarks.bench_spatial [--players 40000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from grepolis_intel.parse import parse_players, parse_towns
+from grepolis_intel.spatial import TownGrid, ocean_summary
+
+from .standin import write_fixture_dumps
+
+
+def _ms(func, repeat=20):
+    mejor = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        resultado = func()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=40_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        write_fixture_dumps(root, players=args.players)
+        with open(os.path.join(root, 'towns.txt'), 'rb') as f:
+            towns = parse_towns(f.read())
+        with open(os.path.join(root, 'players.txt'), 'rb') as f:
+            players = parse_players(f.read())
+
+    print(f"{len(towns):,} ciudades, {len(players):,} jugadores")
+    ms, grid = _ms(lambda: TownGrid(towns), repeat=3)
+    print(f"construir rejilla              {ms:8.2f} ms")
+
+    for radio in (10, 30):
+        ms, r = _ms(lambda: grid.within(500, 500, radio))
+        print(f"radio {radio:>2} desde un punto        {ms:8.2f} ms ({len(r):,} ciudades)")
+
+    jugador = int(players['ID'].iloc[0])
+    ms, r = _ms(lambda: grid.within_player(jugador, 20))
+    print(f"radio 20 desde un jugador      {ms:8.2f} ms ({len(r):,} ciudades)")
+
+    rng = np.random.default_rng(1)
+    cx, cy = rng.integers(0, 1000, 1000), rng.integers(0, 1000, 1000)
+    ms, r = _ms(lambda: grid.query_radius(cx, cy, 15), repeat=5)
+    print(f"radio 15 desde 1000 centros    {ms:8.2f} ms ({len(r[0]):,} pares)")
+
+    ms, r = _ms(lambda: ocean_summary(towns, players), repeat=5)
+    print(f"resumen por océano             {ms:8.2f} ms ({len(r)} océanos)")
+
+
+if __name__ == '__main__':
+    main()
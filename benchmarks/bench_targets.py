@@ -0,0 +1,49 @@
+"""Objetivos más cercanos para todos los miembros de una alianza en una sola consulta
+
+Uso: python -m benchmarks.bench_targets [--players 40000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from grepolis_intel.activity import estimate_activity
+from grepolis_intel.parse import parse_players, parse_towns
+from grepolis_intel.spatial import TownGrid
+from grepolis_intel.targets import candidate_mask, find_targets
+
+from .standin import write_fixture_dumps
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=40_000)
+    parser.add_argument('-k', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        write_fixture_dumps(root, players=args.players)
+        with open(os.path.join(root, 'towns.txt'), 'rb') as f:
+            towns = parse_towns(f.read())
+        with open(os.path.join(root, 'players.txt'), 'rb') as f:
+            players = estimate_activity(parse_players(f.read()))
+
+    grid = TownGrid(towns)
+    alianza = int(players.loc[players['ID_Alianza'] != 0, 'ID_Alianza'].value_counts().index[0])
+    miembros = players.loc[players['ID_Alianza'] == alianza, 'ID'].to_numpy()
+    print(f"{len(towns):,} ciudades; alianza {alianza} con {len(miembros)} miembros")
+
+    for modo in ("Inactivas", "Puntos", "Alianza"):
+        mascara = candidate_mask(towns, players, modo, alliance_id=alianza + 1, max_points=2000, exclude_alliance=alianza)
+        inicio = time.perf_counter()
+        solo = find_targets(grid, players, miembros[:1], mascara, k=args.k)
+        t_uno = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        todos = find_targets(grid, players, miembros, mascara, k=args.k)
+        t_todos = time.perf_counter() - inicio
+        print(f"{modo:<10} {int(mascara.sum()):>7,} candidatas  1 jugador {t_uno * 1000:6.1f} ms ({len(solo)})  "
+              f"toda la alianza {t_todos * 1000:6.1f} ms ({len(todos):,})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Mapa del mundo: todas las ciudades como puntos frente a rasters precalculados
+
+Mide lo que cuesta en cada rerun serializar la figura (lo que viaja al
+navegador) con las tres estrategias: un scatter con todas las ciudades, el
+raster de densidad del mundo y los puntos WebGL de la ventana de un océano.
+
+Uso: python -m benchmarks.bench_worldmap [--players 40000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import plotly.express as px
+import plotly.graph_objects as go
+
+from grepolis_intel.activity import ActivityTracker
+from grepolis_intel.indexes import PlayerIndex
+from grepolis_intel.parse import parse_players, parse_towns
+from grepolis_intel.spatial import TownGrid
+from grepolis_intel.tables import town_page
+from grepolis_intel.worldmap import DensityTiles, map_points, ocean_box
+
+from .standin import write_fixture_dumps
+
+
+def _ms(func, repeat=3):
+    mejor = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        resultado = func()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=40_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        write_fixture_dumps(root, players=args.players)
+        with open(os.path.join(root, 'towns.txt'), 'rb') as f:
+            towns = parse_towns(f.read())
+        with open(os.path.join(root, 'players.txt'), 'rb') as f:
+            players = ActivityTracker().classify(parse_players(f.read()))
+
+    indice = PlayerIndex(players)
+    grid = TownGrid(towns)
+    t_tiles, tiles = _ms(lambda: DensityTiles(towns, players, indice))
+    oceano = int(tiles.oceans[len(tiles.oceans) // 2])
+
+    def todas():
+        puntos = town_page(towns, players, indice, range(len(towns)))
+        return px.scatter(puntos, x='Coord_X', y='Coord_Y', color='Estado').to_json()
+
+    def raster():
+        z, xs, ys = tiles.raster(tiles.level_for(1000))
+        return go.Figure(go.Heatmap(z=z.T, x=xs, y=ys)).to_json()
+
+    def ventana():
+        puntos = map_points(towns, players, indice, grid.within_box(*ocean_box(oceano)))
+        return px.scatter(puntos, x='X', y='Y', color='Estado', render_mode='webgl').to_json()
+
+    print(f"{len(towns):,} ciudades; rasters de {len(tiles.levels)} niveles en {t_tiles:.1f} ms (una vez por snapshot)")
+    for nombre, func in (("scatter de todas las ciudades", todas), ("raster del mundo", raster),
+                         (f"puntos WebGL del océano {oceano}", ventana)):
+        t, figura = _ms(func)
+        print(f"{nombre:<32} {t:8.1f} ms  {len(figura) / 1e6:6.2f} MB de figura")
+
+
+if __name__ == '__main__':
+    main()
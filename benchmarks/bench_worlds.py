@@ -0,0 +1,76 @@
+"""Refresco de 1, 4 y 16 mundos: en serie en un proceso frente al pool de procesos
+
+Cada mundo es un mundo sintético distinto servido en su carpeta por el
+servidor local (``<url>/<mundo>/players.txt``). El primer mundo es
+``--slow`` veces más grande para ver que no retrasa a los demás: se
+muestra cuándo termina la mediana de los mundos además del total.
+
+Uso: python -m benchmarks.bench_worlds [--players 5000] [--worlds 1 4 16] [--slow 4]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from grepolis_intel.fetch import WorldFetcher
+from grepolis_intel.ingest import refresh_world, refresh_worlds
+from grepolis_intel.snapshots import SnapshotStore
+
+from .standin import serve_directory
+from .synthetic import generate_world, write_world
+
+
+def _en_serie(worlds, snapshots, base_url):
+    store = SnapshotStore(snapshots)
+    inicio = time.perf_counter()
+    terminados = []
+    for world in worlds:
+        fetcher = WorldFetcher(world, base_url=base_url)
+        refresh_world(fetcher, store)
+        fetcher.close()
+        terminados.append(time.perf_counter() - inicio)
+    return terminados
+
+
+def _en_paralelo(worlds, snapshots, base_url, processes):
+    inicio = time.perf_counter()
+    terminados = []
+    for world, estados in refresh_worlds(worlds, snapshots, base_url, processes=processes):
+        if any(status != 200 for status, _ in estados.values()):
+            raise RuntimeError(f"{world}: {estados}")
+        terminados.append(time.perf_counter() - inicio)
+    return terminados
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=5_000)
+    parser.add_argument('--worlds', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--slow', type=int, default=4, help="el primer mundo tiene N veces más jugadores")
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} núcleos; {args.players:,} jugadores por mundo (el primero x{args.slow})")
+    with tempfile.TemporaryDirectory() as root:
+        maximo = max(args.worlds)
+        nombres = [f"zz{i + 1:03d}" for i in range(maximo)]
+        for i, world in enumerate(nombres):
+            jugadores = args.players * (args.slow if i == 0 else 1)
+            write_world(os.path.join(root, world), generate_world(players=jugadores, alliances=jugadores // 40, seed=i))
+        server, url = serve_directory(root)
+        base_url = url + '/{world}'
+        try:
+            for n in args.worlds:
+                worlds = nombres[:n]
+                with tempfile.TemporaryDirectory() as a, tempfile.TemporaryDirectory() as b:
+                    serie = _en_serie(worlds, a, base_url)
+                    pool = _en_paralelo(worlds, b, base_url, args.processes)
+                print(f"{n:>3} mundos: en serie {serie[-1]:6.2f} s (mediana lista a {statistics.median(serie):5.2f} s) | "
+                      f"pool {pool[-1]:6.2f} s (mediana lista a {statistics.median(pool):5.2f} s)")
+        finally:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Servidor HTTP local que imita /data/ de Grepolis sirviendo dumps de prueba"""
+import email.utils
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .synthetic import generate_world, write_world
+
+
+def write_fixture_dumps(root, players=10_000, alliances=300, towns_per_player=4, seed=137):
+    """Escribe los dumps de un mundo sintético (ver ``synthetic``) con sus .gz"""
+    mundo = generate_world(players=players, alliances=alliances, towns_per_player=towns_per_player, seed=seed)
+    return write_world(root, mundo)
+
+
+class _DumpHandler(BaseHTTPRequestHandler):
+    root = '.'
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+        # /players.txt o /<mundo>/players.txt si se sirven varios mundos
+        partes = [p for p in self.path.split('?')[0].split('/') if p not in ('', '.', '..')]
+        nombre = partes[-1] if partes else ''
+        ruta = os.path.join(self.root, *partes)
+        if not os.path.isfile(ruta):
+            self.send_error(404)
+            return
+
+        stat = os.stat(ruta)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+
+        no_modificado = self.headers.get('If-None-Match') == etag
+        if 'If-None-Match' not in self.headers and self.headers.get('If-Modified-Since'):
+            desde = email.utils.parsedate_to_datetime(self.headers['If-Modified-Since']).timestamp()
+            no_modificado = int(stat.st_mtime) <= desde
+
+        if no_modificado:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        with open(ruta, 'rb') as f:
+            datos = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/gzip' if nombre.endswith('.gz') else 'text/plain')
+        self.send_header('Content-Length', str(len(datos)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.end_headers()
+        self.wfile.write(datos)
+
+
+def serve_directory(root, latency=0.0):
+    """Arranca el servidor en un hilo; devuelve (servidor, url_base)"""
+    handler = type('DumpHandler', (_DumpHandler,), {'root': root, 'latency': latency})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
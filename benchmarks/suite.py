@@ -0,0 +1,264 @@
+"""Suite de benchmarks reproducible sobre un mundo sintético
+
+Mide las rutas calientes de la app con el mismo mundo (escala y semilla
+fijas): descarga contra el servidor local, parseo, actividad, métricas,
+el cálculo de cada pestaña y la búsqueda. Guarda los resultados en
+``benchmarks/results/<commit>-<escala>.json`` y los compara con la
+ejecución anterior de la misma escala para que las regresiones se vean
+entre commits.
+
+Uso: python -m benchmarks.suite [--scale es137|grande|1m] [--repeat 5] [--no-save]
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from grepolis_intel.activity import ActivityTracker, town_status_counts
+from grepolis_intel.alliances import alliance_summary
+from grepolis_intel.conquests import ConquestIndex, ConquestLog
+from grepolis_intel.fetch import DUMPS, WorldFetcher
+from grepolis_intel.indexes import PlayerIndex, RankGaps
+from grepolis_intel.ingest import LOGS
+from grepolis_intel.kills import KILL_COLUMNS, add_kill_points
+from grepolis_intel.metrics import add_player_metrics
+from grepolis_intel.parse import PARSERS
+from grepolis_intel.perf import PerfRecorder
+from grepolis_intel.render import RenderCache
+from grepolis_intel.search import NameSearchIndex
+from grepolis_intel.snapshots import SnapshotStore
+from grepolis_intel.spatial import OceanDominance, TownGrid, ocean_summary
+from grepolis_intel.tables import (
+    PLAYER_PAGE_COLUMNS, alliance_roster, closest_to_climb, player_pages, rank_targets, top_players, town_page, town_pages,
+)
+from grepolis_intel.targets import candidate_mask, find_targets
+from grepolis_intel.worldmap import DensityTiles, map_points, ocean_box
+
+from .standin import serve_directory
+from .synthetic import SCALES, evolve, generate_world, write_world
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(RAIZ, 'benchmarks', 'results')
+WORLD = 'es137'
+REGRESSION = 0.20  # Se marca como regresión lo que tarda un 20% más que antes
+
+
+def _commit():
+    """Commit actual (con '+' si hay cambios sin confirmar) o 'sin-git'"""
+    try:
+        sha = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, check=True,
+                             capture_output=True, text=True).stdout.strip()
+        sucio = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=RAIZ,
+                               capture_output=True, text=True).stdout.strip()
+        return sha + ('+' if sucio else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'sin-git'
+
+
+def _ms(func, repeat):
+    mejor = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def _leer(root, fichero):
+    with open(os.path.join(root, fichero), 'rb') as f:
+        return f.read()
+
+
+class _Escenario:
+    """Mundo sintético con dos publicaciones consecutivas y todo lo derivado"""
+
+    def __init__(self, root, scale, seed):
+        antes = generate_world(seed=seed, timestamp=time.time() - 3600, **SCALES[scale])
+        despues = evolve(antes, seed=seed)
+        self.dumps = os.path.join(root, 'dumps')
+        self.tamano = write_world(self.dumps, despues)
+        write_world(os.path.join(root, 'antes'), antes, compress=False)
+
+        self.bodies = {name: _leer(self.dumps, DUMPS[name]) for name in PARSERS}
+        self.store = SnapshotStore(os.path.join(root, 'snapshots'))
+        for carpeta, mundo in (('antes', antes), ('dumps', despues)):
+            ts = datetime.fromtimestamp(mundo.timestamp, timezone.utc).replace(microsecond=0)
+            for name, parser in PARSERS.items():
+                datos = parser(_leer(os.path.join(root, carpeta), DUMPS[name]))
+                if name in LOGS:
+                    ConquestLog(self.store.root).append(WORLD, datos, ts)
+                else:
+                    self.store.write(WORLD, name, datos, ts)
+
+        self.players = PARSERS['players'](self.bodies['players'])
+        self.alliances = PARSERS['alliances'](self.bodies['alliances'])
+        self.towns = PARSERS['towns'](self.bodies['towns'])
+        self.kills = {dump: PARSERS[dump](self.bodies[dump]) for dump in KILL_COLUMNS}
+        self.kills_antes = {
+            dump: self.store.read(WORLD, dump, self.store.previous_timestamp(WORLD, dump, self.store.latest_timestamp(WORLD, dump)))
+            for dump in KILL_COLUMNS
+        }
+        tracker = ActivityTracker()
+        tracker.sync(self.store, WORLD)
+        self.tabla = add_player_metrics(add_kill_points(tracker.classify(self.players), self.kills, self.kills_antes))
+        self.indice = PlayerIndex(self.tabla, self.alliances)
+        self.saltos = RankGaps(self.tabla)
+        self.paginas = player_pages(self.tabla)
+        self.paginas_ciudades = town_pages(self.towns, self.tabla)
+        self.grid = TownGrid(self.towns)
+        self.dominio = OceanDominance(self.towns, self.players)
+        self.mapa = DensityTiles(self.towns, self.tabla, self.indice)
+        antes_ts = self.store.previous_timestamp(WORLD, 'towns', self.store.latest_timestamp(WORLD, 'towns'))
+        self.dominio_antes = OceanDominance(self.store.read(WORLD, 'towns', antes_ts), self.store.read(WORLD, 'players', antes_ts))
+        self.conquistas = ConquestIndex(ConquestLog(self.store.root).read(WORLD))
+        self.busqueda = NameSearchIndex(self.tabla['Nombre'], priority=self.tabla['Ranking'].to_numpy())
+
+        # Jugador y alianza de referencia: a media tabla, como un usuario típico
+        self.fila = len(self.tabla) // 2
+        self.jugador = int(self.tabla['ID'].iloc[self.fila])
+        self.alianza = int(self.alliances['ID_Alianza'].iloc[min(10, len(self.alliances) - 1)])
+
+
+def _casos(e, base_url):
+    def fetch_frio():
+        fetcher = WorldFetcher(WORLD, base_url=base_url)
+        fetcher.fetch_all()
+        fetcher.close()
+
+    caliente = WorldFetcher(WORLD, base_url=base_url)
+    caliente.fetch_all()
+
+    def actividad():
+        tracker = ActivityTracker()
+        tracker.sync(e.store, WORLD)
+        return tracker.classify(e.players)
+
+    def conquistas():
+        semana = e.conquistas.fechas[-1] - 7 * 86400 if len(e.conquistas) else None
+        e.conquistas.by_alliance(e.alianza, semana)
+        e.conquistas.near(e.grid, e.jugador, 20, semana)
+
+    def servidor():
+        town_status_counts(e.towns, e.tabla)
+        ocean_summary(e.towns, e.tabla)
+        e.tabla.iloc[e.paginas.page('Puntos', 0, 50, '🟢 Activo')][PLAYER_PAGE_COLUMNS]
+        town_page(e.towns, e.tabla, e.indice, e.paginas_ciudades.page('Puntos', 0, 50))
+        top_players(e.tabla, e.alliances, 10)
+
+    def alianza():
+        alliance_roster(e.tabla, e.indice, e.alianza)
+        alliance_summary(e.tabla, e.alliances)
+        closest_to_climb(e.tabla, e.saltos, e.indice.alliance_rows(e.alianza), 5)
+
+    def jugador():
+        rank_targets(e.tabla, e.saltos, e.fila)
+        e.grid.within_player(e.jugador, 20)
+        mascara = candidate_mask(e.towns, e.tabla, "Inactivas")
+        find_targets(e.grid, e.tabla, [e.jugador], mascara, k=10)
+
+    # La tabla de miembros construida y convertida a Arrow, y la misma desde una caché ya llena
+    def roster():
+        return alliance_roster(e.tabla, e.indice, e.alianza)
+
+    render = RenderCache(recorder=PerfRecorder())
+    render.table('roster', roster)
+
+    nombre = e.tabla['Nombre'].iloc[e.fila]
+    trozo = nombre[1:5]
+    return {
+        'fetch.frio': fetch_frio,
+        'fetch.caliente': caliente.fetch_all,
+        **{f'parse.{name}': (lambda n=name: PARSERS[n](e.bodies[n])) for name in PARSERS},
+        'actividad.sync_classify': actividad,
+        'metricas.derivar': lambda: add_player_metrics(e.tabla),
+        'metricas.combates': lambda: add_kill_points(e.players, e.kills, e.kills_antes),
+        'indices.construir': lambda: PlayerIndex(e.tabla, e.alliances),
+        'indices.saltos': lambda: RankGaps(e.tabla),
+        'indices.paginas': lambda: (player_pages(e.tabla), town_pages(e.towns, e.tabla)),
+        'oceanos.dominio': lambda: OceanDominance(e.towns, e.players),
+        'oceanos.cambios': lambda: e.dominio.changes(e.dominio_antes),
+        'mapa.rasters': lambda: DensityTiles(e.towns, e.tabla, e.indice),
+        'mapa.ventana': lambda: map_points(e.towns, e.tabla, e.indice, e.grid.within_box(*ocean_box(int(e.mapa.oceans[0])))),
+        'render.tabla': lambda: RenderCache(recorder=PerfRecorder()).table('roster', roster),
+        'render.acierto': lambda: render.table('roster', roster),
+        'conquistas.indice': lambda: ConquestIndex(ConquestLog(e.store.root).read(WORLD)),
+        'conquistas.consulta': conquistas,
+        'pestana.servidor': servidor,
+        'pestana.alianza': alianza,
+        'pestana.jugador': jugador,
+        'busqueda.construir': lambda: NameSearchIndex(e.tabla['Nombre'], priority=e.tabla['Ranking'].to_numpy()),
+        'busqueda.contiene': lambda: e.busqueda.contains(trozo, limit=20),
+        'busqueda.prefijo': lambda: e.busqueda.prefix(nombre[:3], limit=20),
+        'busqueda.aproximada': lambda: e.busqueda.fuzzy(nombre[::-1][:6] + nombre[6:]),
+    }
+
+
+def _anterior(scale, commit):
+    """Últimos resultados guardados de la misma escala en otro commit"""
+    candidatos = []
+    for ruta in glob.glob(os.path.join(RESULTS_DIR, f'*-{scale}.json')):
+        with open(ruta) as f:
+            datos = json.load(f)
+        if datos.get('commit') != commit:
+            candidatos.append(datos)
+    return max(candidatos, key=lambda d: d['date'], default=None)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', choices=SCALES, default='es137')
+    parser.add_argument('--seed', type=int, default=137)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+
+    commit = _commit()
+    with tempfile.TemporaryDirectory() as root:
+        inicio = time.perf_counter()
+        escenario = _Escenario(root, args.scale, args.seed)
+        print(f"mundo '{args.scale}': {len(escenario.tabla):,} jugadores, {len(escenario.alliances):,} alianzas, "
+              f"{len(escenario.towns):,} ciudades (preparado en {time.perf_counter() - inicio:.1f} s)")
+
+        server, base_url = serve_directory(escenario.dumps)
+        try:
+            resultados = {nombre: round(_ms(func, args.repeat), 3) for nombre, func in _casos(escenario, base_url).items()}
+        finally:
+            server.shutdown()
+
+    previo = _anterior(args.scale, commit)
+    if previo:
+        print(f"comparado con {previo['commit']} ({previo['date']})")
+    for nombre, ms in resultados.items():
+        linea = f"{nombre:<26} {ms:9.2f} ms"
+        antes = (previo or {}).get('results', {}).get(nombre)
+        if antes:
+            cambio = ms / antes - 1
+            linea += f"  {cambio:+7.1%}" + ("  ⚠️ regresión" if cambio > REGRESSION else "")
+        print(linea)
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        ruta = os.path.join(RESULTS_DIR, f"{commit}-{args.scale}.json")
+        with open(ruta, 'w') as f:
+            json.dump({
+                'commit': commit,
+                'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'scale': args.scale,
+                'seed': args.seed,
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'numpy': np.__version__,
+                'results': resultados,
+            }, f, indent=2)
+        print(f"guardado en {os.path.relpath(ruta, RAIZ)}")
+
+
+if __name__ == '__main__':
+    main()
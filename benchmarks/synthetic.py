@@ -0,0 +1,337 @@
+"""Generador de mundos sintéticos con el formato de los dumps de Grepolis
+
+Produce players.txt, alliances.txt, towns.txt, conquers.txt y
+player_kills_{all,att,def}.txt (más sus .gz) con distribuciones parecidas a
+las de un mundo real: muchos jugadores de una sola ciudad y pocos muy
+grandes, alianzas de tamaño tipo Zipf agrupadas en su zona del mapa,
+ciudades fantasma, nombres con espacios y tildes, y conquistas y puntos de
+combate coherentes con los dueños actuales.
+
+Todo se genera con numpy a partir de una semilla, así que el mismo
+tamaño y semilla dan siempre los mismos ficheros. ``evolve`` simula la
+siguiente publicación horaria (solo crecen los jugadores activos).
+
+Uso: python -m benchmarks.synthetic DESTINO [--scale es137|grande|1m] [--players N]
+"""
+import argparse
+import gzip
+import os
+import time
+from dataclasses import dataclass, replace
+from urllib.parse import quote_plus
+
+import numpy as np
+
+# Tamaños de referencia: número de jugadores y ciudades medias por jugador
+SCALES = {
+    'es137': dict(players=12_000, towns_per_player=4),
+    'grande': dict(players=60_000, towns_per_player=5),
+    '1m': dict(players=150_000, towns_per_player=6.5),
+}
+
+_SILABAS = np.array([
+    'ka', 'zeus', 'ar', 'tem', 'is', 'pol', 'on', 'the', 'ra', 'mi', 'nos', 'ta', 'via', 'dor',
+    'el', 'ion', 'cas', 'tor', 'ly', 'ne', 'her', 'mes', 'xan', 'dro', 'pe', 'leo', 'kra', 'tos',
+])
+_PALABRAS = np.array([
+    'Guerrero', 'Espartano', 'Atenea', 'Señor', 'Ámbar', 'Lobo', 'Rey', 'Dama', 'Oscuro',
+    'Titán', 'Héroe', 'Fénix', 'Dragón', 'Sombra', 'León', 'Tritón', 'Hoplita', 'Ares',
+])
+_SIGLAS = np.array(['R.D.M.P', 'SPQR', 'Los', 'Hijos de', 'Orden', 'Legión', 'Imperio', 'Liga'])
+_CIUDADES = np.array(['Polis', 'Acrópolis', 'Puerto', 'Colonia', 'Fortaleza', 'Ágora', 'Faro', 'Templo'])
+
+
+@dataclass
+class SyntheticWorld:
+    """Columnas de cada dump como arrays de numpy (0 = sin dueño / sin alianza)"""
+    player_ids: np.ndarray
+    player_names: np.ndarray
+    player_alliance: np.ndarray
+    player_active: np.ndarray
+    alliance_ids: np.ndarray
+    alliance_names: np.ndarray
+    town_ids: np.ndarray
+    town_owner: np.ndarray
+    town_names: np.ndarray
+    town_x: np.ndarray
+    town_y: np.ndarray
+    town_slot: np.ndarray
+    town_points: np.ndarray
+    conquers: np.ndarray  # (town_id, time, new_player, old_player, new_ally, old_ally, points)
+    kills_att: np.ndarray
+    kills_def: np.ndarray
+    timestamp: float
+
+    @property
+    def player_points(self):
+        return np.bincount(self.town_owner, weights=self.town_points, minlength=int(self.player_ids.max(initial=0)) + 1)[self.player_ids].astype(np.int64)
+
+    @property
+    def player_towns(self):
+        return np.bincount(self.town_owner, minlength=int(self.player_ids.max(initial=0)) + 1)[self.player_ids]
+
+
+def _nombres(rng, n, sufijo_unico):
+    """n nombres distintos a partir de sílabas, palabras, espacios, tildes y números"""
+    silabas = rng.integers(0, len(_SILABAS), (n, 3))
+    largo = rng.integers(2, 4, n)
+    nombres = []
+    for i in range(n):
+        base = ''.join(_SILABAS[silabas[i, :largo[i]]]).capitalize()
+        nombres.append(base)
+    con_palabra = rng.random(n) < 0.4
+    con_numero = rng.random(n) < 0.3
+    palabra = rng.integers(0, len(_PALABRAS), n)
+    numero = rng.integers(1, 1000, n)
+    for i in np.flatnonzero(con_palabra):
+        nombres[i] = f"{_PALABRAS[palabra[i]]} {nombres[i]}"
+    for i in np.flatnonzero(con_numero):
+        nombres[i] = f"{nombres[i]}{numero[i]}"
+
+    # Grepolis no admite nombres repetidos
+    vistos = set()
+    for i, nombre in enumerate(nombres):
+        if nombre in vistos:
+            nombre = f"{nombre} {sufijo_unico[i]}"
+            nombres[i] = nombre
+        vistos.add(nombre)
+    return np.array(nombres, dtype=object)
+
+
+def generate_world(players=12_000, alliances=None, towns_per_player=4, ghost_share=0.05,
+                   alliance_share=0.7, max_members=100, conquers=None, seed=137, timestamp=None):
+    """Mundo sintético con ``players`` jugadores y ~``towns_per_player`` ciudades de media"""
+    rng = np.random.default_rng(seed)
+    alliances = alliances or max(1, players // 40)
+    timestamp = timestamp if timestamp is not None else time.time()
+    player_ids = np.arange(1, players + 1, dtype=np.int64)
+
+    # Ciudades por jugador: geométrica (muchos con una, pocos con cientos)
+    n_ciudades = np.minimum(rng.geometric(1 / towns_per_player, players), 300)
+    duenos = np.repeat(player_ids, n_ciudades)
+    n_fantasma = int(len(duenos) * ghost_share)
+    duenos = np.concatenate([duenos, np.zeros(n_fantasma, dtype=np.int64)])
+    rng.shuffle(duenos)
+    n_towns = len(duenos)
+
+    # Puntos por ciudad: los jugadores grandes tienen ciudades más desarrolladas
+    desarrollo = np.log1p(n_ciudades)[np.maximum(duenos - 1, 0)] * (duenos != 0)
+    puntos_ciudad = np.clip(rng.lognormal(np.log(1500) + 0.4 * desarrollo, 0.6), 100, 13_000).astype(np.int64)
+
+    # Alianzas: los jugadores con más ciudades están en alianza con más frecuencia
+    percentil = np.argsort(np.argsort(n_ciudades)) / max(players - 1, 1)
+    en_alianza = rng.random(players) < alliance_share * (0.5 + percentil)
+    pesos = 1 / (np.arange(alliances) + 5) ** 1.1
+    alianza = np.where(en_alianza, rng.choice(alliances, players, p=pesos / pesos.sum()) + 1, 0)
+    # Límite de miembros por alianza: los que sobran se quedan sin alianza
+    orden = np.lexsort((rng.random(players), alianza))
+    puesto = np.arange(players) - np.searchsorted(alianza[orden], alianza[orden], side='left')
+    alianza[orden[puesto >= max_members]] = 0
+
+    # Cada alianza tiene su zona del mapa; el mundo crece desde el centro (500, 500)
+    angulo = rng.uniform(0, 2 * np.pi, alliances + 1)
+    radio = rng.uniform(40, 380, alliances + 1)
+    centro_x = 500 + radio * np.cos(angulo)
+    centro_y = 500 + radio * np.sin(angulo)
+    alianza_ciudad = np.where(duenos != 0, alianza[np.maximum(duenos - 1, 0)], 0)
+    dispersion = np.where(alianza_ciudad != 0, 45.0, 160.0)
+    x = np.clip(centro_x[alianza_ciudad] + rng.normal(0, dispersion), 0, 999).astype(np.int64)
+    y = np.clip(centro_y[alianza_ciudad] + rng.normal(0, dispersion), 0, 999).astype(np.int64)
+    sin_alianza = alianza_ciudad == 0
+    x[sin_alianza] = np.clip(500 + rng.normal(0, 200, sin_alianza.sum()), 0, 999).astype(np.int64)
+    y[sin_alianza] = np.clip(500 + rng.normal(0, 200, sin_alianza.sum()), 0, 999).astype(np.int64)
+
+    nombres_jugador = _nombres(rng, players, player_ids)
+    nombres_alianza = _nombres(rng, alliances, np.arange(1, alliances + 1))
+    sigla = rng.integers(0, len(_SIGLAS), alliances)
+    con_sigla = rng.random(alliances) < 0.5
+    nombres_alianza[con_sigla] = [f"{_SIGLAS[s]} {n}" for s, n in zip(sigla[con_sigla], nombres_alianza[con_sigla])]
+
+    # Ciudades: la mitad con el nombre por defecto ("Ciudad de <jugador>")
+    town_ids = np.arange(1, n_towns + 1, dtype=np.int64)
+    por_defecto = (rng.random(n_towns) < 0.5) & (duenos != 0)
+    palabra = _CIUDADES[rng.integers(0, len(_CIUDADES), n_towns)]
+    numero = rng.integers(1, 100, n_towns).astype(str)
+    nombres_ciudad = np.char.add(np.char.add(palabra.astype(str), ' '), numero).astype(object)
+    nombres_ciudad[por_defecto] = ["Ciudad de " + nombres_jugador[d - 1] for d in duenos[por_defecto]]
+
+    mundo = SyntheticWorld(
+        player_ids=player_ids, player_names=nombres_jugador, player_alliance=alianza,
+        player_active=rng.random(players) < 0.35,
+        alliance_ids=np.arange(1, alliances + 1, dtype=np.int64), alliance_names=nombres_alianza,
+        town_ids=town_ids, town_owner=duenos, town_names=nombres_ciudad, town_x=x, town_y=y,
+        town_slot=rng.integers(0, 20, n_towns), town_points=puntos_ciudad,
+        conquers=np.empty((0, 7), dtype=np.int64), kills_att=None, kills_def=None, timestamp=timestamp,
+    )
+    mundo = replace(mundo, conquers=_conquistas(rng, mundo, n_towns // 20 if conquers is None else conquers))
+    return _combates(rng, mundo)
+
+
+def _conquistas(rng, mundo, n, dias=30):
+    """Conquistas de los últimos ``dias`` que acaban en el dueño actual de cada ciudad"""
+    con_dueno = np.flatnonzero(mundo.town_owner != 0)
+    if n == 0 or len(con_dueno) == 0:
+        return np.empty((0, 7), dtype=np.int64)
+    filas = rng.choice(con_dueno, min(n, len(con_dueno)), replace=False)
+    nuevo = mundo.town_owner[filas]
+    anterior = rng.choice(mundo.player_ids, len(filas))
+    anterior[(anterior == nuevo) | (rng.random(len(filas)) < 0.15)] = 0  # Conquistas de ciudades fantasma
+    alianza = np.concatenate([[0], mundo.player_alliance])
+    hora = np.sort(mundo.timestamp - rng.uniform(0, dias * 86400, len(filas))).astype(np.int64)
+    return np.column_stack([
+        mundo.town_ids[filas], hora, nuevo, anterior, alianza[nuevo], alianza[anterior],
+        mundo.town_points[filas],
+    ])
+
+
+def _combates(rng, mundo):
+    """Puntos de ataque y defensa proporcionales al tamaño; un 30% sin combates"""
+    puntos = mundo.player_points.astype(np.float64)
+    n = len(puntos)
+    ataque = (puntos * rng.lognormal(-1.0, 1.0, n)).astype(np.int64) * (rng.random(n) > 0.3)
+    defensa = (puntos * rng.lognormal(-1.5, 1.0, n)).astype(np.int64) * (rng.random(n) > 0.3)
+    return replace(mundo, kills_att=ataque, kills_def=defensa)
+
+
+def evolve(mundo, hours=1, seed=None):
+    """La siguiente publicación: los jugadores activos suben puntos y conquistan alguna ciudad"""
+    rng = np.random.default_rng(seed)
+    activos = mundo.player_active[np.maximum(mundo.town_owner - 1, 0)] & (mundo.town_owner != 0)
+    crecen = activos & (rng.random(len(activos)) < 0.3 * hours)
+    puntos = mundo.town_points.copy()
+    puntos[crecen] = np.minimum(puntos[crecen] + rng.integers(5, 120, crecen.sum()), 13_000)
+
+    # Unas pocas conquistas por hora (una de cada ~2000 ciudades), hechas por jugadores activos
+    conquistadores = mundo.player_ids[mundo.player_active]
+    n = min(rng.poisson(len(mundo.town_ids) / 2000 * hours), len(mundo.town_ids))
+    duenos = mundo.town_owner.copy()
+    conquistas = mundo.conquers
+    if n and len(conquistadores):
+        filas = rng.choice(len(mundo.town_ids), n, replace=False)
+        nuevo = rng.choice(conquistadores, n)
+        anterior = duenos[filas]
+        duenos[filas] = nuevo
+        alianza = np.concatenate([[0], mundo.player_alliance])
+        hora = np.sort(mundo.timestamp + rng.uniform(1, hours * 3600, n)).astype(np.int64)
+        conquistas = np.concatenate([conquistas, np.column_stack([
+            mundo.town_ids[filas], hora, nuevo, anterior, alianza[nuevo], alianza[anterior], puntos[filas],
+        ])])
+    siguiente = replace(mundo, town_points=puntos, town_owner=duenos, conquers=conquistas,
+                        timestamp=mundo.timestamp + hours * 3600)
+    ataque = mundo.kills_att + (mundo.player_active * rng.integers(0, 300, len(mundo.player_ids)))
+    return replace(siguiente, kills_att=ataque)
+
+
+def _vacio_si_cero(valores):
+    texto = valores.astype(str)
+    texto[valores == 0] = ''
+    return texto
+
+
+def _ranking(puntos, ids):
+    """Posición de cada fila ordenando por puntos descendentes (y por ID en empate)"""
+    orden = np.lexsort((ids, -puntos))
+    ranking = np.empty(len(puntos), dtype=np.int64)
+    ranking[orden] = np.arange(1, len(puntos) + 1)
+    return ranking, orden
+
+
+def _codificar(nombres):
+    return np.array([quote_plus(n) for n in nombres], dtype=object)
+
+
+def dump_lines(mundo):
+    """{fichero: lista de columnas de texto} de cada dump"""
+    puntos = mundo.player_points
+    ciudades = mundo.player_towns
+    ranking, orden = _ranking(puntos, mundo.player_ids)
+
+    n_alianzas = len(mundo.alliance_ids)
+    miembros = np.bincount(mundo.player_alliance, minlength=n_alianzas + 1)[1:]
+    puntos_alianza = np.bincount(mundo.player_alliance, weights=puntos, minlength=n_alianzas + 1)[1:].astype(np.int64)
+    ciudades_alianza = np.bincount(mundo.player_alliance, weights=ciudades, minlength=n_alianzas + 1)[1:].astype(np.int64)
+    ranking_alianza, orden_alianza = _ranking(puntos_alianza, mundo.alliance_ids)
+    con_miembros = orden_alianza[miembros[orden_alianza] > 0]
+
+    ficheros = {
+        'players.txt': [
+            mundo.player_ids[orden].astype(str), _codificar(mundo.player_names[orden]),
+            _vacio_si_cero(mundo.player_alliance[orden]), puntos[orden].astype(str),
+            ranking[orden].astype(str), ciudades[orden].astype(str),
+        ],
+        'alliances.txt': [
+            mundo.alliance_ids[con_miembros].astype(str), _codificar(mundo.alliance_names[con_miembros]),
+            puntos_alianza[con_miembros].astype(str), ciudades_alianza[con_miembros].astype(str),
+            miembros[con_miembros].astype(str), ranking_alianza[con_miembros].astype(str),
+        ],
+        'towns.txt': [
+            mundo.town_ids.astype(str), _vacio_si_cero(mundo.town_owner),
+            _codificar_ciudades(mundo), mundo.town_x.astype(str), mundo.town_y.astype(str),
+            mundo.town_slot.astype(str), mundo.town_points.astype(str),
+        ],
+        'conquers.txt': [
+            mundo.conquers[:, 0].astype(str), mundo.conquers[:, 1].astype(str),
+            mundo.conquers[:, 2].astype(str), _vacio_si_cero(mundo.conquers[:, 3]),
+            _vacio_si_cero(mundo.conquers[:, 4]), _vacio_si_cero(mundo.conquers[:, 5]),
+            mundo.conquers[:, 6].astype(str),
+        ],
+    }
+    for sufijo, valores in (('all', mundo.kills_att + mundo.kills_def), ('att', mundo.kills_att), ('def', mundo.kills_def)):
+        con_puntos = np.flatnonzero(valores > 0)
+        rk, orden_k = _ranking(valores[con_puntos], mundo.player_ids[con_puntos])
+        filas = con_puntos[orden_k]
+        ficheros[f'player_kills_{sufijo}.txt'] = [
+            rk[orden_k].astype(str), mundo.player_ids[filas].astype(str), valores[filas].astype(str),
+        ]
+    return ficheros
+
+
+def _codificar_ciudades(mundo):
+    """Como ``_codificar`` pero sin llamar a quote_plus una vez por ciudad"""
+    unicos, inversa = np.unique(mundo.town_names.astype(str), return_inverse=True)
+    return _codificar(unicos)[inversa]
+
+
+def write_world(root, mundo, compress=True):
+    """Escribe todos los dumps (y sus .gz) en ``root`` con mtime = hora del mundo"""
+    os.makedirs(root, exist_ok=True)
+    tamanos = {}
+    for fichero, columnas in dump_lines(mundo).items():
+        filas = map(','.join, zip(*(c.tolist() for c in columnas)))
+        datos = ''.join(f"{fila}\n" for fila in filas).encode()
+        destinos = [(fichero, datos)]
+        if compress:
+            destinos.append((fichero + '.gz', gzip.compress(datos, compresslevel=6, mtime=0)))
+        for nombre, contenido in destinos:
+            ruta = os.path.join(root, nombre)
+            with open(ruta, 'wb') as f:
+                f.write(contenido)
+            os.utime(ruta, (mundo.timestamp, mundo.timestamp))
+        tamanos[fichero] = len(datos)
+    return tamanos
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('root')
+    parser.add_argument('--scale', choices=SCALES, default='es137')
+    parser.add_argument('--players', type=int)
+    parser.add_argument('--seed', type=int, default=137)
+    args = parser.parse_args()
+
+    opciones = dict(SCALES[args.scale])
+    if args.players:
+        opciones['players'] = args.players
+
+    inicio = time.perf_counter()
+    mundo = generate_world(seed=args.seed, **opciones)
+    tamanos = write_world(args.root, mundo)
+    print(f"{len(mundo.player_ids):,} jugadores, {len(mundo.alliance_ids):,} alianzas, "
+          f"{len(mundo.town_ids):,} ciudades, {len(mundo.conquers):,} conquistas "
+          f"en {time.perf_counter() - inicio:.1f} s")
+    for fichero, tamano in tamanos.items():
+        print(f"  {fichero:<22} {tamano / 1e6:7.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,34 @@
 import streamlit as st
 import pandas as pd
-import requests
-import io
+import os
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import timedelta
 import time
-import random
+
+from grepolis_intel.activity import GHOST_LABEL, STATUS_LABELS, ActivityTracker, town_status_counts
+from grepolis_intel.alliances import alliance_summary
+from grepolis_intel.conquests import ConquestIndex, ConquestLog
+from grepolis_intel.fetch import WorldFetcher
+from grepolis_intel.history import GROWTH_WINDOWS, HistoryStore, entity_series, growth_rates, project_targets
+from grepolis_intel.indexes import RANK_JUMPS, PlayerIndex, RankGaps
+from grepolis_intel.kills import KILL_COLUMNS, add_kill_points
+from grepolis_intel.metrics import add_player_metrics
+from grepolis_intel.perf import RECORDER
+from grepolis_intel.render import RenderCache
+from grepolis_intel.scheduler import RefreshScheduler
+from grepolis_intel.search import MODES, NameSearchIndex
+from grepolis_intel.snapshots import SnapshotStore
+from grepolis_intel.spatial import OCEAN_SIZE, OceanDominance, TownGrid, ocean_summary
+from grepolis_intel.tables import (
+    PLAYER_PAGE_COLUMNS, ROSTER_COLUMNS, closest_to_climb, conquest_table, player_pages, rank_targets, top_players, town_page, town_pages,
+)
+from grepolis_intel.targets import UNIT_SPEEDS, candidate_mask, find_targets, owner_column
+from grepolis_intel.worldmap import MAP_LAYERS, MAP_SIZE, MAX_POINTS, DensityTiles, map_points, ocean_box
 
 # Configuración de la página
 st.set_page_config(
-    page_title="🏛️ GrepoIntel ES137 | R.D.M.P",
+    page_title="🏛️ GrepoIntel | R.D.M.P",
     page_icon="🏛️",
     layout="wide",
     initial_sidebar_state="expanded"
@@ -80,121 +98,384 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Tiempos de este rerun (panel oculto con ?perf=1)
+inicio_rerun = time.perf_counter()
+RECORDER.begin_run()
+
+def show_dataframe(data, **kwargs):
+    """st.dataframe midiendo la serialización de la tabla"""
+    with RECORDER.stage('render.dataframe'):
+        return st.dataframe(data, **kwargs)
+
+def show_chart(fig, **kwargs):
+    """st.plotly_chart midiendo la serialización de la figura"""
+    with RECORDER.stage('render.chart'):
+        return st.plotly_chart(fig, **kwargs)
+
+@st.cache_resource
+def get_render_cache():
+    """Figuras y tablas ya construidas, compartidas por las sesiones (presupuesto en GREPOLIS_RENDER_CACHE_MB)"""
+    return RenderCache(int(os.environ.get("GREPOLIS_RENDER_CACHE_MB", 128)) * 1024 * 1024)
+
+def cached_figure(key, build):
+    """Figura de ``build()`` reutilizada mientras no cambien el snapshot, la pestaña ni ``key`` (los widgets).
+
+    La figura guardada se comparte: no se modifica después de sacarla.
+    """
+    return get_render_cache().figure((snapshot_id, tab_selection, *key), build)
+
+def cached_table(key, build):
+    """Tabla de ``build()`` ya convertida a Arrow, reutilizada igual que ``cached_figure``"""
+    return get_render_cache().table((snapshot_id, tab_selection, *key), build)
+
+def page_selector(pages, sort, page_size, group, key):
+    """Número de página (desde 0) elegido para ese orden y filtro, con el total debajo.
+
+    Cambiar el orden, el filtro o el tamaño vuelve a la primera página.
+    """
+    total = pages.count(sort, group)
+    ultima = pages.page_count(sort, page_size, group)
+    pagina = st.number_input(
+        f"📄 Página (de {ultima:,}):", min_value=1, max_value=ultima, value=1, step=1,
+        key=f"{key}_{sort}_{group}_{page_size}",
+    )
+    inicio = (pagina - 1) * page_size
+    st.caption(f"Filas {min(inicio + 1, total):,}-{min(inicio + page_size, total):,} de {total:,}")
+    return pagina - 1
+
+MAP_VIEWS = {"🌍 Mundo": None, "🗺️ Región (3x3 océanos)": 3, "🌊 Océano": 1}
+MAP_DETAIL = {"Bajo": 50, "Medio": 100, "Alto": 200}
+MAP_COLORS = {
+    "🟢 Activo": '#28a745', "🟡 Reciente": '#ffc107', "🟠 Inactivo": '#fd7e14',
+    "🔴 Offline": '#dc3545', "👻 Fantasma": '#6c757d',
+}
+
+def show_world_map(tiles, grid, towns, players_table, index, key, default_ocean=0, alliance_id=None, alliance_name=None):
+    """Mapa del mundo: raster de densidad de todo el mapa o, en la ventana de uno o
+    varios océanos, las ciudades como puntos WebGL (el raster si siguen siendo demasiadas).
+
+    Con ``alliance_id`` se puede filtrar por la alianza y sus ciudades se resaltan.
+    """
+    capas = (["Mi alianza"] if alliance_id is not None else []) + ["Todas", *MAP_LAYERS]
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        vista = st.selectbox("🔭 Vista:", list(MAP_VIEWS), key=f"{key}_vista")
+    with col2:
+        capa = st.selectbox("🎨 Ciudades:", capas, key=f"{key}_capa")
+    with col3:
+        if MAP_VIEWS[vista] is None:
+            detalle = st.select_slider("🔍 Detalle:", list(MAP_DETAIL), value="Medio", key=f"{key}_detalle")
+            oceano = None
+        else:
+            oceanos = tiles.oceans.tolist()
+            oceano = st.selectbox(
+                "🌊 Océano:", oceanos, index=oceanos.index(default_ocean) if default_ocean in oceanos else 0,
+                format_func=lambda o: "O" + str(o).zfill(2), key=f"{key}_oceano",
+            )
+            detalle = "Alto"
+
+    caja = (0, 0, MAP_SIZE - 1, MAP_SIZE - 1) if MAP_VIEWS[vista] is None else ocean_box(oceano, MAP_VIEWS[vista])
+
+    def construir():
+        filas = grid.within_box(*caja) if MAP_VIEWS[vista] is not None else None
+        if filas is not None and len(filas) <= MAX_POINTS:
+            # Ventana pequeña: solo sus ciudades, como puntos WebGL
+            puntos = map_points(towns, players_table, index, filas)
+            if capa == "Mi alianza":
+                puntos = puntos[puntos['ID_Alianza'] == alliance_id]
+            elif capa != "Todas":
+                puntos = puntos[puntos['Estado'] == capa]
+            colores = dict(MAP_COLORS)
+            color = puntos['Estado']
+            if alliance_id is not None:
+                propia = f"🛡️ {alliance_name}"
+                colores[propia] = '#667eea'
+                color = color.where(puntos['ID_Alianza'] != alliance_id, propia)
+            fig_mapa = px.scatter(
+                puntos, x='X', y='Y', color=color, color_discrete_map=colores, render_mode='webgl',
+                hover_name='Nombre_Ciudad', hover_data={'Jugador': True, 'Puntos_Ciudad': True, 'Coord_X': True,
+                                                         'Coord_Y': True, 'X': False, 'Y': False},
+                labels={'color': "Estado"},
+            )
+            fig_mapa.update_traces(marker=dict(size=6 if MAP_VIEWS[vista] == 1 else 4))
+            titulo = f"{len(puntos):,} ciudades en la ventana"
+        else:
+            # Todo el mapa (o una ventana con demasiadas ciudades): raster precalculado
+            nivel = tiles.level_for(caja[2] - caja[0] + 1, MAP_DETAIL[detalle])
+            if capa == "Mi alianza":
+                raster, xs, ys = tiles.raster(nivel, alliance=alliance_id, box=caja)
+            else:
+                raster, xs, ys = tiles.raster(nivel, status=None if capa == "Todas" else capa, box=caja)
+            z = raster.T.astype(float)
+            z[z == 0] = float('nan')
+            fig_mapa = go.Figure(go.Heatmap(
+                z=z, x=xs + nivel / 2, y=ys + nivel / 2, colorscale='Viridis', colorbar=dict(title="Ciudades"),
+                hovertemplate="x %{x:.0f}, y %{y:.0f}: %{z:.0f} ciudades<extra></extra>",
+            ))
+            titulo = f"Densidad de ciudades (celdas de {nivel}x{nivel} campos)"
+        fig_mapa.update_xaxes(range=[caja[0], caja[2] + 1], dtick=OCEAN_SIZE, showgrid=True, title=None)
+        fig_mapa.update_yaxes(range=[caja[3] + 1, caja[1]], dtick=OCEAN_SIZE, showgrid=True, title=None,
+                              scaleanchor='x', scaleratio=1)
+        fig_mapa.update_layout(title=titulo, height=650, plot_bgcolor='#0b1f3a')
+        return fig_mapa
+
+    # Raster o puntos: se reconstruyen solo al cambiar de snapshot o de vista
+    fig_mapa = cached_figure(('mapa', key, vista, capa, detalle, oceano, alliance_id, alliance_name), construir)
+    show_chart(fig_mapa, use_container_width=True)
+
+def format_days(dias):
+    """Días estimados como texto corto ("—" si no hay estimación)"""
+    if pd.isna(dias):
+        return "—"
+    if dias < 1:
+        return f"~{dias * 24:.0f} h"
+    return f"~{dias:.0f} día" if round(dias) == 1 else f"~{dias:.0f} días"
+
 # Funciones para cargar datos
-@st.cache_data(ttl=900)  # Cache por 15 minutos
-def load_grepolis_data():
-    """Carga y procesa datos de Grepolis ES137"""
+# GREPOLIS_WORLDS: mundos seguidos, separados por comas (el primero es el de por defecto)
+WORLDS = [w.strip().lower() for w in os.environ.get("GREPOLIS_WORLDS", "es137").split(",") if w.strip()]
+DATASET_LABELS = {
+    'players': "Jugadores", 'alliances': "Alianzas", 'towns': "Ciudades", 'conquers': "Conquistas",
+    'kills_att': "Ataque", 'kills_def': "Defensa", 'kills_all': "Combate",
+}
+PAGE_SIZES = [25, 50, 100, 250]
+CONQUEST_WINDOWS = {"24h": timedelta(hours=24), "7 días": timedelta(days=7), "30 días": timedelta(days=30), "Temporada": None}
+
+@st.cache_resource
+def get_fetcher(world):
+    """Sesión HTTP compartida para descargar los dumps de un mundo"""
+    # GREPOLIS_DATA_URL permite apuntar a un servidor local con dumps de prueba ({world} = carpeta del mundo)
+    return WorldFetcher(world, base_url=os.environ.get("GREPOLIS_DATA_URL"))
+
+@st.cache_resource
+def get_store():
+    """Almacén local de snapshots de los dumps"""
+    return SnapshotStore(os.environ.get("GREPOLIS_SNAPSHOT_DIR", "snapshots"))
+
+@st.cache_resource
+def get_scheduler(world):
+    """Planificador que descarga los dumps de un mundo en segundo plano tras cada publicación horaria"""
+    return RefreshScheduler(get_fetcher(world), get_store()).start()
+
+@RECORDER.cached('snapshot.read', st.cache_resource(max_entries=16 * len(WORLDS)))
+def load_snapshot(world, dataset, timestamp):
+    """Lee un snapshot concreto (la clave incluye el timestamp, no caduca).
+
+    Es un objeto compartido por todas las sesiones: se lee, nunca se modifica.
+    """
+    return get_store().read(world, dataset, timestamp)
+
+def _error_message(result):
+    if result.error:
+        return f"❌ Error: {result.error}"
+    return f"❌ Error de conexión: {result.status}"
+
+def load_grepolis_data(world, versiones):
+    """Carga los jugadores del mundo desde el snapshot en uso"""
     try:
-        with st.spinner("🔄 Conectando con servidores de Grepolis ES137..."):
-            url = "https://es137.grepolis.com/data/players.txt"
-            response = requests.get(url, timeout=30)
-            
-            if response.status_code == 200:
-                players_data = pd.read_csv(
-                    io.StringIO(response.text),
-                    sep=',',
-                    names=['ID', 'Nombre', 'ID_Alianza', 'Puntos', 'Ranking', 'Ciudades'],
-                    na_values=['']
-                )
-                
-                players_data = players_data.dropna(subset=['Nombre'])
-                players_data['ID_Alianza'] = players_data['ID_Alianza'].fillna(0)
-                players_data = players_data.sort_values('Ranking')
-                
-                return players_data, True, f"✅ Datos actualizados: {datetime.now().strftime('%H:%M:%S')}"
-            else:
-                return None, False, f"❌ Error de conexión: {response.status_code}"
+        timestamp = versiones['players']
+        
+        if timestamp is None:
+            # Primer arranque sin snapshots: no hay nada que servir, hay que esperar
+            with st.spinner(f"🔄 Conectando con servidores de Grepolis {world.upper()}..."):
+                results = get_scheduler(world).refresh()
+            versiones.update(get_scheduler(world).versions)
+            timestamp = versiones['players']
+            if timestamp is None:
+                return None, None, False, _error_message(results['players'])
+        
+        players_data = load_snapshot(world, 'players', timestamp)
+        return players_data, timestamp, True, f"✅ Datos del {timestamp.astimezone().strftime('%d/%m %H:%M:%S')}"
     
     except Exception as e:
-        return None, False, f"❌ Error: {str(e)}"
+        return None, None, False, f"❌ Error: {str(e)}"
 
-@st.cache_data(ttl=900)
-def load_alliance_data():
+def load_alliance_data(world, versiones):
     """Carga datos de alianzas"""
     try:
-        url = "https://es137.grepolis.com/data/alliance.txt"
-        response = requests.get(url, timeout=30)
-        
-        if response.status_code == 200:
-            if len(response.text.strip()) == 0:
-                return None
-            
-            alliance_data = pd.read_csv(
-                io.StringIO(response.text),
-                sep=',',
-                names=['ID_Alianza', 'Nombre_Alianza', 'Puntos_Alianza', 'Ranking_Alianza', 'Miembros']
-            )
-            
-            if len(alliance_data) == 0:
-                return None
-                
-            return alliance_data
-        else:
+        timestamp = versiones['alliances']
+        if timestamp is None:
             return None
+        return load_snapshot(world, 'alliances', timestamp)
     except Exception as e:
         return None
 
-@st.cache_data(ttl=900)
-def load_towns_data():
+def load_towns_data(world, versiones):
     """Carga datos de ciudades"""
     try:
-        url = "https://es137.grepolis.com/data/towns.txt"
-        response = requests.get(url, timeout=30)
-        
-        if response.status_code == 200:
-            towns_data = pd.read_csv(
-                io.StringIO(response.text),
-                sep=',',
-                names=['ID_Ciudad', 'Nombre_Ciudad', 'ID_Jugador', 'Coord_X', 'Coord_Y', 'Puntos_Ciudad']
-            )
-            return towns_data
-        else:
+        timestamp = versiones['towns']
+        if timestamp is None:
             return None
+        return load_snapshot(world, 'towns', timestamp)
     except:
         return None
 
-def simulate_activity_status(players_data):
-    """Simula estados de actividad basándose en datos disponibles"""
-    # Nota: Los datos reales de actividad no están disponibles en las APIs públicas
-    # Esta función simula estados basándose en patrones de puntuación y ranking
-    
-    players_with_status = players_data.copy()
-    
-    # Simular actividad basándose en algunos indicadores indirectos
-    def assign_status(row):
-        # Jugadores con más puntos y mejor ranking tienden a ser más activos
-        score = row['Puntos'] / 1000 + (len(players_data) - row['Ranking']) / 100
-        
-        # Añadir algo de aleatoriedad para simular
-        random_factor = random.random() * 0.3
-        final_score = score + random_factor
-        
-        if final_score > 8:
-            return "🟢 Activo", "Últimas 4h"
-        elif final_score > 5:
-            return "🟡 Reciente", "6-12h"
-        elif final_score > 2:
-            return "🟠 Inactivo", "12-24h"
-        else:
-            return "🔴 Offline", "+24h"
-    
-    status_data = players_with_status.apply(assign_status, axis=1, result_type='expand')
-    players_with_status['Estado'] = status_data[0]
-    players_with_status['Ultima_Actividad'] = status_data[1]
-    
-    return players_with_status
+@st.cache_resource
+def get_activity_tracker(world):
+    """Detector de actividad compartido, alimentado con los snapshots guardados"""
+    return ActivityTracker()
 
-# HEADER PRINCIPAL
-st.markdown('<h1 class="main-header">🏛️ GrepoIntel ES137 | R.D.M.P</h1>', unsafe_allow_html=True)
-st.markdown('<div class="success-box"><center>🚀 <b>Dashboard de Inteligencia Avanzada</b> 🚀<br><small>Desarrollado por: Im a New Rookie</small></center></div>', unsafe_allow_html=True)
+@RECORDER.cached('derive.activity', st.cache_resource(max_entries=4 * len(WORLDS)))
+def get_players_with_activity(world, players_ts, towns_ts):
+    """Jugadores con estado de actividad, calculado una sola vez por snapshot"""
+    return get_activity_tracker(world).classify_at(
+        get_store(), world, players_ts, load_snapshot(world, 'players', players_ts))
+
+@RECORDER.cached('derive.metrics', st.cache_resource(max_entries=4 * len(WORLDS)))
+def get_player_table(world, players_ts, towns_ts, kills_ts):
+    """Jugadores con actividad, puntos de combate y todas las métricas derivadas, una vez por snapshot.
+
+    ``kills_ts`` son las versiones de los dumps de ``KILL_COLUMNS``, en ese orden.
+    """
+    kills, previous = {}, {}
+    for dump, timestamp in zip(KILL_COLUMNS, kills_ts):
+        if timestamp is None:
+            continue
+        kills[dump] = load_snapshot(world, dump, timestamp)
+        anterior = get_store().previous_timestamp(world, dump, timestamp)
+        previous[dump] = load_snapshot(world, dump, anterior) if anterior is not None else None
+    players = add_kill_points(get_players_with_activity(world, players_ts, towns_ts), kills, previous)
+    return add_player_metrics(players)
+
+@RECORDER.cached('derive.town_status', st.cache_resource(max_entries=4 * len(WORLDS)))
+def get_town_status_counts(world, players_ts, towns_ts, kills_ts):
+    """Ciudades por estado de su dueño, una vez por snapshot"""
+    return town_status_counts(load_snapshot(world, 'towns', towns_ts), get_player_table(world, players_ts, towns_ts, kills_ts))
+
+@RECORDER.cached('derive.town_grid', st.cache_resource(max_entries=2 * len(WORLDS)))
+def get_town_grid(world, towns_ts):
+    """Índice espacial de las ciudades, construido una vez por snapshot"""
+    return TownGrid(load_snapshot(world, 'towns', towns_ts))
+
+@RECORDER.cached('derive.oceans', st.cache_resource(max_entries=4 * len(WORLDS)))
+def get_ocean_summary(world, players_ts, towns_ts):
+    """Ciudades, puntos y alianzas por océano, una vez por snapshot"""
+    return ocean_summary(load_snapshot(world, 'towns', towns_ts), load_snapshot(world, 'players', players_ts))
+
+@RECORDER.cached('derive.dominance', st.cache_resource(max_entries=4 * len(WORLDS)))
+def get_ocean_dominance(world, players_ts, towns_ts):
+    """Matriz alianza x océano de ciudades y puntos, una vez por snapshot"""
+    return OceanDominance(load_snapshot(world, 'towns', towns_ts), load_snapshot(world, 'players', players_ts))
+
+def get_previous_dominance(world, players_ts, towns_ts):
+    """Matriz del snapshot anterior y su fecha, o None si es el primero.
+
+    Es la misma entrada de caché que se calculó cuando ese snapshot era el último.
+    """
+    store = get_store()
+    towns_antes = store.previous_timestamp(world, 'towns', towns_ts)
+    if towns_antes is None:
+        return None
+    players_antes = store.previous_timestamp(world, 'players', players_ts) or players_ts
+    return get_ocean_dominance(world, players_antes, towns_antes), towns_antes
+
+@RECORDER.cached('derive.dominance_changes', st.cache_resource(max_entries=2 * len(WORLDS)))
+def get_ocean_changes(world, players_ts, towns_ts):
+    """Territorio ganado y perdido frente al snapshot anterior (None si es el primero)"""
+    anterior = get_previous_dominance(world, players_ts, towns_ts)
+    if anterior is None:
+        return None
+    return get_ocean_dominance(world, players_ts, towns_ts).changes(anterior[0])
+
+@RECORDER.cached('derive.index', st.cache_resource(max_entries=4 * len(WORLDS)))
+def get_player_index(world, players_ts, towns_ts, kills_ts, alliances_ts):
+    """Índices de nombre, ID, alianza y ranking, construidos una vez por snapshot"""
+    alliance_data = load_snapshot(world, 'alliances', alliances_ts) if alliances_ts is not None else None
+    return PlayerIndex(get_player_table(world, players_ts, towns_ts, kills_ts), alliance_data)
+
+@RECORDER.cached('derive.rank_gaps', st.cache_resource(max_entries=4 * len(WORLDS)))
+def get_rank_gaps(world, players_ts, towns_ts, kills_ts):
+    """Puntos para subir cada salto de ranking de todos los jugadores, una vez por snapshot"""
+    return RankGaps(get_player_table(world, players_ts, towns_ts, kills_ts))
+
+@RECORDER.cached('derive.player_pages', st.cache_resource(max_entries=4 * len(WORLDS)))
+def get_player_pages(world, players_ts, towns_ts, kills_ts):
+    """Órdenes de la lista de jugadores por columna y estado, una vez por snapshot"""
+    return player_pages(get_player_table(world, players_ts, towns_ts, kills_ts))
+
+@RECORDER.cached('derive.town_pages', st.cache_resource(max_entries=2 * len(WORLDS)))
+def get_town_pages(world, players_ts, towns_ts, kills_ts):
+    """Órdenes de todas las ciudades por columna y estado del dueño, una vez por snapshot"""
+    return town_pages(load_snapshot(world, 'towns', towns_ts), get_player_table(world, players_ts, towns_ts, kills_ts))
+
+@RECORDER.cached('derive.tiles', st.cache_resource(max_entries=2 * len(WORLDS)))
+def get_density_tiles(world, players_ts, towns_ts, kills_ts, alliances_ts):
+    """Rasters de densidad del mapa a todos los niveles de zoom, una vez por snapshot"""
+    return DensityTiles(
+        load_snapshot(world, 'towns', towns_ts),
+        get_player_table(world, players_ts, towns_ts, kills_ts),
+        get_player_index(world, players_ts, towns_ts, kills_ts, alliances_ts),
+    )
+
+@RECORDER.cached('derive.alliances', st.cache_resource(max_entries=4 * len(WORLDS)))
+def get_alliance_summary(world, players_ts, towns_ts, kills_ts, alliances_ts):
+    """Estadísticas de todas las alianzas en una pasada, una vez por snapshot"""
+    alliance_data = load_snapshot(world, 'alliances', alliances_ts) if alliances_ts is not None else None
+    return alliance_summary(get_player_table(world, players_ts, towns_ts, kills_ts), alliance_data)
+
+@st.cache_resource
+def get_history():
+    """Historial de jugadores y alianzas, junto a los snapshots"""
+    return HistoryStore(get_store().root)
+
+@RECORDER.cached('derive.growth', st.cache_resource(max_entries=2 * len(WORLDS)))
+def get_growth_rates(world, players_ts, alliances_ts):
+    """Ritmo de los últimos 7 días de todos los jugadores y alianzas, una vez por snapshot"""
+    historial = get_history()
+    historial.sync(get_store(), world)
+    desde = players_ts - GROWTH_WINDOWS['7d'] - timedelta(hours=1)
+    jugadores = growth_rates(historial.read(world, 'players', start=desde), 'players')
+    alianzas = growth_rates(historial.read(world, 'alliances', start=desde), 'alliances')
+    return jugadores, alianzas
+
+@RECORDER.cached('derive.series', st.cache_resource(max_entries=32 * len(WORLDS)))
+def get_entity_series(world, kind, entity_id, players_ts, alliances_ts):
+    """Serie completa de un jugador o alianza (el historial ya sincronizado con ese snapshot)"""
+    get_growth_rates(world, players_ts, alliances_ts)
+    return entity_series(get_history(), world, kind, entity_id)
+
+@st.cache_resource
+def get_conquest_log():
+    """Registro de conquistas de solo-añadir, junto a los snapshots"""
+    return ConquestLog(get_store().root)
+
+@RECORDER.cached('derive.conquests', st.cache_resource(max_entries=2 * len(WORLDS)))
+def get_conquest_index(world, conquers_ts):
+    """Conquistas de la temporada indexadas por ciudad, jugador, alianza y tiempo, una vez por versión"""
+    return ConquestIndex(get_conquest_log().read(world))
+
+def conquest_start(conquers_ts, ventana):
+    """Inicio de la ventana contado desde la última descarga de conquistas (None = toda la temporada)"""
+    duracion = CONQUEST_WINDOWS[ventana]
+    return None if duracion is None else conquers_ts - duracion
+
+@RECORDER.cached('derive.search', st.cache_resource(max_entries=4 * len(WORLDS)))
+def get_search_index(world, dataset, timestamp):
+    """Índice de nombres de jugadores, alianzas o ciudades, ordenado por relevancia"""
+    data = load_snapshot(world, dataset, timestamp)
+    if dataset == 'players':
+        return NameSearchIndex(data['Nombre'], priority=data['Ranking'].to_numpy())
+    if dataset == 'alliances':
+        return NameSearchIndex(data['Nombre_Alianza'], priority=data['Ranking_Alianza'].to_numpy())
+    # Ciudades: primero las de más puntos
+    return NameSearchIndex(data['Nombre_Ciudad'], priority=-data['Puntos_Ciudad'].to_numpy(dtype='int64'))
 
 # SIDEBAR - CONFIGURACIÓN Y NAVEGACIÓN
 st.sidebar.title("⚙️ Centro de Comando")
+# Cada mundo tiene sus propias cachés, snapshots e índices (la clave lleva el mundo)
+if len(WORLDS) > 1:
+    world = st.sidebar.selectbox("🌐 Mundo", WORLDS, format_func=str.upper)
+else:
+    world = WORLDS[0]
 st.sidebar.markdown("---")
 
+# HEADER PRINCIPAL
+st.markdown(f'<h1 class="main-header">🏛️ GrepoIntel {world.upper()} | R.D.M.P</h1>', unsafe_allow_html=True)
+st.markdown('<div class="success-box"><center>🚀 <b>Dashboard de Inteligencia Avanzada</b> 🚀<br><small>Desarrollado por: Im a New Rookie</small></center></div>', unsafe_allow_html=True)
+
 # Configuración personal
 st.sidebar.subheader("👤 Configuración Personal")
-mi_jugador = st.sidebar.text_input("🎮 Tu nombre de jugador", value="Im+a+New+Rookie")
+mi_jugador = st.sidebar.text_input("🎮 Tu nombre de jugador", value="Im a New Rookie")
 mi_alianza_id = st.sidebar.number_input("🛡️ ID de tu Alianza", min_value=0, value=182, step=1)
 
 st.sidebar.markdown("---")
@@ -209,18 +490,42 @@ tab_selection = st.sidebar.radio(
 
 st.sidebar.markdown("---")
 
-# Botón de actualización
-if st.sidebar.button("🔄 ACTUALIZAR DATOS", type="primary", use_container_width=True):
-    st.cache_data.clear()
-    st.rerun()
+# Actualización por dataset, en segundo plano (no bloquea ni vacía cachés)
+scheduler = get_scheduler(world)
+# Versiones fijas durante todo el rerun aunque el planificador cambie a otras
+versiones = dict(scheduler.versions)
+
+datasets_refresco = st.sidebar.multiselect(
+    "📦 Datos a actualizar",
+    list(DATASET_LABELS),
+    default=list(DATASET_LABELS),
+    format_func=DATASET_LABELS.get
+)
+if st.sidebar.button("🔄 ACTUALIZAR DATOS", type="primary", use_container_width=True, disabled=not datasets_refresco):
+    scheduler.request(datasets_refresco)
+    st.sidebar.success("⏳ Actualización en segundo plano: los datos nuevos aparecerán al recargar")
 
-# Mostrar hora de última actualización
-st.sidebar.info(f"🕒 Última actualización: {datetime.now().strftime('%H:%M:%S')}")
+# Mostrar hora de los snapshots en uso
+for dataset, etiqueta in DATASET_LABELS.items():
+    version = versiones[dataset]
+    if version is None:
+        continue
+    estado = scheduler.status[dataset]
+    linea = f"🕒 {etiqueta}: {version.astimezone().strftime('%H:%M:%S')}"
+    if estado.error or (estado.status not in (None, 200, 304)):
+        linea += f" · ⚠️ {estado.error or estado.status}"
+    if scheduler.is_stale(dataset):
+        # Se sigue sirviendo el snapshot anterior mientras llega el nuevo
+        linea += " · ⏳ actualizando"
+        scheduler.revalidate([dataset])
+    st.sidebar.caption(linea)
+if scheduler.next_run is not None:
+    st.sidebar.caption(f"⏭️ Próxima descarga: {scheduler.next_run.astimezone().strftime('%H:%M')}")
 
 # CARGAR DATOS
-players_data, success, message = load_grepolis_data()
-alliance_data = load_alliance_data()
-towns_data = load_towns_data()
+players_data, players_ts, success, message = load_grepolis_data(world, versiones)
+alliance_data = load_alliance_data(world, versiones)
+towns_data = load_towns_data(world, versiones)
 
 # Mostrar estado de conexión
 if success:
@@ -230,13 +535,23 @@ else:
     st.stop()
 
 # Procesar datos con estados de actividad
-players_with_activity = simulate_activity_status(players_data)
+towns_ts = versiones['towns']
+conquers_ts = versiones['conquers']
+kills_ts = tuple(versiones[dump] for dump in KILL_COLUMNS)
+players_with_activity = get_player_table(world, players_ts, towns_ts, kills_ts)
+jugadores_medidos = int(players_with_activity['Actividad_Medida'].sum())
+alliances_ts = versiones['alliances'] if alliance_data is not None else None
+indice = get_player_index(world, players_ts, towns_ts, kills_ts, alliances_ts)
+resumen_alianzas = get_alliance_summary(world, players_ts, towns_ts, kills_ts, alliances_ts)
+saltos = get_rank_gaps(world, players_ts, towns_ts, kills_ts)
+# Versión de todo lo que se pinta: con ella, la pestaña y los widgets se reutilizan figuras y tablas
+snapshot_id = (world, players_ts, towns_ts, kills_ts, alliances_ts, conquers_ts)
 
 # =============================================================================
 # PESTAÑA: SERVIDOR
 # =============================================================================
 if tab_selection == "🌍 SERVIDOR":
-    st.header("🌍 Información del Servidor ES137")
+    st.header(f"🌍 Información del Servidor {world.upper()}")
     
     # Estado General de Ciudades
     st.subheader("🏘️ Estado General de Ciudades")
@@ -245,18 +560,13 @@ if tab_selection == "🌍 SERVIDOR":
         # Calcular estadísticas de ciudades
         total_cities = len(towns_data)
         
-        # Simular estados de ciudades basándose en jugadores
-        cities_with_status = towns_data.merge(
-            players_with_activity[['ID', 'Estado']], 
-            left_on='ID_Jugador', 
-            right_on='ID', 
-            how='left'
-        )
+        # Cada ciudad toma el estado de su dueño (precalculado por snapshot)
+        ciudades_por_estado = get_town_status_counts(world, players_ts, towns_ts, kills_ts)
         
         # Ciudades por estado
-        activas = len(cities_with_status[cities_with_status['Estado'] == '🟢 Activo'])
-        vacaciones = len(cities_with_status[cities_with_status['Estado'] == '🟡 Reciente'])  # Simular vacaciones
-        fantasma = len(cities_with_status[cities_with_status['Estado'].isin(['🟠 Inactivo', '🔴 Offline'])])
+        activas = ciudades_por_estado['🟢 Activo']
+        vacaciones = ciudades_por_estado['🟡 Reciente']  # Simular vacaciones
+        fantasma = ciudades_por_estado['🟠 Inactivo'] + ciudades_por_estado['🔴 Offline'] + ciudades_por_estado[GHOST_LABEL]
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -272,29 +582,156 @@ if tab_selection == "🌍 SERVIDOR":
         with col4:
             st.metric("👻 Fantasma", f"{fantasma:,}", delta=f"{fantasma/total_cities*100:.1f}%")
         
-        # Gráfico de distribución de ciudades
-        fig_cities = px.pie(
+        # Gráfico de distribución de ciudades (solo depende del snapshot)
+        fig_cities = cached_figure(('ciudades',), lambda: px.pie(
             values=[activas, vacaciones, fantasma],
             names=['Activas', 'Vacaciones', 'Fantasma'],
             title="Distribución de Estados de Ciudades",
             color_discrete_sequence=['#28a745', '#ffc107', '#dc3545']
+        ))
+        show_chart(fig_cities, use_container_width=True)
+        
+        # Océanos con más ciudades
+        st.write("**🌊 Océanos más poblados:**")
+        
+        def tabla_oceanos():
+            oceanos = get_ocean_summary(world, players_ts, towns_ts).nlargest(10, 'Ciudades').reset_index()
+            if alliance_data is not None:
+                nombres_alianza = alliance_data.set_index('ID_Alianza')['Nombre_Alianza']
+                oceanos['Dominante'] = oceanos['Alianza_Dominante'].map(nombres_alianza).fillna("Sin alianza")
+            else:
+                oceanos['Dominante'] = oceanos['Alianza_Dominante'].apply(lambda x: "Sin alianza" if x == 0 else f"ID: {x}")
+            oceanos['Oceano'] = "O" + oceanos['Oceano'].astype(str).str.zfill(2)
+            return oceanos[['Oceano', 'Ciudades', 'Puntos', 'Jugadores', 'Alianzas', 'Fantasma', 'Dominante', 'Cuota_Dominante']]
+        
+        show_dataframe(
+            cached_table(('oceanos',), tabla_oceanos),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Oceano": st.column_config.TextColumn("🌊 Océano"),
+                "Ciudades": st.column_config.NumberColumn("🏘️ Ciudades", format="%d"),
+                "Puntos": st.column_config.NumberColumn("💰 Puntos", format="%d"),
+                "Jugadores": st.column_config.NumberColumn("👥 Jugadores", format="%d"),
+                "Alianzas": st.column_config.NumberColumn("🛡️ Alianzas", format="%d"),
+                "Fantasma": st.column_config.NumberColumn("👻 Fantasma", format="%d"),
+                "Dominante": st.column_config.TextColumn("👑 Alianza Dominante"),
+                "Cuota_Dominante": st.column_config.ProgressColumn("📊 Cuota", min_value=0, max_value=1, format="%.2f")
+            }
         )
-        st.plotly_chart(fig_cities, use_container_width=True)
     
     else:
         st.warning("❌ No se pudieron cargar los datos de ciudades")
     
     st.markdown("---")
     
+    # Dominio de océanos: alianzas x océanos (matriz precalculada por snapshot)
+    st.subheader("🗺️ Dominio de Océanos por Alianza")
+    
+    if towns_data is not None:
+        dominio = get_ocean_dominance(world, players_ts, towns_ts)
+        anterior = get_previous_dominance(world, players_ts, towns_ts)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            n_alianzas_mapa = st.slider("Alianzas a mostrar:", min_value=5, max_value=30, value=15, step=5)
+        with col2:
+            vistas_dominio = ["Cuota de puntos", "Ciudades"] + (["Cambio de ciudades"] if anterior is not None else [])
+            vista_dominio = st.selectbox("Valor:", vistas_dominio)
+        
+        ids_mapa = dominio.top(n_alianzas_mapa)
+        con_ciudades = dominio.ocean_towns > 0
+        if alliance_data is not None:
+            nombres_alianza = alliance_data.set_index('ID_Alianza')['Nombre_Alianza']
+            etiquetas = [nombres_alianza.get(a, f"ID: {a}") for a in ids_mapa]
+        else:
+            etiquetas = [f"ID: {a}" for a in ids_mapa]
+        
+        if len(ids_mapa) == 0:
+            st.info("Ninguna alianza tiene ciudades en el mapa")
+        else:
+            def figura_dominio():
+                if vista_dominio == "Cuota de puntos":
+                    valores, escala, centro, formato = dominio.matrix(ids_mapa, 'share') * 100, 'Blues', None, '.0f'
+                elif vista_dominio == "Ciudades":
+                    valores, escala, centro, formato = dominio.matrix(ids_mapa, 'towns'), 'Blues', None, 'd'
+                else:
+                    valores = dominio.matrix(ids_mapa, 'towns') - anterior[0].matrix(ids_mapa, 'towns')
+                    escala, centro, formato = 'RdBu', 0, 'd'
+                fig_dominio = px.imshow(
+                    valores[:, con_ciudades],
+                    x=["O" + str(o).zfill(2) for o, hay in enumerate(con_ciudades) if hay],
+                    y=etiquetas,
+                    color_continuous_scale=escala,
+                    color_continuous_midpoint=centro,
+                    text_auto=formato,
+                    aspect='auto',
+                    labels=dict(x="Océano", y="Alianza", color=vista_dominio),
+                    title=f"{vista_dominio} por océano",
+                )
+                fig_dominio.update_layout(height=max(300, 28 * len(ids_mapa) + 120))
+                return fig_dominio
+            
+            fig_dominio = cached_figure(('dominio', n_alianzas_mapa, vista_dominio), figura_dominio)
+            show_chart(fig_dominio, use_container_width=True)
+        
+        if anterior is not None:
+            tabla_cambios, desde = get_ocean_changes(world, players_ts, towns_ts), anterior[1]
+            st.write(f"**🔄 Territorio ganado y perdido desde {desde.strftime('%d/%m %H:%M')} UTC:**")
+            if len(tabla_cambios) == 0:
+                st.info("Ninguna alianza ha ganado ni perdido ciudades entre los dos snapshots")
+            else:
+                def tabla_territorio():
+                    territorio = tabla_cambios.head(20).copy()
+                    if alliance_data is not None:
+                        territorio['Alianza'] = territorio['ID_Alianza'].map(nombres_alianza).fillna("Desconocida")
+                    else:
+                        territorio['Alianza'] = "ID: " + territorio['ID_Alianza'].astype(str)
+                    territorio['Oceano'] = "O" + territorio['Oceano'].astype(str).str.zfill(2)
+                    return territorio[['Alianza', 'Oceano', 'Ciudades_Antes', 'Ciudades', 'Cambio_Ciudades', 'Cuota', 'Cambio_Cuota']]
+                
+                show_dataframe(
+                    cached_table(('territorio',), tabla_territorio),
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "Alianza": st.column_config.TextColumn("🛡️ Alianza"),
+                        "Oceano": st.column_config.TextColumn("🌊 Océano"),
+                        "Ciudades_Antes": st.column_config.NumberColumn("🏘️ Antes", format="%d"),
+                        "Ciudades": st.column_config.NumberColumn("🏘️ Ahora", format="%d"),
+                        "Cambio_Ciudades": st.column_config.NumberColumn("🔄 Cambio", format="%+d"),
+                        "Cuota": st.column_config.ProgressColumn("📊 Cuota", min_value=0, max_value=1, format="%.2f"),
+                        "Cambio_Cuota": st.column_config.NumberColumn("📈 Cambio Cuota", format="%+.3f"),
+                    }
+                )
+    else:
+        st.warning("❌ No se pudieron cargar los datos de ciudades")
+    
+    st.markdown("---")
+    
+    # Mapa del mundo: rasters precalculados por snapshot; puntos WebGL al acercarse
+    st.subheader("🌐 Mapa del Mundo")
+    
+    if towns_data is not None:
+        show_world_map(
+            get_density_tiles(world, players_ts, towns_ts, kills_ts, alliances_ts), get_town_grid(world, towns_ts),
+            towns_data, players_with_activity, indice, key="mapa_servidor",
+            default_ocean=int(get_ocean_dominance(world, players_ts, towns_ts).ocean_towns.argmax()),
+        )
+    else:
+        st.warning("❌ No se pudieron cargar los datos de ciudades")
+    
+    st.markdown("---")
+    
     # Estado de Jugadores
     st.subheader("👥 Estado de Jugadores")
     
     # Métricas de jugadores
     total_players = len(players_with_activity)
-    active_players = len(players_with_activity[players_with_activity['Estado'] == '🟢 Activo'])
-    recent_players = len(players_with_activity[players_with_activity['Estado'] == '🟡 Reciente'])
-    inactive_players = len(players_with_activity[players_with_activity['Estado'] == '🟠 Inactivo'])
-    offline_players = len(players_with_activity[players_with_activity['Estado'] == '🔴 Offline'])
+    active_players = indice.status_counts.get('🟢 Activo', 0)
+    recent_players = indice.status_counts.get('🟡 Reciente', 0)
+    inactive_players = indice.status_counts.get('🟠 Inactivo', 0)
+    offline_players = indice.status_counts.get('🔴 Offline', 0)
     
     col1, col2, col3, col4, col5 = st.columns(5)
     
@@ -313,49 +750,41 @@ if tab_selection == "🌍 SERVIDOR":
     with col5:
         st.metric("🔴 Offline", f"{offline_players:,}", delta="> 24h")
     
+    st.caption(
+        f"📡 Estado medido por cambios de puntos entre snapshots para {jugadores_medidos:,} de "
+        f"{total_players:,} jugadores; el resto se estima hasta acumular historial."
+    )
+    
     # Filtros para la lista de jugadores
     st.subheader("🔍 Lista de Jugadores con Filtros")
     
+    paginas_jugadores = get_player_pages(world, players_ts, towns_ts, kills_ts)
     col1, col2, col3 = st.columns(3)
     
     with col1:
         filter_status = st.selectbox(
             "📊 Filtrar por estado:",
-            ["Todos", "🟢 Activos", "🟡 Recientes", "🟠 Inactivos", "🔴 Offline"]
+            ["Todos", *STATUS_LABELS]
         )
     
     with col2:
         sort_by = st.selectbox(
             "📈 Ordenar por:",
-            ["Ranking", "Nombre", "Puntos", "Estado"]
+            paginas_jugadores.sorts
         )
     
     with col3:
-        max_players = st.slider("📋 Mostrar jugadores:", 10, 100, 50)
-    
-    # Aplicar filtros
-    filtered_players = players_with_activity.copy()
-    
-    if filter_status != "Todos":
-        filtered_players = filtered_players[filtered_players['Estado'] == filter_status]
-    
-    # Ordenar
-    if sort_by == "Ranking":
-        filtered_players = filtered_players.sort_values('Ranking')
-    elif sort_by == "Nombre":
-        filtered_players = filtered_players.sort_values('Nombre')
-    elif sort_by == "Puntos":
-        filtered_players = filtered_players.sort_values('Puntos', ascending=False)
-    elif sort_by == "Estado":
-        filtered_players = filtered_players.sort_values('Estado')
-    
-    # Mostrar tabla
-    display_players = filtered_players.head(max_players)[['Ranking', 'Nombre', 'Puntos', 'Ciudades', 'Estado', 'Ultima_Actividad']]
-    display_players['Ranking'] = display_players['Ranking'].astype(int)
-    display_players['Puntos'] = display_players['Puntos'].astype(int)
-    display_players['Ciudades'] = display_players['Ciudades'].astype(int)
-    
-    st.dataframe(
+        page_size = st.selectbox("📋 Jugadores por página:", PAGE_SIZES, index=1)
+    
+    # Cada página es un slice del orden precalculado: no se ordena nada en el rerun
+    estado_elegido = None if filter_status == "Todos" else filter_status
+    pagina = page_selector(paginas_jugadores, sort_by, page_size, estado_elegido, key=f"pagina_jugadores_{world}")
+    display_players = cached_table(
+        ('jugadores', sort_by, estado_elegido, page_size, pagina),
+        lambda: players_with_activity.iloc[paginas_jugadores.page(sort_by, pagina, page_size, estado_elegido)][PLAYER_PAGE_COLUMNS],
+    )
+    
+    show_dataframe(
         display_players,
         use_container_width=True,
         hide_index=True,
@@ -369,33 +798,62 @@ if tab_selection == "🌍 SERVIDOR":
         }
     )
     
+    if towns_data is not None:
+        st.subheader("🗺️ Explorador de Ciudades")
+        paginas_ciudades = get_town_pages(world, players_ts, towns_ts, kills_ts)
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            filtro_ciudades = st.selectbox(
+                "📊 Estado del dueño:",
+                ["Todos", *STATUS_LABELS, GHOST_LABEL],
+                key="filtro_ciudades"
+            )
+        
+        with col2:
+            orden_ciudades = st.selectbox("📈 Ordenar ciudades por:", paginas_ciudades.sorts)
+        
+        with col3:
+            tamano_ciudades = st.selectbox("📋 Ciudades por página:", PAGE_SIZES, index=1, key="tamano_ciudades")
+        
+        estado_ciudades = None if filtro_ciudades == "Todos" else filtro_ciudades
+        pagina_ciudades = page_selector(
+            paginas_ciudades, orden_ciudades, tamano_ciudades, estado_ciudades, key=f"pagina_ciudades_{world}"
+        )
+        ciudades_pagina = cached_table(
+            ('ciudades_pagina', orden_ciudades, estado_ciudades, tamano_ciudades, pagina_ciudades),
+            lambda: town_page(
+                towns_data, players_with_activity, indice,
+                paginas_ciudades.page(orden_ciudades, pagina_ciudades, tamano_ciudades, estado_ciudades),
+            ),
+        )
+        
+        show_dataframe(
+            ciudades_pagina,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Nombre_Ciudad": st.column_config.TextColumn("🏘️ Ciudad"),
+                "Jugador": st.column_config.TextColumn("👤 Dueño"),
+                "Estado": st.column_config.TextColumn("📊 Estado"),
+                "Puntos_Ciudad": st.column_config.NumberColumn("💰 Puntos", format="%d"),
+                "Oceano": st.column_config.NumberColumn("🌊 Océano", format="O%02d"),
+                "Coord_X": st.column_config.NumberColumn("X", format="%d"),
+                "Coord_Y": st.column_config.NumberColumn("Y", format="%d")
+            }
+        )
+    
     st.markdown("---")
     
     # Top 10 Jugadores
     st.subheader("🏆 Top 10 Jugadores del Servidor")
     
-    top_10 = players_data.head(10).copy()
-    
-    # Agregar información de alianza
-    if alliance_data is not None:
-        top_10 = top_10.merge(
-            alliance_data[['ID_Alianza', 'Nombre_Alianza']], 
-            on='ID_Alianza', 
-            how='left'
-        )
-        top_10['Alianza'] = top_10['Nombre_Alianza'].fillna("Sin alianza")
-    else:
-        top_10['Alianza'] = top_10['ID_Alianza'].apply(
-            lambda x: "Sin alianza" if x == 0 else f"ID: {x:.0f}"
-        )
-    
-    # Mostrar top 10
-    top_10_display = top_10[['Ranking', 'Nombre', 'Puntos', 'Alianza']]
-    top_10_display['Ranking'] = top_10_display['Ranking'].astype(int)
-    top_10_display['Puntos'] = top_10_display['Puntos'].astype(int)
+    # Top 10 con el nombre de su alianza
+    top_10 = cached_table(('top10',), lambda: top_players(players_data, alliance_data, 10))
     
-    st.dataframe(
-        top_10_display,
+    show_dataframe(
+        top_10,
         use_container_width=True,
         hide_index=True,
         column_config={
@@ -413,14 +871,14 @@ elif tab_selection == "🛡️ ALIANZA":
     st.header("🛡️ R.D.M.P - Centro de Comando")
     
     # Obtener miembros de R.D.M.P (ID 182)
-    miembros_rdmp = players_with_activity[players_with_activity['ID_Alianza'] == mi_alianza_id].copy()
+    miembros_rdmp = players_with_activity.iloc[indice.alliance_rows(mi_alianza_id)]
     
     if len(miembros_rdmp) > 0:
         # Información general de R.D.M.P
         if alliance_data is not None:
-            mi_alianza_data = alliance_data[alliance_data['ID_Alianza'] == mi_alianza_id]
-            if not mi_alianza_data.empty:
-                alianza = mi_alianza_data.iloc[0]
+            fila_alianza = indice.alliance_row(mi_alianza_id)
+            if fila_alianza is not None:
+                alianza = alliance_data.iloc[fila_alianza]
                 nombre_alianza = alianza['Nombre_Alianza']
                 ranking_alianza = int(alianza['Ranking_Alianza'])
                 puntos_alianza = int(alianza['Puntos_Alianza'])
@@ -461,16 +919,7 @@ elif tab_selection == "🛡️ ALIANZA":
         # Análisis de efectividad militar
         st.subheader("⚔️ Análisis Militar de R.D.M.P")
         
-        # Clasificar miembros por capacidad militar
-        miembros_rdmp['Categoria_Militar'] = pd.cut(
-            miembros_rdmp['Puntos'],
-            bins=[0, 1000, 3000, 6000, 15000, float('inf')],
-            labels=['🟥 Recluta', '🟨 Soldado', '🟦 Veterano', '🟪 Elite', '🟫 Legendario']
-        )
-        
-        # Calcular potencial militar estimado
-        miembros_rdmp['Potencial_Militar'] = (miembros_rdmp['Puntos'] * 0.6 + miembros_rdmp['Ciudades'] * 200).astype(int)
-        
+        # Categoria_Militar y Potencial_Militar ya vienen calculados para todo el servidor
         col1, col2 = st.columns(2)
         
         with col1:
@@ -491,6 +940,23 @@ elif tab_selection == "🛡️ ALIANZA":
                 porcentaje = (count / len(miembros_rdmp)) * 100
                 st.write(f"{estado}: {count} miembros ({porcentaje:.1f}%)")
         
+        # Combates reales de los dumps de puntos de ataque y defensa (sumados una vez por snapshot)
+        if mi_alianza_id in resumen_alianzas.index:
+            combates = resumen_alianzas.loc[mi_alianza_id]
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("⚔️ Puntos de Ataque", f"{int(combates['Puntos_Ataque']):,}",
+                          delta=f"+{int(combates['Delta_Puntos_Ataque']):,}")
+            with col2:
+                st.metric("🛡️ Puntos de Defensa", f"{int(combates['Puntos_Defensa']):,}",
+                          delta=f"+{int(combates['Delta_Puntos_Defensa']):,}")
+            with col3:
+                st.metric("🔥 Combatiendo", f"{int(combates['En_Combate'])}", help="Miembros con puntos de combate nuevos desde el snapshot anterior")
+            with col4:
+                ataque_total = int(resumen_alianzas['Puntos_Ataque'].sum())
+                cuota = combates['Puntos_Ataque'] / ataque_total * 100 if ataque_total else 0
+                st.metric("🌍 Cuota de Ataque", f"{cuota:.1f}%")
+        
         st.markdown("---")
         
         # Tabla detallada de miembros con información militar
@@ -514,43 +980,48 @@ elif tab_selection == "🛡️ ALIANZA":
         with col3:
             ordenar_por = st.selectbox(
                 "📈 Ordenar por:",
-                ["Puntos", "Ranking", "Potencial Militar", "Ciudades", "Nombre"]
+                ["Puntos", "Ranking", "Potencial Militar", "Ataque", "Defensa", "Combatiendo", "Ciudades", "Nombre"]
             )
         
-        # Aplicar filtros
-        miembros_filtrados = miembros_rdmp.copy()
-        
-        if filtro_categoria != "Todos":
-            miembros_filtrados = miembros_filtrados[miembros_filtrados['Categoria_Militar'] == filtro_categoria]
-        
-        if filtro_estado != "Todos":
-            miembros_filtrados = miembros_filtrados[miembros_filtrados['Estado'] == filtro_estado]
-        
-        # Ordenar
-        if ordenar_por == "Puntos":
-            miembros_filtrados = miembros_filtrados.sort_values('Puntos', ascending=False)
-        elif ordenar_por == "Ranking":
-            miembros_filtrados = miembros_filtrados.sort_values('Ranking')
-        elif ordenar_por == "Potencial Militar":
-            miembros_filtrados = miembros_filtrados.sort_values('Potencial_Militar', ascending=False)
-        elif ordenar_por == "Ciudades":
-            miembros_filtrados = miembros_filtrados.sort_values('Ciudades', ascending=False)
-        elif ordenar_por == "Nombre":
-            miembros_filtrados = miembros_filtrados.sort_values('Nombre')
-        
-        # Preparar tabla para mostrar
-        tabla_miembros = miembros_filtrados[[
-            'Ranking', 'Nombre', 'Puntos', 'Ciudades', 'Categoria_Militar', 
-            'Estado', 'Potencial_Militar'
-        ]].copy()
-        
-        # Formatear números
-        tabla_miembros['Ranking'] = tabla_miembros['Ranking'].astype(int)
-        tabla_miembros['Puntos'] = tabla_miembros['Puntos'].astype(int)
-        tabla_miembros['Ciudades'] = tabla_miembros['Ciudades'].astype(int)
-        
-        # Cambiar nombres de columnas
-        tabla_miembros.columns = ['Ranking', 'Nombre', 'Puntos', 'Ciudades', 'Categoría', 'Estado', 'Pot. Militar']
+        # Filtrar, ordenar y formatear: se rehace solo al cambiar de snapshot, alianza o filtros
+        def tabla_roster():
+            miembros_filtrados = miembros_rdmp
+            
+            if filtro_categoria != "Todos":
+                miembros_filtrados = miembros_filtrados[miembros_filtrados['Categoria_Militar'] == filtro_categoria]
+            
+            if filtro_estado != "Todos":
+                miembros_filtrados = miembros_filtrados[miembros_filtrados['Estado'] == filtro_estado]
+            
+            # Ordenar
+            if ordenar_por == "Puntos":
+                miembros_filtrados = miembros_filtrados.sort_values('Puntos', ascending=False)
+            elif ordenar_por == "Ranking":
+                miembros_filtrados = miembros_filtrados.sort_values('Ranking')
+            elif ordenar_por == "Potencial Militar":
+                miembros_filtrados = miembros_filtrados.sort_values('Potencial_Militar', ascending=False)
+            elif ordenar_por == "Ataque":
+                miembros_filtrados = miembros_filtrados.sort_values('Puntos_Ataque', ascending=False)
+            elif ordenar_por == "Defensa":
+                miembros_filtrados = miembros_filtrados.sort_values('Puntos_Defensa', ascending=False)
+            elif ordenar_por == "Combatiendo":
+                miembros_filtrados = miembros_filtrados.sort_values('Delta_Puntos_Combate', ascending=False)
+            elif ordenar_por == "Ciudades":
+                miembros_filtrados = miembros_filtrados.sort_values('Ciudades', ascending=False)
+            elif ordenar_por == "Nombre":
+                miembros_filtrados = miembros_filtrados.sort_values('Nombre')
+            
+            # Preparar tabla para mostrar
+            tabla_miembros = miembros_filtrados[ROSTER_COLUMNS].copy()
+            
+            # Cambiar nombres de columnas
+            tabla_miembros.columns = [
+                'Ranking', 'Nombre', 'Puntos', 'Ciudades', 'Pts/Ciudad', 'Categoría', 'Estado', 'Pot. Militar',
+                'Ataque', 'Defensa', 'Combate Reciente',
+            ]
+            return tabla_miembros
+        
+        tabla_miembros = cached_table(('roster', mi_alianza_id, filtro_categoria, filtro_estado, ordenar_por), tabla_roster)
         
         # Destacar tu jugador
         def highlight_my_player(row):
@@ -558,7 +1029,7 @@ elif tab_selection == "🛡️ ALIANZA":
                 return ['background-color: #90EE90; font-weight: bold'] * len(row)
             return [''] * len(row)
         
-        st.dataframe(
+        show_dataframe(
             tabla_miembros,
             use_container_width=True,
             hide_index=True,
@@ -567,9 +1038,13 @@ elif tab_selection == "🛡️ ALIANZA":
                 "Nombre": st.column_config.TextColumn("👤 Nombre"),
                 "Puntos": st.column_config.NumberColumn("💰 Puntos", format="%d"),
                 "Ciudades": st.column_config.NumberColumn("🏘️ Ciudades", format="%d"),
+                "Pts/Ciudad": st.column_config.NumberColumn("📐 Pts/Ciudad", format="%.1f"),
                 "Categoría": st.column_config.TextColumn("⚔️ Categoría"),
                 "Estado": st.column_config.TextColumn("📊 Estado"),
-                "Pot. Militar": st.column_config.NumberColumn("🎯 Potencial", format="%d", help="Estimación de capacidad militar")
+                "Pot. Militar": st.column_config.NumberColumn("🎯 Potencial", format="%d", help="Estimación de capacidad militar"),
+                "Ataque": st.column_config.NumberColumn("⚔️ Ataque", format="%d", help="Puntos de combate en ataque (ODA)"),
+                "Defensa": st.column_config.NumberColumn("🛡️ Defensa", format="%d", help="Puntos de combate en defensa (ODD)"),
+                "Combate Reciente": st.column_config.NumberColumn("🔥 Reciente", format="+%d", help="Puntos de combate desde el snapshot anterior")
             }
         )
         
@@ -593,45 +1068,147 @@ elif tab_selection == "🛡️ ALIANZA":
             # Estadísticas de la alianza
             st.write("**📊 Estadísticas Clave:**")
             
-            mejor_ranking = int(miembros_rdmp['Ranking'].min())
-            peor_ranking = int(miembros_rdmp['Ranking'].max())
-            mediana_puntos = int(miembros_rdmp['Puntos'].median())
-            
-            st.write(f"🥇 Mejor miembro: Puesto #{mejor_ranking}")
-            st.write(f"📉 Miembro más bajo: Puesto #{peor_ranking}")
-            st.write(f"📊 Mediana de puntos: {mediana_puntos:,}")
-            st.write(f"🎯 Rango de influencia: {peor_ranking - mejor_ranking} posiciones")
+            if mi_alianza_id in resumen_alianzas.index:
+                mis_stats = resumen_alianzas.loc[mi_alianza_id]
+                mejor_ranking = int(mis_stats['Mejor_Ranking'])
+                peor_ranking = int(mis_stats['Peor_Ranking'])
+                mediana_puntos = int(mis_stats['Mediana'])
+                
+                st.write(f"🥇 Mejor miembro: Puesto #{mejor_ranking}")
+                st.write(f"📉 Miembro más bajo: Puesto #{peor_ranking}")
+                st.write(f"📊 Mediana de puntos: {mediana_puntos:,}")
+                st.write(f"🎯 Rango de influencia: {peor_ranking - mejor_ranking} posiciones")
         
         # Gráfico de distribución de puntos
-        fig_distribucion = px.histogram(
-            miembros_rdmp,
-            x='Puntos',
-            nbins=15,
-            title="Distribución de Puntos en R.D.M.P",
-            labels={'Puntos': 'Puntos del Jugador', 'count': 'Número de Miembros'},
-            color_discrete_sequence=['#667eea']
-        )
+        def figura_distribucion():
+            fig_distribucion = px.histogram(
+                miembros_rdmp,
+                x='Puntos',
+                nbins=15,
+                title="Distribución de Puntos en R.D.M.P",
+                labels={'Puntos': 'Puntos del Jugador', 'count': 'Número de Miembros'},
+                color_discrete_sequence=['#667eea']
+            )
         
-        fig_distribucion.update_layout(
-            xaxis_title="Puntos",
-            yaxis_title="Número de Miembros",
-            showlegend=False
-        )
+            fig_distribucion.update_layout(
+                xaxis_title="Puntos",
+                yaxis_title="Número de Miembros",
+                showlegend=False
+            )
+            return fig_distribucion
+        
+        fig_distribucion = cached_figure(('distribucion', mi_alianza_id), figura_distribucion)
+        show_chart(fig_distribucion, use_container_width=True)
+        
+        # Evolución de la alianza
+        if alliance_data is not None and fila_alianza is not None:
+            serie_alianza = get_entity_series(world, 'alliances', mi_alianza_id, players_ts, alliances_ts)
+            if len(serie_alianza) > 1:
+                st.subheader("📈 Evolución de la Alianza")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("💹 Pts/día (7 días)", f"{serie_alianza['Puntos_Alianza_dia_7d'].iloc[-1]:,.0f}")
+                with col2:
+                    st.metric("👥 Miembros", int(serie_alianza['Miembros'].iloc[-1]),
+                              delta=int(serie_alianza['Miembros'].iloc[-1] - serie_alianza['Miembros'].iloc[0]))
+                fig_alianza = cached_figure(('evolucion_alianza', mi_alianza_id), lambda: px.line(
+                    serie_alianza.reset_index(),
+                    x='Fecha',
+                    y='Puntos_Alianza',
+                    title="Puntos de la alianza en el tiempo",
+                    labels={'Puntos_Alianza': 'Puntos', 'Fecha': ''},
+                    color_discrete_sequence=['#667eea']
+                ))
+                show_chart(fig_alianza, use_container_width=True)
+        
+        # Quién está más cerca de subir en el ranking
+        st.subheader("🧗 Más Cerca de Subir")
+        salto = st.selectbox("⬆️ Puestos a subir:", RANK_JUMPS, format_func=lambda s: f"{s} puestos")
+        
+        def tabla_subir():
+            cerca = closest_to_climb(players_with_activity, saltos, indice.alliance_rows(mi_alianza_id), salto, n=10)
+            if cerca.empty:
+                return cerca
+            ritmos_jugadores, _ = get_growth_rates(world, players_ts, alliances_ts)
+            cerca = project_targets(cerca, ritmos_jugadores)
+            return pd.DataFrame({
+                'Miembro': cerca['Nombre'],
+                'Ranking': cerca['Ranking'],
+                'Puntos Necesarios': cerca['Puntos_Necesarios'],
+                'Jugador a Superar': cerca['Jugador'].str[:15],
+                'Tiempo Estimado': cerca['Dias_Estimados'].map(format_days)
+            })
+        
+        cerca = cached_table(('subir', mi_alianza_id, salto), tabla_subir)
+        if len(cerca):
+            show_dataframe(
+                cerca,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Ranking": st.column_config.NumberColumn("🏆 Ranking", format="#%d"),
+                    "Puntos Necesarios": st.column_config.NumberColumn("💰 Puntos Necesarios", format="+%d")
+                }
+            )
         
-        st.plotly_chart(fig_distribucion, use_container_width=True)
+        # Territorio de la alianza sobre el mapa del mundo
+        if towns_data is not None:
+            st.subheader(f"🌐 Territorio de {nombre_alianza}")
+            show_world_map(
+                get_density_tiles(world, players_ts, towns_ts, kills_ts, alliances_ts), get_town_grid(world, towns_ts),
+                towns_data, players_with_activity, indice, key="mapa_alianza",
+                default_ocean=int(get_ocean_dominance(world, players_ts, towns_ts).matrix([mi_alianza_id])[0].argmax()),
+                alliance_id=mi_alianza_id, alliance_name=nombre_alianza,
+            )
+        
+        # Conquistas hechas y sufridas por la alianza
+        if conquers_ts is not None:
+            st.subheader("⚔️ Conquistas de la Alianza")
+            conquistas = get_conquest_index(world, conquers_ts)
+            col1, col2 = st.columns(2)
+            with col1:
+                ventana = st.selectbox("🕒 Periodo:", list(CONQUEST_WINDOWS), index=1, key="ventana_alianza")
+            with col2:
+                rol = st.radio("⚔️ Mostrar:", ["all", "gained", "lost"], horizontal=True, format_func={
+                    "all": "Todas", "gained": "Ganadas", "lost": "Perdidas"}.get)
+            desde = conquest_start(conquers_ts, ventana)
+            ganadas = conquistas.by_alliance(mi_alianza_id, desde, role='gained')
+            perdidas = conquistas.by_alliance(mi_alianza_id, desde, role='lost')
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("🏴 Ganadas", f"{len(ganadas):,}")
+            with col2:
+                st.metric("💔 Perdidas", f"{len(perdidas):,}")
+            with col3:
+                st.metric("⚖️ Balance", f"{len(ganadas) - len(perdidas):+,}")
+            
+            filas = {'gained': ganadas, 'lost': perdidas}.get(rol)
+            if filas is None:
+                filas = conquistas.by_alliance(mi_alianza_id, desde)
+            if len(filas):
+                show_dataframe(
+                    conquest_table(conquistas, filas, players_with_activity, indice,
+                                   get_town_grid(world, towns_ts) if towns_data is not None else None, n=50),
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "Fecha": st.column_config.DatetimeColumn("🕒 Fecha", format="DD/MM HH:mm"),
+                        "Puntos_Ciudad": st.column_config.NumberColumn("💰 Puntos", format="%d")
+                    }
+                )
+            else:
+                st.info("Sin conquistas en ese periodo")
         
         # Comparación con otras alianzas (contexto)
-        if alliance_data is not None and not mi_alianza_data.empty:
+        if alliance_data is not None and fila_alianza is not None:
             st.markdown("---")
             st.subheader("🎯 Posición Competitiva")
             
             # Encontrar alianzas cercanas en ranking
             ranking_actual = int(alianza['Ranking_Alianza'])
             
-            alianzas_cercanas = alliance_data[
-                (alliance_data['Ranking_Alianza'] >= ranking_actual - 3) &
-                (alliance_data['Ranking_Alianza'] <= ranking_actual + 3)
-            ].copy()
+            alianzas_cercanas = alliance_data.iloc[indice.alliance_rank_window(ranking_actual - 3, ranking_actual + 3)]
             
             # Destacar R.D.M.P
             def highlight_rdmp(row):
@@ -641,10 +1218,13 @@ elif tab_selection == "🛡️ ALIANZA":
             
             alianzas_display = alianzas_cercanas[['Ranking_Alianza', 'Nombre_Alianza', 'Puntos_Alianza', 'Miembros']].copy()
             alianzas_display['Promedio'] = (alianzas_display['Puntos_Alianza'] / alianzas_display['Miembros']).astype(int)
-            alianzas_display.columns = ['Ranking', 'Alianza', 'Puntos', 'Miembros', 'Promedio']
+            stats_cercanas = resumen_alianzas.reindex(alianzas_cercanas['ID_Alianza'])
+            alianzas_display['Mediana'] = stats_cercanas['Mediana'].to_numpy()
+            alianzas_display['Ciudades'] = stats_cercanas['Ciudades'].to_numpy()
+            alianzas_display.columns = ['Ranking', 'Alianza', 'Puntos', 'Miembros', 'Promedio', 'Mediana', 'Ciudades']
             
             st.write("**⚔️ Alianzas Competidoras Cercanas:**")
-            st.dataframe(
+            show_dataframe(
                 alianzas_display,
                 use_container_width=True,
                 hide_index=True,
@@ -653,9 +1233,25 @@ elif tab_selection == "🛡️ ALIANZA":
                     "Alianza": st.column_config.TextColumn("🛡️ Alianza"),
                     "Puntos": st.column_config.NumberColumn("💰 Puntos", format="%d"),
                     "Miembros": st.column_config.NumberColumn("👥 Miembros", format="%d"),
-                    "Promedio": st.column_config.NumberColumn("📊 Promedio", format="%d")
+                    "Promedio": st.column_config.NumberColumn("📊 Promedio", format="%d"),
+                    "Mediana": st.column_config.NumberColumn("📊 Mediana", format="%d"),
+                    "Ciudades": st.column_config.NumberColumn("🏘️ Ciudades", format="%d")
                 }
             )
+            
+            # Comparación directa con cualquier alianza del servidor
+            rivales = resumen_alianzas.index[resumen_alianzas.index != mi_alianza_id]
+            if len(rivales) > 0 and mi_alianza_id in resumen_alianzas.index:
+                st.write("**⚖️ Comparar con otra alianza:**")
+                rival_id = st.selectbox(
+                    "🛡️ Alianza rival",
+                    rivales,
+                    format_func=lambda i: f"#{int(resumen_alianzas.at[i, 'Ranking_Alianza'])} {resumen_alianzas.at[i, 'Nombre_Alianza']}"
+                )
+                
+                comparacion = resumen_alianzas.loc[[mi_alianza_id, rival_id]].drop(columns=['Puntos_Alianza'])
+                comparacion.index = comparacion.pop('Nombre_Alianza')
+                show_dataframe(comparacion.T.astype(str), use_container_width=True)
     
     else:
         st.warning(f"❌ No se encontraron miembros de la alianza con ID: {mi_alianza_id}")
@@ -670,10 +1266,10 @@ elif tab_selection == "👤 JUGADOR":
     # Análisis personal
     st.subheader(f"🎮 Tu Perfil: {mi_jugador}")
     
-    mi_data = players_with_activity[players_with_activity['Nombre'] == mi_jugador]
+    mi_fila = indice.row_by_name(mi_jugador)
     
-    if not mi_data.empty:
-        yo = mi_data.iloc[0]
+    if mi_fila is not None:
+        yo = players_with_activity.iloc[mi_fila]
         
         # Métricas personales
         col1, col2, col3, col4, col5 = st.columns(5)
@@ -685,8 +1281,7 @@ elif tab_selection == "👤 JUGADOR":
             st.metric("📊 Ranking", f"#{int(yo['Ranking'])}")
         
         with col3:
-            percentil = (1 - (yo['Ranking'] / len(players_data))) * 100
-            st.metric("📈 Percentil", f"Top {percentil:.1f}%")
+            st.metric("📈 Percentil", f"Top {yo['Percentil']:.1f}%")
         
         with col4:
             st.metric("🏘️ Ciudades", f"{int(yo['Ciudades'])}")
@@ -702,32 +1297,26 @@ elif tab_selection == "👤 JUGADOR":
         with col1:
             st.write("**🎯 Objetivos de Ranking:**")
             
-            objetivos = []
-            for salto in [5, 10, 25, 50]:
-                if yo['Ranking'] - salto > 0:
-                    objetivo_player = players_data.iloc[int(yo['Ranking']) - salto - 1]
-                    puntos_necesarios = objetivo_player['Puntos'] - yo['Puntos']
-                    if puntos_necesarios > 0:
-                        objetivos.append({
-                            'Objetivo': f"Subir {salto} posiciones",
-                            'Ranking Meta': f"#{int(yo['Ranking']) - salto}",
-                            'Puntos Necesarios': f"+{int(puntos_necesarios):,}",
-                            'Jugador a Superar': objetivo_player['Nombre'][:15]
-                        })
-            
-            if objetivos:
-                df_objetivos = pd.DataFrame(objetivos)
-                st.dataframe(df_objetivos, hide_index=True, use_container_width=True)
+            ritmos_jugadores, ritmos_alianzas = get_growth_rates(world, players_ts, alliances_ts)
+            objetivos = project_targets(rank_targets(players_with_activity, saltos, mi_fila), ritmos_jugadores, int(yo['ID']))
+            
+            if not objetivos.empty:
+                df_objetivos = pd.DataFrame({
+                    'Objetivo': "Subir " + objetivos['Salto'].astype(str) + " posiciones",
+                    'Ranking Meta': "#" + objetivos['Ranking_Meta'].astype(str),
+                    'Puntos Necesarios': objetivos['Puntos_Necesarios'].map(lambda p: f"+{p:,}"),
+                    'Jugador a Superar': objetivos['Jugador'].str[:15],
+                    # Al ritmo de los últimos 7 días (el mío menos el suyo)
+                    'Tiempo Estimado': objetivos['Dias_Estimados'].map(format_days)
+                })
+                show_dataframe(df_objetivos, hide_index=True, use_container_width=True)
         
         with col2:
             st.write("**⚔️ Competencia Cercana:**")
             
             # Jugadores cerca de tu ranking
-            rango_competencia = players_data[
-                (players_data['Ranking'] >= yo['Ranking'] - 10) &
-                (players_data['Ranking'] <= yo['Ranking'] + 10) &
-                (players_data['Nombre'] != yo['Nombre'])
-            ].head(10)
+            filas_cercanas = indice.rank_window(yo['Ranking'] - 10, yo['Ranking'] + 10)
+            rango_competencia = players_with_activity.iloc[filas_cercanas[filas_cercanas != mi_fila][:10]]
             
             for i, (_, competidor) in enumerate(rango_competencia.iterrows()):
                 diferencia = int(competidor['Puntos'] - yo['Puntos'])
@@ -735,12 +1324,161 @@ elif tab_selection == "👤 JUGADOR":
                     st.write(f"⬆️ #{int(competidor['Ranking'])} {competidor['Nombre'][:20]} (+{diferencia:,} pts)")
                 else:
                     st.write(f"⬇️ #{int(competidor['Ranking'])} {competidor['Nombre'][:20]} ({diferencia:,} pts)")
+        
+        # Evolución en el tiempo
+        serie = get_entity_series(world, 'players', int(yo['ID']), players_ts, alliances_ts)
+        if len(serie) > 1:
+            st.subheader("📈 Evolución")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("💹 Pts/día (24h)", f"{serie['Puntos_dia_24h'].iloc[-1]:,.0f}")
+            with col2:
+                st.metric("📆 Pts/día (7 días)", f"{serie['Puntos_dia_7d'].iloc[-1]:,.0f}")
+            with col3:
+                semana = serie[serie.index >= serie.index[-1] - GROWTH_WINDOWS['7d']]
+                st.metric("🏆 Ranking (7 días)", f"#{int(serie['Ranking'].iloc[-1])}",
+                          delta=int(semana['Ranking'].iloc[0] - semana['Ranking'].iloc[-1]))
+            
+            def figura_evolucion():
+                fig_evolucion = go.Figure()
+                fig_evolucion.add_trace(go.Scatter(x=serie.index, y=serie['Puntos'], name="Puntos", line=dict(color='#667eea')))
+                fig_evolucion.add_trace(go.Scatter(x=serie.index, y=serie['Ranking'], name="Ranking", yaxis='y2', line=dict(color='#dc3545', dash='dot')))
+                fig_evolucion.update_layout(
+                    title="Puntos y ranking en el tiempo",
+                    yaxis=dict(title="Puntos"),
+                    yaxis2=dict(title="Ranking", overlaying='y', side='right', autorange='reversed'),
+                    legend=dict(orientation='h')
+                )
+                return fig_evolucion
+            
+            fig_evolucion = cached_figure(('evolucion_jugador', int(yo['ID'])), figura_evolucion)
+            show_chart(fig_evolucion, use_container_width=True)
+        
+        # Ciudades ajenas cerca de las tuyas
+        if towns_data is not None:
+            st.subheader("📍 Vecindario")
+            radio = st.slider("📏 Radio (campos):", 5, 100, 20)
+            vecinas = get_town_grid(world, towns_ts).within_player(int(yo['ID']), radio)
+            vecinas = vecinas.merge(
+                players_data[['ID', 'Nombre', 'ID_Alianza']],
+                left_on='ID_Jugador',
+                right_on='ID',
+                how='left'
+            )
+            vecinas['Nombre'] = vecinas['Nombre'].fillna("👻 Fantasma")
+            
+            st.write(f"**{len(vecinas):,} ciudades ajenas a menos de {radio} campos de las tuyas**")
+            show_dataframe(
+                vecinas[['Nombre_Ciudad', 'Nombre', 'Puntos_Ciudad', 'Coord_X', 'Coord_Y', 'Distancia']].head(50),
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "Nombre_Ciudad": st.column_config.TextColumn("🏘️ Ciudad"),
+                    "Nombre": st.column_config.TextColumn("👤 Dueño"),
+                    "Puntos_Ciudad": st.column_config.NumberColumn("💰 Puntos", format="%d"),
+                    "Coord_X": st.column_config.NumberColumn("X", format="%d"),
+                    "Coord_Y": st.column_config.NumberColumn("Y", format="%d"),
+                    "Distancia": st.column_config.NumberColumn("📏 Distancia", format="%.1f")
+                }
+            )
+            
+            # Conquistas alrededor de tus ciudades
+            if conquers_ts is not None:
+                ventana = st.selectbox("🕒 Conquistas cercanas en:", list(CONQUEST_WINDOWS), index=1, key="ventana_jugador")
+                conquistas = get_conquest_index(world, conquers_ts)
+                filas, distancia = conquistas.near(
+                    get_town_grid(world, towns_ts), int(yo['ID']), radio, conquest_start(conquers_ts, ventana)
+                )
+                st.write(f"**⚔️ {len(filas):,} conquistas a menos de {radio} campos de tus ciudades**")
+                if len(filas):
+                    show_dataframe(
+                        conquest_table(conquistas, filas, players_with_activity, indice,
+                                       get_town_grid(world, towns_ts), n=50, distance=distancia),
+                        hide_index=True,
+                        use_container_width=True,
+                        column_config={
+                            "Fecha": st.column_config.DatetimeColumn("🕒 Fecha", format="DD/MM HH:mm"),
+                            "Puntos_Ciudad": st.column_config.NumberColumn("💰 Puntos", format="%d"),
+                            "Distancia": st.column_config.NumberColumn("📏 Distancia", format="%.1f")
+                        }
+                    )
+            
+            # Objetivos más cercanos para farmeo o ataque
+            st.subheader("🎯 Objetivos Cercanos")
+            
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                modo_objetivo = st.selectbox(
+                    "🎯 Tipo de objetivo:",
+                    ["Fantasma", "Inactivas", "Alianza", "Puntos"],
+                    format_func=lambda m: {
+                        "Fantasma": "👻 Ciudades fantasma",
+                        "Inactivas": "😴 Jugadores inactivos",
+                        "Alianza": "⚔️ Alianza enemiga",
+                        "Puntos": "💰 Bajo un umbral de puntos"
+                    }[m]
+                )
+            
+            with col2:
+                if modo_objetivo == "Alianza":
+                    alianza_enemiga = st.number_input("🛡️ ID de la alianza enemiga", min_value=1, value=1, step=1)
+                elif modo_objetivo == "Puntos":
+                    max_puntos = st.number_input("💰 Puntos máximos de la ciudad", min_value=0, value=3000, step=500)
+            
+            with col3:
+                unidad = st.selectbox("⛵ Unidad", list(UNIT_SPEEDS), index=list(UNIT_SPEEDS).index("Birreme"))
+            
+            with col4:
+                k_objetivos = st.slider("🔢 Objetivos por jugador:", 1, 25, 10)
+            
+            toda_la_alianza = st.checkbox("🛡️ Calcular para todos los miembros de mi alianza", value=False)
+            
+            mascara = candidate_mask(
+                towns_data,
+                players_with_activity,
+                modo_objetivo,
+                alliance_id=alianza_enemiga if modo_objetivo == "Alianza" else None,
+                max_points=max_puntos if modo_objetivo == "Puntos" else None,
+                exclude_alliance=mi_alianza_id
+            )
+            if toda_la_alianza and mi_alianza_id:
+                jugadores_origen = players_with_activity['ID'].to_numpy()[indice.alliance_rows(mi_alianza_id)]
+            else:
+                jugadores_origen = [int(yo['ID'])]
+            
+            objetivos_cercanos = find_targets(
+                get_town_grid(world, towns_ts), players_with_activity, jugadores_origen, mascara,
+                k=k_objetivos, speed=UNIT_SPEEDS[unidad]
+            )
+            objetivos_cercanos['Jugador'] = objetivos_cercanos['ID_Jugador_Origen'].map(
+                players_with_activity.set_index('ID')['Nombre']
+            )
+            
+            if objetivos_cercanos.empty:
+                st.info("🔍 No hay objetivos de ese tipo")
+            else:
+                show_dataframe(
+                    objetivos_cercanos[['Jugador', 'Ciudad_Origen', 'Nombre_Ciudad', 'Dueño', 'Puntos_Ciudad', 'Distancia', 'Horas']],
+                    hide_index=True,
+                    use_container_width=True,
+                    column_config={
+                        "Jugador": st.column_config.TextColumn("👤 Jugador"),
+                        "Ciudad_Origen": st.column_config.TextColumn("🏠 Desde"),
+                        "Nombre_Ciudad": st.column_config.TextColumn("🎯 Objetivo"),
+                        "Dueño": st.column_config.TextColumn("👤 Dueño"),
+                        "Puntos_Ciudad": st.column_config.NumberColumn("💰 Puntos", format="%d"),
+                        "Distancia": st.column_config.NumberColumn("📏 Distancia", format="%.1f"),
+                        "Horas": st.column_config.NumberColumn("⏱️ Horas", format="%.2f", help="Tiempo de viaje aproximado sin bonificaciones")
+                    }
+                )
     
     else:
         st.warning(f"❌ No se encontró el jugador '{mi_jugador}'")
         
         # Sugerencias de nombres similares
-        similares = players_data[players_data['Nombre'].str.contains(mi_jugador.replace('+', '|'), case=False, na=False)]
+        filas_similares, _ = get_search_index(world, 'players', players_ts).fuzzy(mi_jugador, limit=5)
+        similares = players_data.iloc[filas_similares]
         if not similares.empty:
             st.write("🔍 **Nombres similares encontrados:**")
             for _, player in similares.head(5).iterrows():
@@ -748,57 +1486,86 @@ elif tab_selection == "👤 JUGADOR":
     
     st.markdown("---")
     
-    # Búsqueda de jugadores
+    # Búsqueda de jugadores, alianzas y ciudades
     st.subheader("🔍 Búsqueda de Jugadores")
     
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        search_term = st.text_input("🎮 Buscar jugador:", placeholder="Nombre del jugador...")
+        search_term = st.text_input("🎮 Buscar:", placeholder="Nombre del jugador...")
     
     with col2:
-        search_type = st.selectbox("🔍 Tipo de búsqueda", ["Contiene", "Exacto", "Empieza con"])
+        search_type = st.selectbox("🔍 Tipo de búsqueda", MODES)
     
     with col3:
-        search_filter = st.selectbox("📊 Filtrar por", ["Todos", "Con alianza", "Sin alianza", "Top 100"])
+        search_target = st.selectbox("📂 Buscar en", ["Jugadores", "Alianzas", "Ciudades"])
+    
+    with col4:
+        search_filter = st.selectbox("📊 Filtrar por", ["Todos", "Con alianza", "Sin alianza", "Top 100"],
+                                     disabled=search_target != "Jugadores")
     
     if search_term:
-        # Aplicar filtros de búsqueda
-        if search_type == "Contiene":
-            resultados = players_with_activity[players_with_activity['Nombre'].str.contains(search_term, case=False, na=False)]
-        elif search_type == "Exacto":
-            resultados = players_with_activity[players_with_activity['Nombre'] == search_term]
-        else:  # Empieza con
-            resultados = players_with_activity[players_with_activity['Nombre'].str.startswith(search_term, na=False)]
-        
-        # Aplicar filtros adicionales
-        if search_filter == "Con alianza":
-            resultados = resultados[resultados['ID_Alianza'] != 0]
-        elif search_filter == "Sin alianza":
-            resultados = resultados[resultados['ID_Alianza'] == 0]
-        elif search_filter == "Top 100":
-            resultados = resultados[resultados['Ranking'] <= 100]
+        if search_target == "Jugadores":
+            filas = get_search_index(world, 'players', players_ts).search(search_term, search_type)
+            resultados = players_with_activity.iloc[filas]
+            
+            # Aplicar filtros adicionales
+            if search_filter == "Con alianza":
+                resultados = resultados[resultados['ID_Alianza'] != 0]
+            elif search_filter == "Sin alianza":
+                resultados = resultados[resultados['ID_Alianza'] == 0]
+            elif search_filter == "Top 100":
+                resultados = resultados[resultados['Ranking'] <= 100]
+            
+            columnas = ['Ranking', 'Nombre', 'Puntos', 'Ciudades', 'Estado']
+            column_config = {
+                "Ranking": st.column_config.NumberColumn("🏆 Ranking", format="#%d"),
+                "Nombre": st.column_config.TextColumn("👤 Nombre"),
+                "Puntos": st.column_config.NumberColumn("💰 Puntos", format="%d"),
+                "Ciudades": st.column_config.NumberColumn("🏘️ Ciudades", format="%d"),
+                "Estado": st.column_config.TextColumn("📊 Estado")
+            }
+        elif search_target == "Alianzas":
+            if alliance_data is None:
+                resultados = pd.DataFrame()
+            else:
+                filas = get_search_index(world, 'alliances', alliances_ts).search(search_term, search_type)
+                resultados = alliance_data.iloc[filas]
+            
+            columnas = ['Ranking_Alianza', 'Nombre_Alianza', 'Puntos_Alianza', 'Miembros', 'Ciudades_Alianza']
+            column_config = {
+                "Ranking_Alianza": st.column_config.NumberColumn("🏆 Ranking", format="#%d"),
+                "Nombre_Alianza": st.column_config.TextColumn("🏛️ Alianza"),
+                "Puntos_Alianza": st.column_config.NumberColumn("💰 Puntos", format="%d"),
+                "Miembros": st.column_config.NumberColumn("👥 Miembros", format="%d"),
+                "Ciudades_Alianza": st.column_config.NumberColumn("🏘️ Ciudades", format="%d")
+            }
+        else:
+            if towns_data is None:
+                resultados = pd.DataFrame()
+            else:
+                filas = get_search_index(world, 'towns', towns_ts).search(search_term, search_type)
+                resultados = towns_data.iloc[filas].assign(
+                    Dueño=lambda df: owner_column(df, players_data, 'Nombre', "👻 Fantasma"))
+            
+            columnas = ['Nombre_Ciudad', 'Dueño', 'Puntos_Ciudad', 'Coord_X', 'Coord_Y']
+            column_config = {
+                "Nombre_Ciudad": st.column_config.TextColumn("🏘️ Ciudad"),
+                "Dueño": st.column_config.TextColumn("👤 Dueño"),
+                "Puntos_Ciudad": st.column_config.NumberColumn("💰 Puntos", format="%d"),
+                "Coord_X": st.column_config.NumberColumn("X", format="%d"),
+                "Coord_Y": st.column_config.NumberColumn("Y", format="%d")
+            }
         
         if not resultados.empty:
             st.success(f"✅ {len(resultados)} resultado(s) encontrado(s)")
             
-            # Mostrar resultados
-            resultados_display = resultados[['Ranking', 'Nombre', 'Puntos', 'Ciudades', 'Estado']].head(20)
-            resultados_display['Ranking'] = resultados_display['Ranking'].astype(int)
-            resultados_display['Puntos'] = resultados_display['Puntos'].astype(int)
-            resultados_display['Ciudades'] = resultados_display['Ciudades'].astype(int)
-            
-            st.dataframe(
-                resultados_display,
+            # Mostrar resultados (ya vienen ordenados por relevancia)
+            show_dataframe(
+                resultados[columnas].head(20),
                 hide_index=True,
                 use_container_width=True,
-                column_config={
-                    "Ranking": st.column_config.NumberColumn("🏆 Ranking", format="#%d"),
-                    "Nombre": st.column_config.TextColumn("👤 Nombre"),
-                    "Puntos": st.column_config.NumberColumn("💰 Puntos", format="%d"),
-                    "Ciudades": st.column_config.NumberColumn("🏘️ Ciudades", format="%d"),
-                    "Estado": st.column_config.TextColumn("📊 Estado")
-                }
+                column_config=column_config
             )
         else:
             st.error("❌ No se encontraron resultados")
@@ -806,11 +1573,11 @@ elif tab_selection == "👤 JUGADOR":
 # FOOTER
 st.markdown("---")
 st.markdown(
-    """
+    f"""
     <div style='text-align: center; color: #666; font-size: 0.9rem; padding: 2rem; background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%); border-radius: 10px; margin-top: 2rem;'>
-        🏛️ <b>GrepoIntel ES137 | R.D.M.P</b><br>
+        🏛️ <b>GrepoIntel {world.upper()} | R.D.M.P</b><br>
         <i>Desarrollado por: Im a New Rookie</i><br><br>
-        📊 Actualización automática cada 15 minutos | 
+        📊 Actualización automática tras cada publicación horaria | 
         🚀 Powered by Streamlit | 
         🛡️ Dashboard de Inteligencia Militar<br>
         <small>💡 Navega por las pestañas del sidebar para explorar diferentes secciones</small>
@@ -818,3 +1585,34 @@ st.markdown(
     """, 
     unsafe_allow_html=True
 )
+
+# PANEL DE RENDIMIENTO (oculto: se abre con ?perf=1 en la URL)
+RECORDER.observe('rerun', time.perf_counter() - inicio_rerun)
+if os.environ.get("GREPOLIS_METRICS_DIR"):
+    # metrics.json y metrics.prom para que los lea un scraper local
+    RECORDER.export(os.environ["GREPOLIS_METRICS_DIR"])
+
+if st.query_params.get("perf") == "1":
+    with st.sidebar.expander("⏱️ Rendimiento", expanded=True):
+        etapas = pd.DataFrame(RECORDER.run_timings(), columns=['Etapa', 'Segundos'])
+        etapas = etapas.groupby('Etapa', sort=False)['Segundos'].agg(['count', 'sum']).reset_index()
+        etapas.columns = ['Etapa', 'Llamadas', 'ms']
+        etapas['ms'] = (etapas['ms'] * 1000).round(1)
+        st.caption("Este rerun (las etapas derive.* solo aparecen en fallos de caché e incluyen las anidadas)")
+        st.dataframe(etapas, hide_index=True, use_container_width=True)
+
+        cache_rerun = RECORDER.run_caches()
+        caches = pd.DataFrame([
+            {'Caché': nombre, 'Rerun': f"{h}/{h + m}", 'Aciertos': datos['hits'], 'Fallos': datos['misses'],
+             'Tasa': f"{datos['hit_rate']:.0%}"}
+            for nombre, datos in RECORDER.snapshot()['caches'].items()
+            for h, m in [cache_rerun.get(nombre, (0, 0))]
+        ])
+        st.caption("Cachés (aciertos en este rerun y acumulados del proceso)")
+        st.dataframe(caches, hide_index=True, use_container_width=True)
+        render = get_render_cache().stats()
+        st.caption(
+            f"Figuras y tablas guardadas: {render['entries']:,} "
+            f"({render['bytes'] / 2**20:.1f} de {render['budget'] / 2**20:.0f} MB, "
+            f"{render['evictions']:,} expulsadas)"
+        )
@@ -0,0 +1,67 @@
+"""Núcleo de datos de GrepoIntel: descarga y procesado de los dumps públicos de Grepolis
+
+Se puede importar sin Streamlit. Los submódulos (y con ellos numpy, pandas,
+pyarrow o requests) solo se cargan la primera vez que se usa algo de ellos,
+así que ``import grepolis_intel`` es inmediato.
+"""
+import importlib
+
+# Nombre exportado -> submódulo que lo define
+_EXPORTS = {
+    'WorldFetcher': 'fetch',
+    'FetchResult': 'fetch',
+    'DUMPS': 'fetch',
+    'PARSERS': 'parse',
+    'SnapshotStore': 'snapshots',
+    'RetentionPolicy': 'snapshots',
+    'refresh_world': 'ingest',
+    'RefreshScheduler': 'scheduler',
+    'ActivityTracker': 'activity',
+    'PLAYER_METRICS': 'metrics',
+    'add_player_metrics': 'metrics',
+    'KILL_COLUMNS': 'kills',
+    'add_kill_points': 'kills',
+    'PlayerIndex': 'indexes',
+    'RankGaps': 'indexes',
+    'SortedPages': 'indexes',
+    'NameSearchIndex': 'search',
+    'TownGrid': 'spatial',
+    'ocean_summary': 'spatial',
+    'OceanDominance': 'spatial',
+    'DensityTiles': 'worldmap',
+    'map_points': 'worldmap',
+    'find_targets': 'targets',
+    'alliance_summary': 'alliances',
+    'top_players': 'tables',
+    'alliance_roster': 'tables',
+    'rank_targets': 'tables',
+    'closest_to_climb': 'tables',
+    'player_pages': 'tables',
+    'town_pages': 'tables',
+    'PerfRecorder': 'perf',
+    'RECORDER': 'perf',
+    'RenderCache': 'render',
+    'HistoryStore': 'history',
+    'growth_rates': 'history',
+    'entity_series': 'history',
+    'ConquestLog': 'conquests',
+    'ConquestIndex': 'conquests',
+    'conquest_table': 'tables',
+    'WorldTables': 'world',
+    'load_world': 'world',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    modulo = _EXPORTS.get(name)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    valor = getattr(importlib.import_module(f".{modulo}", __name__), name)
+    globals()[name] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,175 @@
+"""CLI: las tablas de las pestañas en CSV, JSON o Parquet
+
+Uso:
+    python -m grepolis_intel top [-n 10]
+    python -m grepolis_intel roster 182 --format json
+    python -m grepolis_intel targets "Im a New Rookie" -o objetivos.parquet
+    python -m grepolis_intel climb 182 [--jump 10]
+    python -m grepolis_intel history "Im a New Rookie" | history --alliance 182
+    python -m grepolis_intel conquests --alliance 182 [--hours 24] | conquests "Im a New Rookie" --radius 20
+    python -m grepolis_intel refresh es137 es140 es141 [-j 4]
+
+Lee los snapshots de ``--snapshots`` (por defecto GREPOLIS_SNAPSHOT_DIR o
+``snapshots``); con ``--refresh`` descarga antes los dumps. Los módulos
+pesados se importan después de leer los argumentos, así ``--help`` es
+instantáneo.
+"""
+import argparse
+import os
+import sys
+
+FORMATS = ('csv', 'json', 'parquet')
+
+
+def _parser():
+    parser = argparse.ArgumentParser(prog='python -m grepolis_intel', description=__doc__.splitlines()[0])
+    parser.add_argument('--world', default='es137')
+    parser.add_argument('--snapshots', default=os.environ.get('GREPOLIS_SNAPSHOT_DIR', 'snapshots'))
+    parser.add_argument('--refresh', action='store_true', help="descargar los dumps antes de consultar")
+    parser.add_argument('--data-url', default=os.environ.get('GREPOLIS_DATA_URL'),
+                        help="URL base de los dumps (por defecto la de Grepolis)")
+
+    # Opciones de salida, comunes a todos los comandos
+    salida = argparse.ArgumentParser(add_help=False)
+    salida.add_argument('--format', choices=FORMATS, help="por defecto, el de la extensión de --output o csv")
+    salida.add_argument('-o', '--output', help="fichero de salida (por defecto la salida estándar)")
+
+    comandos = parser.add_subparsers(dest='command', required=True)
+    top = comandos.add_parser('top', parents=[salida], help="mejores jugadores del servidor")
+    top.add_argument('-n', type=int, default=10)
+    roster = comandos.add_parser('roster', parents=[salida], help="miembros de una alianza con sus métricas")
+    roster.add_argument('alliance_id', type=int)
+    targets = comandos.add_parser('targets', parents=[salida], help="puntos que faltan para subir en el ranking")
+    targets.add_argument('player')
+    climb = comandos.add_parser('climb', parents=[salida], help="miembros de una alianza más cerca de subir")
+    climb.add_argument('alliance_id', type=int)
+    climb.add_argument('--jump', type=int, default=5, help="puestos a subir (por defecto 5)")
+    history = comandos.add_parser('history', parents=[salida], help="serie temporal de un jugador o una alianza")
+    history.add_argument('player', nargs='?')
+    history.add_argument('--alliance', type=int, help="ID de la alianza (en lugar de un jugador)")
+    conquests = comandos.add_parser('conquests', parents=[salida],
+                                    help="conquistas de una alianza o cerca de las ciudades de un jugador")
+    conquests.add_argument('player', nargs='?')
+    conquests.add_argument('--alliance', type=int, help="ID de la alianza (en lugar de un jugador)")
+    conquests.add_argument('--radius', type=float, default=20, help="campos alrededor de las ciudades del jugador")
+    conquests.add_argument('--hours', type=float, help="solo las de las últimas N horas (por defecto, toda la temporada)")
+    refresh = comandos.add_parser('refresh', help="descargar varios mundos en paralelo, un proceso por mundo")
+    refresh.add_argument('worlds', nargs='*', help="por defecto, el de --world")
+    refresh.add_argument('-j', '--processes', type=int, help="procesos a la vez (por defecto, uno por núcleo)")
+    return parser
+
+
+def _output_format(args):
+    if args.format:
+        return args.format
+    extension = os.path.splitext(args.output or '')[1].lstrip('.').lower()
+    return extension if extension in FORMATS else 'csv'
+
+
+def _write(df, formato, output):
+    if formato == 'parquet':
+        df.to_parquet(output or sys.stdout.buffer, index=False)
+    elif formato == 'json':
+        texto = df.to_json(orient='records', force_ascii=False, date_format='iso')
+        if output:
+            with open(output, 'w', encoding='utf-8') as f:
+                f.write(texto)
+        else:
+            sys.stdout.write(texto + '\n')
+    else:
+        df.to_csv(output or sys.stdout, index=False)
+
+
+def _refresh_worlds(args):
+    from .ingest import refresh_worlds
+
+    fallos = 0
+    for world, estados in refresh_worlds(args.worlds or [args.world], args.snapshots, args.data_url,
+                                         processes=args.processes):
+        resumen = ', '.join(f"{name} {error or status}" for name, (status, error) in estados.items())
+        fallos += any(status not in (200, 304) for status, _ in estados.values())
+        print(f"{world}: {resumen}")
+    return 1 if fallos else 0
+
+
+def main(argv=None):
+    args = _parser().parse_args(argv)
+    if args.command == 'refresh':
+        sys.exit(_refresh_worlds(args))
+
+    from .snapshots import SnapshotStore
+    from .tables import alliance_roster, closest_to_climb, rank_targets, top_players
+    from .world import load_world
+
+    store = SnapshotStore(args.snapshots)
+    if args.refresh:
+        from .fetch import WorldFetcher
+        from .ingest import refresh_world
+
+        fetcher = WorldFetcher(args.world, base_url=args.data_url)
+        try:
+            refresh_world(fetcher, store)
+        finally:
+            fetcher.close()
+
+    datos = load_world(store, args.world)
+    if datos is None:
+        sys.exit(f"No hay snapshots de {args.world} en {args.snapshots} (prueba con --refresh)")
+
+    if args.command == 'top':
+        tabla = top_players(datos.players, datos.alliances, args.n)
+    elif args.command == 'roster':
+        tabla = alliance_roster(datos.players, datos.index, args.alliance_id)
+    elif args.command == 'climb':
+        from .indexes import RankGaps
+
+        saltos = RankGaps(datos.players, jumps=(args.jump,))
+        tabla = closest_to_climb(datos.players, saltos, datos.index.alliance_rows(args.alliance_id), args.jump)
+    elif args.command == 'history':
+        from .history import HistoryStore, entity_series
+
+        historial = HistoryStore(args.snapshots)
+        historial.sync(store, args.world)
+        if args.alliance is not None:
+            serie = entity_series(historial, args.world, 'alliances', args.alliance)
+        else:
+            fila = datos.index.row_by_name(args.player or '')
+            if fila is None:
+                sys.exit(f"Jugador no encontrado: {args.player}")
+            serie = entity_series(historial, args.world, 'players', datos.players['ID'].iloc[fila])
+        tabla = serie.drop(columns='ts').reset_index()
+    elif args.command == 'conquests':
+        from datetime import timedelta
+
+        from .conquests import ConquestIndex, ConquestLog
+        from .spatial import TownGrid
+        from .tables import conquest_table
+
+        registro = ConquestLog(args.snapshots)
+        version = registro.last_timestamp(args.world)
+        if version is None:
+            sys.exit(f"No hay conquistas de {args.world} en {args.snapshots} (prueba con --refresh)")
+        conquistas = ConquestIndex(registro.read(args.world))
+        desde = version - timedelta(hours=args.hours) if args.hours is not None else None
+        grid = TownGrid(datos.towns) if datos.towns is not None else None
+        if args.alliance is not None:
+            tabla = conquest_table(conquistas, conquistas.by_alliance(args.alliance, desde), datos.players, datos.index, grid)
+        else:
+            fila = datos.index.row_by_name(args.player or '')
+            if fila is None:
+                sys.exit(f"Jugador no encontrado: {args.player}")
+            if grid is None:
+                sys.exit(f"No hay snapshot de ciudades de {args.world}")
+            filas, distancia = conquistas.near(grid, datos.players['ID'].iloc[fila], args.radius, desde)
+            tabla = conquest_table(conquistas, filas, datos.players, datos.index, grid, distance=distancia)
+    else:
+        fila = datos.index.row_by_name(args.player)
+        if fila is None:
+            sys.exit(f"Jugador no encontrado: {args.player}")
+        tabla = rank_targets(datos.players, datos.gaps, fila)
+
+    _write(tabla, _output_format(args), args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""Clasificación de jugadores por estado de actividad"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .targets import owner_column
+
+STATUS_LABELS = np.array(["🟢 Activo", "🟡 Reciente", "🟠 Inactivo", "🔴 Offline"], dtype=object)
+LAST_ACTIVITY_LABELS = np.array(["Últimas 4h", "6-12h", "12-24h", "+24h"], dtype=object)
+GHOST_LABEL = "👻 Fantasma"
+
+# Umbrales de la puntuación estimada: > 8 activo, > 5 reciente, > 2 inactivo
+SCORE_THRESHOLDS = np.array([2.0, 5.0, 8.0])
+JITTER = 0.3
+
+
+def _id_jitter(ids):
+    """Ruido en [0, JITTER) derivado del ID (splitmix64): estable entre ejecuciones"""
+    x = ids.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    x = x ^ (x >> np.uint64(31))
+    return (x >> np.uint64(11)).astype(np.float64) / float(1 << 53) * JITTER
+
+
+def estimate_activity(players_data):
+    """Estima el estado de actividad a partir de puntos y ranking.
+
+    Los datos reales de actividad no están en las APIs públicas: la
+    puntuación combina puntos y ranking más un ruido fijo por jugador, de modo
+    que el mismo snapshot da siempre el mismo resultado.
+    """
+    puntos = players_data['Puntos'].to_numpy(dtype=np.float64)
+    ranking = players_data['Ranking'].to_numpy(dtype=np.float64)
+    score = puntos / 1000 + (len(players_data) - ranking) / 100
+    score += _id_jitter(players_data['ID'].to_numpy())
+
+    # 0 = activo ... 3 = offline
+    codigo = 3 - np.searchsorted(SCORE_THRESHOLDS, score, side='left')
+
+    # Copia superficial: solo se añaden columnas, el snapshot compartido no se toca
+    players_with_status = players_data.copy(deep=False)
+    players_with_status['Estado'] = STATUS_LABELS[codigo]
+    players_with_status['Ultima_Actividad'] = LAST_ACTIVITY_LABELS[codigo]
+    return players_with_status
+
+
+# Estado real a partir de cambios entre snapshots
+HOUR = 3600
+STATUS_HOURS = np.array([4, 12, 24]) * HOUR  # <= 4h activo, <= 12h reciente, <= 24h inactivo
+UNKNOWN = -1
+REPLAY_WINDOW = 30 * HOUR  # Snapshots que hacen falta para clasificar hasta "+24h"
+
+
+def _epoch(timestamp):
+    return int(timestamp.timestamp())
+
+
+class _EntityState:
+    """Último valor conocido de cada entidad, con los IDs ordenados para cruzar por searchsorted"""
+
+    def __init__(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.points = np.empty(0, dtype=np.int64)
+        self.owners = np.empty(0, dtype=np.int64)
+        self.last_change = np.empty(0, dtype=np.int64)
+        self.first_seen = np.empty(0, dtype=np.int64)
+        self.last_ts = None
+
+    def update(self, ts, ids, points, owners=None):
+        orden = np.argsort(ids, kind='stable')
+        ids = ids[orden].astype(np.int64)
+        points = points[orden].astype(np.int64)
+        owners = owners[orden].astype(np.int64) if owners is not None else np.zeros(len(ids), dtype=np.int64)
+
+        if len(self.ids):
+            pos = np.minimum(np.searchsorted(self.ids, ids), len(self.ids) - 1)
+            encontrado = self.ids[pos] == ids
+            # Solo cuentan las subidas de puntos y los cambios de dueño (fundar o conquistar);
+            # una entidad que no estaba en el snapshot anterior también es un cambio
+            subida = (points > self.points[pos]) | (owners != self.owners[pos])
+            cambio = np.where(encontrado, subida, True)
+            previo_last = np.where(encontrado, self.last_change[pos], UNKNOWN)
+            previo_first = np.where(encontrado, self.first_seen[pos], ts)
+        else:
+            # Primer snapshot: aún no hay con qué comparar
+            cambio = np.zeros(len(ids), dtype=bool)
+            previo_last = np.full(len(ids), UNKNOWN, dtype=np.int64)
+            previo_first = np.full(len(ids), ts, dtype=np.int64)
+
+        self.last_change = np.where(cambio, ts, previo_last)
+        self.first_seen = previo_first
+        self.ids, self.points, self.owners = ids, points, owners
+        self.last_ts = ts
+
+
+class ActivityTracker:
+    """Detecta actividad real comparando snapshots consecutivos de players y towns.
+
+    Guarda por jugador y por ciudad la hora del último cambio y se actualiza
+    de forma incremental con cada dump nuevo. Un jugador está activo cuando
+    suben sus puntos o los de alguna de sus ciudades, o cuando gana una ciudad.
+    """
+
+    def __init__(self):
+        self.players = _EntityState()
+        self.towns = _EntityState()
+        self._lock = threading.RLock()
+
+    def update_players(self, timestamp, players_data):
+        ts = _epoch(timestamp)
+        if self.players.last_ts is not None and ts <= self.players.last_ts:
+            return
+        self.players.update(ts, players_data['ID'].to_numpy(), players_data['Puntos'].to_numpy())
+
+    def update_towns(self, timestamp, towns_data):
+        ts = _epoch(timestamp)
+        if self.towns.last_ts is not None and ts <= self.towns.last_ts:
+            return
+        self.towns.update(
+            ts,
+            towns_data['ID_Ciudad'].to_numpy(),
+            towns_data['Puntos_Ciudad'].to_numpy(),
+            towns_data['ID_Jugador'].fillna(0).to_numpy(),
+        )
+
+    def sync(self, store, world, until=None):
+        """Aplica, en orden, los snapshots del almacén que aún no se han procesado
+
+        Con ``until`` se queda en ese instante: los snapshots posteriores no se aplican.
+        """
+        with self._lock:
+            self._sync(store, world, until)
+
+    def _sync(self, store, world, until=None):
+        for dataset, estado, update in (
+            ('players', self.players, self.update_players),
+            ('towns', self.towns, self.update_towns),
+        ):
+            timestamps = store.timestamps(world, dataset)
+            if until is not None:
+                timestamps = [ts for ts in timestamps if ts <= until]
+            if not timestamps:
+                continue
+            desde = _epoch(timestamps[-1]) - REPLAY_WINDOW
+            if estado.last_ts is not None:
+                desde = max(desde, estado.last_ts + 1)
+            for ts in timestamps:
+                if _epoch(ts) >= desde:
+                    update(ts, store.read(world, dataset, ts))
+
+    def player_last_activity(self, player_ids):
+        """(último cambio, observado desde) por jugador en epoch; UNKNOWN si no hay cambio visto"""
+        estado = self.players
+        player_ids = np.asarray(player_ids, dtype=np.int64)
+        ultimo = np.full(len(player_ids), UNKNOWN, dtype=np.int64)
+        desde = np.full(len(player_ids), UNKNOWN, dtype=np.int64)
+        if len(estado.ids):
+            pos = np.minimum(np.searchsorted(estado.ids, player_ids), len(estado.ids) - 1)
+            encontrado = estado.ids[pos] == player_ids
+            ultimo = np.where(encontrado, estado.last_change[pos], UNKNOWN)
+            desde = np.where(encontrado, estado.first_seen[pos], UNKNOWN)
+
+        # Cambios en las ciudades cuentan para su dueño actual
+        ciudades = self.towns
+        if len(ciudades.ids) and len(player_ids):
+            orden = np.argsort(player_ids)
+            ids_ordenados = player_ids[orden]
+            pos = np.minimum(np.searchsorted(ids_ordenados, ciudades.owners), len(ids_ordenados) - 1)
+            valida = (ids_ordenados[pos] == ciudades.owners) & (ciudades.last_change != UNKNOWN)
+            np.maximum.at(ultimo, orden[pos[valida]], ciudades.last_change[valida])
+        return ultimo, desde
+
+    @property
+    def now(self):
+        marcas = [ts for ts in (self.players.last_ts, self.towns.last_ts) if ts is not None]
+        return max(marcas) if marcas else None
+
+    def classify(self, players_data, fallback=estimate_activity):
+        """Añade Estado/Ultima_Actividad reales; usa ``fallback`` donde aún no hay historial"""
+        with self._lock:
+            return self._classify(players_data, fallback)
+
+    def classify_at(self, store, world, timestamp, players_data, fallback=estimate_activity):
+        """Clasifica con el estado del detector en ``timestamp`` y no en el snapshot más nuevo
+
+        Si este detector ya pasó de ese instante no puede retroceder: repite la
+        ventana de snapshots hasta ``timestamp`` en uno nuevo.
+        """
+        with self._lock:
+            if self.now is None or self.now <= _epoch(timestamp):
+                self._sync(store, world, timestamp)
+                return self._classify(players_data, fallback)
+        anterior = ActivityTracker()
+        anterior.sync(store, world, until=timestamp)
+        return anterior.classify(players_data, fallback)
+
+    def _classify(self, players_data, fallback):
+        players_with_status = fallback(players_data)
+        now = self.now
+        if now is None:
+            players_with_status['Actividad_Medida'] = False
+            return players_with_status
+
+        ultimo, desde = self.player_last_activity(players_data['ID'].to_numpy())
+        conocido = ultimo != UNKNOWN
+        # Sin cambios durante más de 24h observadas: offline aunque no haya fecha exacta
+        sin_cambios = ~conocido & (desde != UNKNOWN) & (now - desde > STATUS_HOURS[-1])
+
+        horas = (now - ultimo) // HOUR
+        codigo = np.where(conocido, np.searchsorted(STATUS_HOURS, now - ultimo, side='left'), 3)
+        texto = np.where(
+            horas < 48,
+            np.char.add(np.char.add('hace ', horas.astype(str)), 'h'),
+            np.char.add(np.char.add('hace ', (horas // 24).astype(str)), 'd'),
+        )
+        sin_cambios_texto = np.char.add(np.char.add('+', ((now - desde) // HOUR).astype(str)), 'h sin cambios')
+        texto = np.where(conocido, texto, sin_cambios_texto)
+
+        medido = conocido | sin_cambios
+        estado = players_with_status['Estado'].to_numpy(dtype=object).copy()
+        ultima = players_with_status['Ultima_Actividad'].to_numpy(dtype=object).copy()
+        estado[medido] = STATUS_LABELS[codigo[medido]]
+        ultima[medido] = texto[medido]
+        ultima[~medido] = ultima[~medido] + ' (estimado)'
+
+        players_with_status['Estado'] = estado
+        players_with_status['Ultima_Actividad'] = ultima
+        players_with_status['Actividad_Medida'] = medido
+        return players_with_status
+
+
+def town_status_counts(towns_data, players_with_status):
+    """Ciudades por estado de su dueño; las que no tienen dueño van en ``GHOST_LABEL``.
+
+    Sustituye al merge completo de ciudades y jugadores: el estado de cada
+    dueño se busca por ID ordenado y se cuenta con ``bincount``.
+    """
+    estado = owner_column(towns_data, players_with_status, 'Estado', '')
+    codigo = pd.Categorical(estado, categories=STATUS_LABELS).codes.astype(np.int64)
+    sin_dueno = towns_data['ID_Jugador'].to_numpy() == 0
+    cuentas = np.bincount(codigo[~sin_dueno & (codigo >= 0)], minlength=len(STATUS_LABELS))
+    resultado = dict(zip(STATUS_LABELS, cuentas.tolist()))
+    resultado[GHOST_LABEL] = int(sin_dueno.sum())
+    return resultado
@@ -0,0 +1,89 @@
+"""Estadísticas de todas las alianzas en una sola pasada sobre los jugadores
+
+Los jugadores se agrupan por ``ID_Alianza`` con ``np.unique`` y todas las
+columnas salen de ``bincount`` sobre esos grupos; la mediana se toma del
+orden (alianza, puntos). No hay bucles por alianza.
+"""
+import numpy as np
+import pandas as pd
+
+from .activity import STATUS_LABELS
+from .kills import DELTA_PREFIX, KILL_COLUMNS
+from .metrics import MILITARY_LABELS
+
+
+def _label_counts(grupo, codigo, etiquetas, n):
+    """Matriz (alianzas x etiquetas) con cuántos miembros tienen cada etiqueta"""
+    validos = codigo >= 0
+    k = len(etiquetas)
+    cuentas = np.bincount(grupo[validos] * k + codigo[validos], minlength=n * k)
+    return cuentas.reshape(n, k)
+
+
+def alliance_summary(players_data, alliances_data=None):
+    """Una fila por alianza con miembros, puntos, mediana, rangos, ciudades y mezclas.
+
+    Las columnas de categoría militar y de estado de actividad (si la tabla
+    las trae) son recuentos de miembros con los nombres de las etiquetas.
+    Si trae los puntos de combate se suman por alianza, y ``En_Combate``
+    cuenta los miembros que han ganado puntos de combate desde el snapshot
+    anterior.
+    Con ``alliances_data`` se añaden nombre y ranking oficial y se ordena
+    por ese ranking. Los jugadores sin alianza (ID 0) no cuentan.
+    """
+    alianza = players_data['ID_Alianza'].to_numpy(dtype=np.int64)
+    con_alianza = alianza != 0
+    ids, grupo = np.unique(alianza[con_alianza], return_inverse=True)
+    n = len(ids)
+
+    puntos = players_data['Puntos'].to_numpy(dtype=np.int64)[con_alianza]
+    ranking = players_data['Ranking'].to_numpy(dtype=np.int64)[con_alianza]
+    ciudades = players_data['Ciudades'].to_numpy(dtype=np.int64)[con_alianza]
+
+    miembros = np.bincount(grupo, minlength=n)
+    total = np.bincount(grupo, weights=puntos, minlength=n).astype(np.int64)
+    mejor = np.full(n, np.iinfo(np.int64).max)
+    peor = np.zeros(n, dtype=np.int64)
+    np.minimum.at(mejor, grupo, ranking)
+    np.maximum.at(peor, grupo, ranking)
+
+    # Mediana: con los puntos ordenados dentro de cada alianza, los centrales del tramo
+    orden = np.lexsort((puntos, grupo))
+    inicios = np.zeros(n, dtype=np.int64)
+    np.cumsum(miembros[:-1], out=inicios[1:])
+    bajo = puntos[orden][inicios + (miembros - 1) // 2] if n else np.empty(0)
+    alto = puntos[orden][inicios + miembros // 2] if n else np.empty(0)
+
+    resumen = pd.DataFrame({
+        'ID_Alianza': ids,
+        'Jugadores': miembros,
+        'Puntos': total,
+        'Promedio': np.divide(total, miembros, out=np.zeros(n), where=miembros > 0).astype(np.int64),
+        'Mediana': ((bajo + alto) / 2).astype(np.int64),
+        'Mejor_Ranking': mejor,
+        'Peor_Ranking': peor,
+        'Ciudades': np.bincount(grupo, weights=ciudades, minlength=n).astype(np.int64),
+    })
+
+    for columna, etiquetas in (('Categoria_Militar', MILITARY_LABELS), ('Estado', list(STATUS_LABELS))):
+        if columna in players_data:
+            # Si la columna ya es categórica con esas etiquetas, los códigos salen sin recodificar
+            codigo = pd.Categorical(players_data[columna], categories=etiquetas).codes.astype(np.int64)
+            cuentas = _label_counts(grupo, codigo[con_alianza], etiquetas, n)
+            for i, etiqueta in enumerate(etiquetas):
+                resumen[etiqueta] = cuentas[:, i]
+
+    for columna in KILL_COLUMNS.values():
+        for nombre in (columna, DELTA_PREFIX + columna):
+            if nombre in players_data:
+                valores = players_data[nombre].to_numpy(dtype=np.int64)[con_alianza]
+                resumen[nombre] = np.bincount(grupo, weights=valores, minlength=n).astype(np.int64)
+    delta_total = DELTA_PREFIX + KILL_COLUMNS['kills_all']
+    if delta_total in players_data:
+        combatiendo = players_data[delta_total].to_numpy(dtype=np.int64)[con_alianza] > 0
+        resumen['En_Combate'] = np.bincount(grupo, weights=combatiendo, minlength=n).astype(np.int64)
+
+    if alliances_data is not None:
+        oficial = alliances_data[['ID_Alianza', 'Nombre_Alianza', 'Ranking_Alianza', 'Puntos_Alianza']]
+        resumen = oficial.merge(resumen, on='ID_Alianza', how='inner').sort_values('Ranking_Alianza', ignore_index=True)
+    return resumen.set_index('ID_Alianza')
@@ -0,0 +1,261 @@
+"""Registro de conquistas: ingesta incremental de conquers.txt y consultas por ventana de tiempo
+
+conquers.txt trae en cada publicación todas las conquistas de la temporada.
+El registro solo añade las filas posteriores a la última ya guardada, en
+Parquet de solo-añadir::
+
+    <root>/<mundo>/conquests/new/20261017T130000Z.parquet   (filas nuevas de cada descarga)
+    <root>/<mundo>/conquests/month/202610.parquet           (compactadas por mes de la conquista)
+
+``ConquestIndex`` lee el registro una vez por versión y lo indexa por
+ciudad, jugador, alianza y tiempo: cada consulta es un par de
+``searchsorted`` sobre rangos contiguos, sin recorrer la temporada.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .parse import CONQUERS_SCHEMA
+from .snapshots import _format_ts, _parse_ts
+from .spatial import _expand_slices
+
+# Se funden en los meses cuando se acumulan más descargas sueltas que esto
+COMPACT_PARTS = 48
+ROLES = ('all', 'gained', 'lost')
+ARROW_SCHEMA = pa.schema(list(CONQUERS_SCHEMA.items()))
+
+
+def _epoch(value):
+    """datetime o segundos Unix -> segundos Unix (None se queda en None)"""
+    if value is None or isinstance(value, (int, np.integer)):
+        return value
+    return int(value.timestamp())
+
+
+def _month_partition(fechas):
+    return pd.to_datetime(np.asarray(fechas), unit='s').strftime('%Y%m').to_numpy()
+
+
+class ConquestLog:
+    """Conquistas de cada mundo, añadidas una descarga tras otra sin reescribir lo guardado"""
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _dir(self, world, tier):
+        return os.path.join(self.root, world, 'conquests', tier)
+
+    def _files(self, world, tier):
+        try:
+            nombres = os.listdir(self._dir(world, tier))
+        except FileNotFoundError:
+            return []
+        return sorted(n[:-len('.parquet')] for n in nombres if n.endswith('.parquet'))
+
+    def _path(self, world, tier, partition):
+        return os.path.join(self._dir(world, tier), partition + '.parquet')
+
+    def _write(self, world, tier, partition, df):
+        path = self._path(world, tier, partition)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        pq.write_table(pa.Table.from_pandas(df, schema=ARROW_SCHEMA, preserve_index=False), tmp)
+        os.replace(tmp, path)
+
+    def last_timestamp(self, world):
+        """Publicación de la última descarga añadida, o None (es la versión del registro)"""
+        partes = self._files(world, 'new')
+        return _parse_ts(partes[-1]) if partes else None
+
+    def _tail(self, world):
+        """Última fecha guardada y las ciudades conquistadas en ella: las nuevas empiezan ahí.
+
+        Cada descarga solo añade filas posteriores a las anteriores, así que
+        basta con leer hacia atrás hasta pasar de esa fecha; si todo está
+        compactado, el máximo está en el último mes.
+        """
+        ficheros = [self._path(world, 'new', p) for p in self._files(world, 'new')[::-1]]
+        meses = self._files(world, 'month')
+        if meses:
+            ficheros.append(self._path(world, 'month', meses[-1]))
+        ultima, ciudades = None, []
+        for fichero in ficheros:
+            tabla = pq.read_table(fichero, columns=['ID_Ciudad', 'Fecha'])
+            fechas = tabla.column('Fecha').to_numpy()
+            if len(fechas) == 0:
+                continue
+            if ultima is None:
+                ultima = int(fechas.max())
+            ciudades.append(tabla.column('ID_Ciudad').to_numpy()[fechas == ultima])
+            if fechas.min() < ultima:
+                break
+        return ultima, np.concatenate(ciudades) if ciudades else np.empty(0, dtype=np.int64)
+
+    def append(self, world, conquers, timestamp):
+        """Añade las conquistas nuevas de una descarga de conquers.txt; devuelve cuántas.
+
+        Son nuevas las posteriores a la última guardada y, de la misma fecha,
+        las de ciudades que aún no estaban. Cada descarga deja su fichero
+        (vacío si no hubo conquistas) para que la versión avance con ella.
+        """
+        with self._lock:
+            if os.path.exists(self._path(world, 'new', _format_ts(timestamp))):
+                return 0
+            ultima, ciudades = self._tail(world)
+            if ultima is not None:
+                fechas = conquers['Fecha'].to_numpy()
+                nuevas = (fechas > ultima) | (
+                    (fechas == ultima) & ~np.isin(conquers['ID_Ciudad'].to_numpy(), ciudades)
+                )
+                conquers = conquers[nuevas]
+            conquers = conquers[list(CONQUERS_SCHEMA)].sort_values('Fecha', kind='stable', ignore_index=True)
+            self._write(world, 'new', _format_ts(timestamp), conquers)
+            if len(self._files(world, 'new')) > COMPACT_PARTS:
+                self._compact(world)
+            return len(conquers)
+
+    def compact(self, world):
+        """Funde las descargas sueltas (menos la última, que marca la versión) en sus meses"""
+        with self._lock:
+            self._compact(world)
+
+    def _compact(self, world):
+        partes = self._files(world, 'new')[:-1]
+        if not partes:
+            return
+        filas = pd.concat([pd.read_parquet(self._path(world, 'new', p)) for p in partes], ignore_index=True)
+        meses = _month_partition(filas['Fecha'])
+        for mes in np.unique(meses):
+            nuevas = filas[meses == mes]
+            if os.path.exists(self._path(world, 'month', mes)):
+                nuevas = pd.concat([pd.read_parquet(self._path(world, 'month', mes)), nuevas], ignore_index=True)
+            self._write(world, 'month', mes, nuevas.sort_values('Fecha', kind='stable', ignore_index=True))
+        for p in partes:
+            os.remove(self._path(world, 'new', p))
+
+    def read(self, world, start=None, end=None):
+        """Conquistas guardadas en orden de fecha; ``start``/``end`` (incluidos) limitan el intervalo"""
+        ficheros = [self._path(world, 'month', p) for p in self._files(world, 'month')]
+        ficheros += [self._path(world, 'new', p) for p in self._files(world, 'new')]
+        if not ficheros:
+            return ARROW_SCHEMA.empty_table().to_pandas()
+        filtro = None
+        if start is not None:
+            filtro = ds.field('Fecha') >= _epoch(start)
+        if end is not None:
+            hasta = ds.field('Fecha') <= _epoch(end)
+            filtro = hasta if filtro is None else filtro & hasta
+        tabla = ds.dataset(ficheros, format='parquet', schema=ARROW_SCHEMA).to_table(filter=filtro)
+        return tabla.to_pandas().sort_values('Fecha', kind='stable', ignore_index=True)
+
+
+class _KeyIndex:
+    """Filas agrupadas por clave y, dentro de cada clave, en orden de fecha (CSR)"""
+
+    def __init__(self, keys, fechas):
+        # Las filas ya vienen por fecha: el argsort estable mantiene ese orden en cada clave
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+        self.fechas = fechas[self.order]
+
+    def rows(self, key, start, end):
+        inicio = np.searchsorted(self.keys, key, side='left')
+        fin = np.searchsorted(self.keys, key, side='right')
+        fechas = self.fechas[inicio:fin]
+        desde = 0 if start is None else np.searchsorted(fechas, start, side='left')
+        hasta = len(fechas) if end is None else np.searchsorted(fechas, end, side='right')
+        return self.order[inicio + desde:inicio + hasta]
+
+
+class ConquestIndex:
+    """Índices sobre las conquistas de una versión del registro.
+
+    Todas las consultas devuelven filas (posiciones en ``data``) en orden de
+    fecha; ``start``/``end`` son datetime o segundos Unix, ambos incluidos.
+    Para alianzas y jugadores, ``role`` elige las ganadas (``gained``), las
+    perdidas (``lost``) o ambas (``all``).
+    """
+
+    def __init__(self, conquests):
+        self.data = conquests.reset_index(drop=True)
+        self.fechas = self.data['Fecha'].to_numpy(dtype=np.int64)
+        self._towns = _KeyIndex(self.data['ID_Ciudad'].to_numpy(dtype=np.int64), self.fechas)
+        self._players = {
+            'gained': _KeyIndex(self.data['ID_Nuevo'].to_numpy(dtype=np.int64), self.fechas),
+            'lost': _KeyIndex(self.data['ID_Anterior'].to_numpy(dtype=np.int64), self.fechas),
+        }
+        self._alliances = {
+            'gained': _KeyIndex(self.data['ID_Alianza_Nueva'].to_numpy(dtype=np.int64), self.fechas),
+            'lost': _KeyIndex(self.data['ID_Alianza_Anterior'].to_numpy(dtype=np.int64), self.fechas),
+        }
+
+    def __len__(self):
+        return len(self.data)
+
+    def window(self, start=None, end=None):
+        """Filas del intervalo de tiempo"""
+        desde = 0 if start is None else np.searchsorted(self.fechas, _epoch(start), side='left')
+        hasta = len(self.fechas) if end is None else np.searchsorted(self.fechas, _epoch(end), side='right')
+        return np.arange(desde, hasta)
+
+    def _by_role(self, indices, key, start, end, role):
+        if role not in ROLES:
+            raise ValueError(f"Rol desconocido: {role} (disponibles: {ROLES})")
+        start, end = _epoch(start), _epoch(end)
+        if role != 'all':
+            return indices[role].rows(key, start, end)
+        # Una conquista interna (misma alianza o jugador) sale en las dos listas: se une sin repetir
+        return np.union1d(indices['gained'].rows(key, start, end), indices['lost'].rows(key, start, end))
+
+    def by_town(self, town_id, start=None, end=None):
+        """Conquistas de una ciudad"""
+        return self._towns.rows(town_id, _epoch(start), _epoch(end))
+
+    def by_player(self, player_id, start=None, end=None, role='all'):
+        """Conquistas hechas (``gained``) o sufridas (``lost``) por un jugador"""
+        return self._by_role(self._players, player_id, start, end, role)
+
+    def by_alliance(self, alliance_id, start=None, end=None, role='all'):
+        """Conquistas hechas (``gained``) o sufridas (``lost``) por una alianza"""
+        return self._by_role(self._alliances, alliance_id, start, end, role)
+
+    def near(self, grid, player_id, radius, start=None, end=None):
+        """Conquistas de ciudades a distancia <= radius de alguna ciudad del jugador.
+
+        ``grid`` es el ``TownGrid`` del snapshot de ciudades. Devuelve
+        (filas, distancia a la ciudad propia más cercana).
+        """
+        propias = grid.player_rows(player_id)
+        _, filas, distancia = grid.query_radius(grid.x[propias], grid.y[propias], radius)
+        # Menor distancia por ciudad del entorno
+        orden = np.lexsort((distancia, filas))
+        filas, distancia = filas[orden], distancia[orden]
+        primera = np.r_[True, filas[1:] != filas[:-1]] if len(filas) else np.empty(0, bool)
+        ciudades, distancia = grid.ids[filas[primera]], distancia[primera]
+
+        # Cada ciudad del entorno es un rango del índice por ciudad, ya cortado por tiempo
+        indice = self._towns
+        inicio = np.searchsorted(indice.keys, ciudades, side='left')
+        fin = np.searchsorted(indice.keys, ciudades, side='right')
+        posiciones = _expand_slices(inicio, fin - inicio)
+        dentro = np.ones(len(posiciones), dtype=bool)
+        if start is not None:
+            dentro &= indice.fechas[posiciones] >= _epoch(start)
+        if end is not None:
+            dentro &= indice.fechas[posiciones] <= _epoch(end)
+        distancia = np.repeat(distancia, fin - inicio)[dentro]
+        filas = indice.order[posiciones[dentro]]
+        orden = np.argsort(filas, kind='stable')
+        return filas[orden], distancia[orden]
+
+    def frame(self, rows):
+        """Las conquistas de ``rows`` con la fecha como datetime UTC"""
+        resultado = self.data.iloc[np.asarray(rows, dtype=np.int64)].reset_index(drop=True)
+        resultado['Fecha'] = pd.to_datetime(resultado['Fecha'], unit='s', utc=True)
+        return resultado
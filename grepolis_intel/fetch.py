@@ -0,0 +1,181 @@
+"""Descarga concurrente y condicional de los dumps públicos de un mundo de Grepolis"""
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .perf import RECORDER
+
+BASE_URL = "https://{world}.grepolis.com/data"
+
+# Nombre lógico -> fichero publicado por Grepolis en /data/
+DUMPS = {
+    'players': 'players.txt',
+    'alliances': 'alliances.txt',
+    'towns': 'towns.txt',
+    'conquers': 'conquers.txt',
+    'kills_att': 'player_kills_att.txt',
+    'kills_def': 'player_kills_def.txt',
+    'kills_all': 'player_kills_all.txt',
+}
+
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class FetchResult:
+    """Resultado de descargar un dump"""
+    name: str
+    url: str
+    status: int
+    body: Optional[bytes] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self):
+        return self.body is not None
+
+    @property
+    def not_modified(self):
+        return self.status == 304
+
+
+class WorldFetcher:
+    """Descarga los dumps de un mundo sobre una única sesión HTTP con pool de conexiones.
+
+    Recuerda ETag/Last-Modified de cada dump para que las descargas repetidas
+    de ficheros sin cambios se resuelvan con un 304, y prefiere la variante
+    ``.gz`` de cada dump descomprimiéndola en streaming. ``remember`` le da
+    los validadores guardados de una ejecución anterior.
+    """
+
+    def __init__(self, world="es137", base_url=None, timeout=30, prefer_gzip=True):
+        self.world = world
+        # base_url puede llevar {world} (p. ej. un servidor local con una carpeta por mundo)
+        self.base_url = (base_url or BASE_URL).replace('{world}', world).rstrip('/')
+        self.timeout = timeout
+        self.prefer_gzip = prefer_gzip
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=len(DUMPS) * 2)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._lock = threading.Lock()
+        self._cached: Dict[str, FetchResult] = {}
+        self._sin_gzip = set()
+
+    def close(self):
+        self.session.close()
+
+    def remember(self, validators):
+        """Validadores guardados ({dump: {url, etag, last_modified}}) para los dumps aún sin descargar.
+
+        La siguiente descarga de esos dumps ya es condicional; un 304 vuelve
+        sin cuerpo, porque el contenido es el que ya está guardado.
+        """
+        with self._lock:
+            for name, validador in validators.items():
+                if name in DUMPS and name not in self._cached:
+                    self._cached[name] = FetchResult(
+                        name, validador['url'], 304, None, validador.get('etag'), validador.get('last_modified')
+                    )
+
+    def _urls(self, name):
+        fichero = DUMPS[name]
+        url = f"{self.base_url}/{fichero}"
+        if self.prefer_gzip and name not in self._sin_gzip:
+            return [url + '.gz', url]
+        return [url]
+
+    def _conditional_headers(self, previo, url):
+        headers = {}
+        if previo is not None and previo.url == url:
+            if previo.etag:
+                headers['If-None-Match'] = previo.etag
+            if previo.last_modified:
+                headers['If-Modified-Since'] = previo.last_modified
+        return headers
+
+    @staticmethod
+    def _read_body(response):
+        """Lee el cuerpo por bloques, descomprimiendo gzip sobre la marcha si hace falta"""
+        partes = []
+        descompresor = None
+        primero = True
+        descomprimiendo = 0.0
+        for bloque in response.iter_content(CHUNK_SIZE):
+            if not bloque:
+                continue
+            if primero:
+                # Los .gz se sirven como fichero, no como Content-Encoding
+                if bloque[:2] == b'\x1f\x8b':
+                    descompresor = zlib.decompressobj(wbits=31)
+                primero = False
+            if descompresor is None:
+                partes.append(bloque)
+                continue
+            inicio = time.perf_counter()
+            partes.append(descompresor.decompress(bloque))
+            descomprimiendo += time.perf_counter() - inicio
+        if descompresor is not None:
+            partes.append(descompresor.flush())
+            RECORDER.observe('decode', descomprimiendo)
+        return b''.join(partes)
+
+    def fetch(self, name):
+        """Descarga un dump; devuelve el cuerpo en caché si el servidor responde 304"""
+        with self._lock:
+            previo = self._cached.get(name)
+
+        inicio = time.perf_counter()
+        resultado = None
+        for url in self._urls(name):
+            try:
+                headers = self._conditional_headers(previo, url)
+                with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                    if response.status_code == 404 and url.endswith('.gz'):
+                        with self._lock:
+                            self._sin_gzip.add(name)
+                        continue
+
+                    if response.status_code == 304 and previo is not None:
+                        resultado = FetchResult(
+                            name, url, 304, previo.body, previo.etag, previo.last_modified
+                        )
+                    elif response.status_code == 200:
+                        resultado = FetchResult(
+                            name, url, 200, self._read_body(response),
+                            response.headers.get('ETag'),
+                            response.headers.get('Last-Modified'),
+                        )
+                    else:
+                        resultado = FetchResult(name, url, response.status_code)
+            except Exception as e:
+                resultado = FetchResult(name, url, 0, error=str(e))
+            break
+
+        if resultado is None:
+            resultado = FetchResult(name, self._urls(name)[-1], 404)
+        resultado.elapsed = time.perf_counter() - inicio
+        RECORDER.observe('fetch', resultado.elapsed)
+
+        if resultado.status == 200:
+            with self._lock:
+                self._cached[name] = resultado
+        return resultado
+
+    def fetch_all(self, names: Optional[Iterable[str]] = None):
+        """Descarga en paralelo todos los dumps pedidos; devuelve {nombre: FetchResult}"""
+        names = list(names or DUMPS)
+        with ThreadPoolExecutor(max_workers=len(names)) as pool:
+            resultados = pool.map(self.fetch, names)
+            return dict(zip(names, resultados))
@@ -0,0 +1,311 @@
+"""Series históricas de jugadores y alianzas a partir de los snapshots
+
+El historial guarda solo las columnas numéricas de cada dump, en Parquet
+particionado por tiempo y con menos resolución cuanto más antiguo::
+
+    <root>/<mundo>/history/<tipo>/hour/20261017T130000Z.parquet   (una por snapshot)
+    <root>/<mundo>/history/<tipo>/day/202610.parquet              (último valor de cada día, por mes)
+    <root>/<mundo>/history/<tipo>/week/2026.parquet               (último de cada semana ISO, por año)
+
+Los cortes entre niveles son los de ``RetentionPolicy``. Cada fichero va
+ordenado por ID, así que leer unas pocas entidades de toda una temporada
+solo toca algunos grupos de filas.
+"""
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from .snapshots import DEFAULT_RETENTION, _format_ts, _parse_ts
+
+# Tipo de historial -> (dump de origen, columna ID, columnas guardadas)
+KINDS = {
+    'players': ('players', 'ID', ['Puntos', 'Ranking', 'Ciudades', 'ID_Alianza']),
+    'alliances': ('alliances', 'ID_Alianza', ['Puntos_Alianza', 'Ranking_Alianza', 'Ciudades_Alianza', 'Miembros']),
+}
+TIERS = ('week', 'day', 'hour')
+ROW_GROUP_SIZE = 16_384
+DAY = 86_400
+GROWTH_WINDOWS = {'24h': timedelta(hours=24), '7d': timedelta(days=7)}
+
+
+def _epoch(timestamp):
+    return int(timestamp.timestamp())
+
+
+def _day_partition(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y%m')
+
+
+def _partition_start(particion):
+    """Primer instante (epoch) de una partición mensual 'AAAAMM'"""
+    return _epoch(datetime.strptime(particion, '%Y%m').replace(tzinfo=timezone.utc))
+
+
+def _partition_end(particion):
+    """Primer instante (epoch) del mes siguiente a una partición 'AAAAMM'"""
+    anio, mes = int(particion[:4]), int(particion[4:])
+    return _epoch(datetime(anio + mes // 12, mes % 12 + 1, 1, tzinfo=timezone.utc))
+
+
+def _week_partition(ts):
+    return str(datetime.fromtimestamp(ts, timezone.utc).isocalendar()[0])
+
+
+def _last_per_period(df, id_column, period):
+    """Última fila de cada entidad en cada periodo (``period``: array alineado con df)"""
+    clave = pd.DataFrame({'id': df[id_column].to_numpy(), 'p': period, 'ts': df['ts'].to_numpy()})
+    orden = np.lexsort((clave['ts'].to_numpy(), clave['id'].to_numpy(), clave['p'].to_numpy()))
+    clave = clave.iloc[orden]
+    ultimo = ~clave.duplicated(['p', 'id'], keep='last').to_numpy()
+    return df.iloc[orden[ultimo]]
+
+
+class HistoryStore:
+    """Historial columnar por mundo y tipo ('players' o 'alliances')"""
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _dir(self, world, kind, tier):
+        return os.path.join(self.root, world, 'history', kind, tier)
+
+    def _files(self, world, kind, tier):
+        try:
+            nombres = os.listdir(self._dir(world, kind, tier))
+        except FileNotFoundError:
+            return []
+        return sorted(n[:-len('.parquet')] for n in nombres if n.endswith('.parquet'))
+
+    def _path(self, world, kind, tier, partition):
+        return os.path.join(self._dir(world, kind, tier), partition + '.parquet')
+
+    def _write(self, world, kind, tier, partition, df):
+        path = self._path(world, kind, tier, partition)
+        if len(df) == 0:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        id_column = KINDS[kind][1]
+        df = df.sort_values([id_column, 'ts'], ignore_index=True)
+        tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        df.to_parquet(tmp, index=False, row_group_size=ROW_GROUP_SIZE)
+        os.replace(tmp, path)
+
+    def _read_partition(self, world, kind, tier, partition, ids=None):
+        id_column = KINDS[kind][1]
+        filtros = [(id_column, 'in', list(ids))] if ids is not None else None
+        return pd.read_parquet(self._path(world, kind, tier, partition), filters=filtros)
+
+    def append(self, world, kind, data, timestamp):
+        """Añade las filas de un snapshot al nivel horario (no reescribe uno existente)"""
+        _, id_column, columnas = KINDS[kind]
+        path = self._path(world, kind, 'hour', _format_ts(timestamp))
+        if os.path.exists(path):
+            return
+        filas = data[[id_column] + columnas].copy()
+        filas.insert(0, 'ts', np.full(len(filas), _epoch(timestamp), dtype=np.int64))
+        self._write(world, kind, 'hour', _format_ts(timestamp), filas)
+
+    def last_timestamp(self, world, kind):
+        """Último instante guardado en cualquier nivel, o None"""
+        for tier in ('hour', 'day', 'week'):
+            particiones = self._files(world, kind, tier)
+            if not particiones:
+                continue
+            if tier == 'hour':
+                return _parse_ts(particiones[-1])
+            ts = pd.read_parquet(self._path(world, kind, tier, particiones[-1]), columns=['ts'])['ts'].max()
+            return datetime.fromtimestamp(int(ts), timezone.utc)
+        return None
+
+    def sync(self, snapshots, world, policy=DEFAULT_RETENTION, now=None):
+        """Pasa al historial los snapshots nuevos del almacén y compacta; devuelve cuántos añadió"""
+        with self._lock:
+            nuevos = 0
+            for kind, (dataset, _, _) in KINDS.items():
+                ultimo = self.last_timestamp(world, kind)
+                for ts in snapshots.timestamps(world, dataset):
+                    if ultimo is None or ts > ultimo:
+                        datos = snapshots.read(world, dataset, ts)
+                        if datos is not None:
+                            self.append(world, kind, datos, ts)
+                            nuevos += 1
+                self.compact(world, kind, policy, now)
+            return nuevos
+
+    def compact(self, world, kind, policy=DEFAULT_RETENTION, now=None):
+        """Baja de nivel lo que envejece: horas -> último del día -> último de la semana"""
+        now = _epoch(now or datetime.now(timezone.utc))
+
+        # Horario -> diario, por días completos: cada partición mensual se reescribe una vez al día
+        limite = (now - policy.keep_all_hours * 3600) // DAY * DAY
+        viejas = [p for p in self._files(world, kind, 'hour') if _epoch(_parse_ts(p)) < limite]
+        if viejas:
+            filas = pd.concat([self._read_partition(world, kind, 'hour', p) for p in viejas], ignore_index=True)
+            self._merge(world, kind, 'day', filas, filas['ts'].to_numpy() // DAY, _day_partition)
+            for p in viejas:
+                os.remove(self._path(world, kind, 'hour', p))
+
+        # Diario -> semanal, por semanas ISO completas (desde el lunes)
+        dias = (now - policy.keep_daily_days * DAY) // DAY
+        limite = (dias - (dias + 3) % 7) * DAY  # el 1/1/1970 fue jueves
+        for particion in self._files(world, kind, 'day'):
+            if _partition_start(particion) >= limite:
+                continue
+            filas = self._read_partition(world, kind, 'day', particion)
+            viejas = filas['ts'].to_numpy() < limite
+            if not viejas.any():
+                continue
+            semana = pd.to_datetime(filas['ts'][viejas], unit='s').dt.isocalendar()
+            periodo = (semana['year'] * 100 + semana['week']).to_numpy()
+            self._merge(world, kind, 'week', filas[viejas], periodo, _week_partition)
+            self._write(world, kind, 'day', particion, filas[~viejas])
+
+        # Caducidad total
+        if policy.max_age_days is not None:
+            limite = now - policy.max_age_days * DAY
+            for particion in self._files(world, kind, 'week'):
+                filas = self._read_partition(world, kind, 'week', particion)
+                if (filas['ts'] < limite).any():
+                    self._write(world, kind, 'week', particion, filas[filas['ts'] >= limite])
+
+    def _merge(self, world, kind, tier, filas, periodo, particion_de):
+        """Funde ``filas`` en las particiones de ``tier`` dejando la última por entidad y periodo"""
+        id_column = KINDS[kind][1]
+        filas = _last_per_period(filas, id_column, periodo)
+        instantes, inversa = np.unique(filas['ts'].to_numpy(), return_inverse=True)
+        particiones = np.array([particion_de(ts) for ts in instantes])[inversa]
+        for particion in np.unique(particiones):
+            nuevas = filas[particiones == particion]
+            if os.path.exists(self._path(world, kind, tier, particion)):
+                nuevas = pd.concat([self._read_partition(world, kind, tier, particion), nuevas], ignore_index=True)
+            # Se vuelve a reducir: un periodo puede tener filas de la fusión anterior
+            if tier == 'day':
+                periodo_total = nuevas['ts'].to_numpy() // DAY
+            else:
+                semana = pd.to_datetime(nuevas['ts'], unit='s').dt.isocalendar()
+                periodo_total = (semana['year'] * 100 + semana['week']).to_numpy()
+            self._write(world, kind, tier, particion, _last_per_period(nuevas, id_column, periodo_total))
+
+    def read(self, world, kind, ids=None, start=None, end=None):
+        """Filas (ts, ID, columnas) de todos los niveles, en orden de entidad y tiempo.
+
+        ``ids`` limita a esas entidades; ``start``/``end`` (datetime) al intervalo.
+        """
+        _, id_column, columnas = KINDS[kind]
+        desde = _epoch(start) if start is not None else None
+        hasta = _epoch(end) if end is not None else None
+        rutas = []
+        for tier in TIERS:
+            for particion in self._files(world, kind, tier):
+                if tier == 'hour':
+                    ts = _epoch(_parse_ts(particion))
+                    if (desde is not None and ts < desde) or (hasta is not None and ts > hasta):
+                        continue
+                elif tier == 'day' and desde is not None and _partition_end(particion) <= desde:
+                    continue
+                rutas.append(self._path(world, kind, tier, particion))
+        if not rutas:
+            return pd.DataFrame(columns=['ts', id_column] + columnas)
+
+        # Un único escaneo de todos los ficheros: el filtro usa las estadísticas de cada grupo de filas
+        filtro = None
+        for condicion in (
+            ds.field(id_column).isin(list(ids)) if ids is not None else None,
+            ds.field('ts') >= desde if desde is not None else None,
+            ds.field('ts') <= hasta if hasta is not None else None,
+        ):
+            if condicion is not None:
+                filtro = condicion if filtro is None else filtro & condicion
+        filas = ds.dataset(rutas, format='parquet').to_table(filter=filtro).to_pandas()
+        orden = np.lexsort((filas['ts'].to_numpy(), filas[id_column].to_numpy()))
+        return filas.iloc[orden].reset_index(drop=True)
+
+
+def _base_rows(keys, ts, window):
+    """Para cada fila, la última de la misma entidad con ts <= ts - window (o la primera).
+
+    ``keys`` y ``ts`` van ordenados por entidad y tiempo.
+    """
+    compuesta = (keys.astype(np.int64) << 32) | ts.astype(np.int64)
+    inicio = np.searchsorted(keys, keys, side='left')
+    objetivo = (keys.astype(np.int64) << 32) | (ts.astype(np.int64) - window)
+    base = np.searchsorted(compuesta, objetivo, side='right') - 1
+    return np.maximum(base, inicio)
+
+
+def rolling_growth(series, column, window=GROWTH_WINDOWS['7d'], id_column=None):
+    """Ritmo por día de ``column`` en la ventana que acaba en cada fila.
+
+    ``series`` son filas del historial (orden de entidad y tiempo). Si la
+    entidad tiene menos historial que la ventana, se usa el que haya.
+    """
+    ts = series['ts'].to_numpy(dtype=np.int64)
+    keys = series[id_column].to_numpy() if id_column else np.zeros(len(series), dtype=np.int64)
+    base = _base_rows(keys, ts, int(window.total_seconds()))
+    valores = series[column].to_numpy(dtype=np.float64)
+    dias = (ts - ts[base]) / DAY
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ritmo = np.where(dias > 0, (valores - valores[base]) / dias, np.nan)
+    return pd.Series(ritmo, index=series.index, name=f'{column}_por_dia')
+
+
+def growth_rates(history, kind, window=GROWTH_WINDOWS['7d'], columns=None):
+    """Ritmo por día actual de cada entidad (su última fila), indexado por ID"""
+    _, id_column, columnas = KINDS[kind]
+    columns = columns or columnas[:2]
+    if len(history) == 0:
+        return pd.DataFrame(columns=[f'{c}_por_dia' for c in columns] + ['Dias_Medidos'])
+    ids = history[id_column].to_numpy()
+    ultima = np.r_[ids[1:] != ids[:-1], True]
+    ts = history['ts'].to_numpy(dtype=np.int64)
+    base = _base_rows(ids, ts, int(window.total_seconds()))
+    resultado = pd.DataFrame(index=pd.Index(ids[ultima], name=id_column))
+    dias = (ts - ts[base]) / DAY
+    for columna in columns:
+        valores = history[columna].to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ritmo = np.where(dias > 0, (valores - valores[base]) / dias, np.nan)
+        resultado[f'{columna}_por_dia'] = ritmo[ultima]
+    resultado['Dias_Medidos'] = dias[ultima]
+    return resultado
+
+
+def entity_series(history, world, kind, entity_id, start=None):
+    """Serie temporal de una entidad con ts como fecha y su ritmo de 24h y 7d"""
+    _, id_column, columnas = KINDS[kind]
+    filas = history.read(world, kind, ids=[int(entity_id)], start=start)
+    serie = filas[['ts'] + columnas].copy()
+    for etiqueta, ventana in GROWTH_WINDOWS.items():
+        serie[f'{columnas[0]}_dia_{etiqueta}'] = rolling_growth(filas, columnas[0], ventana)
+    serie['Fecha'] = pd.to_datetime(serie['ts'], unit='s', utc=True)
+    return serie.set_index('Fecha')
+
+
+def project_targets(targets, rates, player_id=None, column='Puntos_por_dia'):
+    """Añade a ``targets`` los días estimados hasta alcanzar cada objetivo.
+
+    ``targets`` trae Puntos_Necesarios e ID_Objetivo, y el ID del que sube en
+    la columna ID o en ``player_id``. Se alcanza al objetivo a la velocidad
+    con que se le recortan puntos: mi ritmo menos el suyo. Sin recorte (o sin
+    historial) no hay estimación.
+    """
+    ritmo = rates[column] if len(rates) else pd.Series(dtype=np.float64)
+    if player_id is not None:
+        mio = np.full(len(targets), ritmo.get(player_id, np.nan))
+    else:
+        mio = targets['ID'].map(ritmo).to_numpy(dtype=np.float64)
+    suyo = targets['ID_Objetivo'].map(ritmo).fillna(0.0).to_numpy(dtype=np.float64)
+    cierre = mio - suyo
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dias = np.where(cierre > 0, targets['Puntos_Necesarios'].to_numpy() / cierre, np.nan)
+    proyeccion = targets.copy()
+    proyeccion['Recorte_Dia'] = cierre
+    proyeccion['Dias_Estimados'] = dias
+    return proyeccion
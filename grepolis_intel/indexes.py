@@ -0,0 +1,206 @@
+"""Índices de búsqueda por snapshot compartidos por todas las pestañas
+
+Se construyen una vez por snapshot y evitan recorrer el DataFrame completo
+con máscaras booleanas en cada rerun: nombre -> fila en un dict, ID -> fila
+con ``searchsorted``, miembros de cada alianza como rangos contiguos (CSR)
+y órdenes precalculados para paginar tablas enteras.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+class PlayerIndex:
+    """Índices sobre la tabla de jugadores (y opcionalmente la de alianzas).
+
+    Todas las filas son posiciones (``iloc``) en los DataFrames indexados.
+    """
+
+    def __init__(self, players, alliances=None):
+        self.players = players
+        self.alliances = alliances
+        n = len(players)
+
+        # Nombre -> fila (si hay repetidos gana el de mejor ranking, como antes con iloc[0])
+        nombres = players['Nombre'].to_numpy(dtype=object)
+        self._by_name = dict(zip(nombres[::-1], range(n - 1, -1, -1)))
+
+        ids = players['ID'].to_numpy(dtype=np.int64)
+        self._id_order = np.argsort(ids, kind='stable')
+        self._ids_sorted = ids[self._id_order]
+
+        # Orden por ranking y posición de cada fila en ese orden
+        ranking = players['Ranking'].to_numpy()
+        self.rank_order = np.argsort(ranking, kind='stable')
+        self._ranking_sorted = ranking[self.rank_order]
+        self.rank_position = np.empty(n, dtype=np.int64)
+        self.rank_position[self.rank_order] = np.arange(n)
+
+        # Miembros por alianza: filas ordenadas por (alianza, ranking) + offsets
+        alianzas = players['ID_Alianza'].to_numpy(dtype=np.int64)
+        self._member_rows = self.rank_order[np.argsort(alianzas[self.rank_order], kind='stable')]
+        agrupadas = alianzas[self._member_rows]
+        self.alliance_ids, inicios = np.unique(agrupadas, return_index=True)
+        self._alliance_offsets = np.append(inicios, n)
+
+        # Jugadores por estado de actividad, si la tabla lo trae
+        self.status_counts = players['Estado'].value_counts().to_dict() if 'Estado' in players else {}
+
+        if alliances is not None:
+            ids_alianza = alliances['ID_Alianza'].to_numpy(dtype=np.int64)
+            self._alliance_order = np.argsort(ids_alianza, kind='stable')
+            self._alliance_ids_sorted = ids_alianza[self._alliance_order]
+            ranking_alianza = alliances['Ranking_Alianza'].to_numpy()
+            self._alliance_rank_order = np.argsort(ranking_alianza, kind='stable')
+            self._alliance_ranking_sorted = ranking_alianza[self._alliance_rank_order]
+
+    def row_by_name(self, name):
+        """Fila del jugador con ese nombre exacto, o None"""
+        return self._by_name.get(name)
+
+    def rows_by_id(self, player_ids):
+        """Filas de los IDs dados (-1 si no existen)"""
+        player_ids = np.atleast_1d(np.asarray(player_ids, dtype=np.int64))
+        if len(self._ids_sorted) == 0:
+            return np.full(len(player_ids), -1)
+        pos = np.minimum(np.searchsorted(self._ids_sorted, player_ids), len(self._ids_sorted) - 1)
+        return np.where(self._ids_sorted[pos] == player_ids, self._id_order[pos], -1)
+
+    def alliance_rows(self, alliance_id):
+        """Filas de los miembros de una alianza, ordenadas por ranking"""
+        i = np.searchsorted(self.alliance_ids, alliance_id)
+        if i == len(self.alliance_ids) or self.alliance_ids[i] != alliance_id:
+            return np.empty(0, dtype=np.int64)
+        return self._member_rows[self._alliance_offsets[i]:self._alliance_offsets[i + 1]]
+
+    def rank_window(self, ranking_min, ranking_max):
+        """Filas con Ranking entre los dos valores (ambos incluidos), en orden de ranking"""
+        inicio = np.searchsorted(self._ranking_sorted, ranking_min, side='left')
+        fin = np.searchsorted(self._ranking_sorted, ranking_max, side='right')
+        return self.rank_order[inicio:fin]
+
+    def alliance_row(self, alliance_id):
+        """Fila de la alianza en la tabla de alianzas, o None"""
+        if self.alliances is None or len(self._alliance_ids_sorted) == 0:
+            return None
+        i = np.searchsorted(self._alliance_ids_sorted, alliance_id)
+        if i == len(self._alliance_ids_sorted) or self._alliance_ids_sorted[i] != alliance_id:
+            return None
+        return int(self._alliance_order[i])
+
+    def alliance_rows_by_id(self, alliance_ids):
+        """Filas de las alianzas dadas en la tabla de alianzas (-1 si no existen)"""
+        alliance_ids = np.atleast_1d(np.asarray(alliance_ids, dtype=np.int64))
+        if self.alliances is None or len(self._alliance_ids_sorted) == 0:
+            return np.full(len(alliance_ids), -1)
+        pos = np.minimum(np.searchsorted(self._alliance_ids_sorted, alliance_ids), len(self._alliance_ids_sorted) - 1)
+        return np.where(self._alliance_ids_sorted[pos] == alliance_ids, self._alliance_order[pos], -1)
+
+    def alliance_rank_window(self, ranking_min, ranking_max):
+        """Filas de alianzas con Ranking_Alianza entre los dos valores"""
+        inicio = np.searchsorted(self._alliance_ranking_sorted, ranking_min, side='left')
+        fin = np.searchsorted(self._alliance_ranking_sorted, ranking_max, side='right')
+        return self._alliance_rank_order[inicio:fin]
+
+
+RANK_JUMPS = (5, 10, 25, 50)
+
+
+class RankGaps:
+    """Puntos que le faltan a cada jugador para subir cada salto de ranking, todos a la vez.
+
+    No usa la columna Ranking como posición: ordena los puntos y, con
+    ``searchsorted``, cuenta cuántos jugadores tienen más puntos que cada uno
+    (los empates comparten puesto). Subir ``salto`` puestos es superar a quien
+    ocupa ``salto`` posiciones por encima en ese orden, así que hace falta
+    tener al menos un punto más que él.
+    """
+
+    def __init__(self, players, jumps=RANK_JUMPS):
+        self.players = players
+        self.jumps = np.asarray(jumps, dtype=np.int64)
+        puntos = players['Puntos'].to_numpy(dtype=np.int64)
+
+        # Orden por puntos descendentes; en empate, el del ranking oficial
+        self.order = np.lexsort((players['Ranking'].to_numpy(), -puntos))
+        descendentes = puntos[self.order]
+        # Jugadores con estrictamente más puntos que cada fila
+        self.position = np.searchsorted(-descendentes, -puntos, side='left')
+
+        objetivo = self.position[:, None] - self.jumps[None, :]
+        posible = objetivo >= 0
+        objetivo = np.maximum(objetivo, 0)
+        # Una fila por jugador y una columna por salto; -1 si no se puede subir tanto
+        self.target_rows = np.where(posible, self.order[objetivo], -1)
+        self.needed = np.where(posible, descendentes[objetivo] - puntos[:, None] + 1, -1)
+
+    def _jump_column(self, jump):
+        columna = np.flatnonzero(self.jumps == jump)
+        if len(columna) == 0:
+            raise ValueError(f"Salto no calculado: {jump} (disponibles: {self.jumps.tolist()})")
+        return int(columna[0])
+
+    def needed_for(self, jump, rows=None):
+        """Puntos para subir ``jump`` puestos de las filas dadas (todas por defecto); -1 si no es posible"""
+        columna = self.needed[:, self._jump_column(jump)]
+        return columna if rows is None else columna[rows]
+
+    def targets_for(self, jump, rows=None):
+        """Fila del jugador a superar para subir ``jump`` puestos; -1 si no es posible"""
+        columna = self.target_rows[:, self._jump_column(jump)]
+        return columna if rows is None else columna[rows]
+
+
+class SortedPages:
+    """Órdenes de una tabla precalculados por snapshot para paginarla sin ``sort_values``.
+
+    ``keys`` es ``{etiqueta: (valores, ascendente)}`` con una columna (o array)
+    por orden; ``groups`` es la etiqueta de grupo de cada fila (p. ej. el
+    estado) para filtrar. Cada combinación de orden y grupo es una permutación
+    de filas, así que una página es un slice: la 500 cuesta lo mismo que la 1.
+    Los empates conservan el orden de las filas de la tabla.
+    """
+
+    def __init__(self, keys, groups=None):
+        self._orders = {}
+        for etiqueta, (valores, ascendente) in keys.items():
+            orden = pc.array_sort_indices(
+                pa.array(valores), order='ascending' if ascendente else 'descending', null_placement='at_end',
+            )
+            self._orders[etiqueta, None] = orden.to_numpy().astype(np.int64)
+        self.sorts = list(keys)
+        self.groups = []
+        if groups is not None:
+            codigos, self.groups = pd.factorize(np.asarray(groups, dtype=object), sort=True)
+            self.groups = list(self.groups)
+            for etiqueta in self.sorts:
+                orden = self._orders[etiqueta, None]
+                # Partir el orden completo por grupo mantiene el orden dentro de cada grupo
+                por_grupo = np.argsort(codigos[orden], kind='stable')
+                agrupado = orden[por_grupo]
+                limites = np.searchsorted(codigos[agrupado], np.arange(len(self.groups) + 1))
+                for i, grupo in enumerate(self.groups):
+                    self._orders[etiqueta, grupo] = agrupado[limites[i]:limites[i + 1]]
+
+    def _order(self, sort, group):
+        orden = self._orders.get((sort, group))
+        if orden is None:
+            if sort not in self.sorts:
+                raise ValueError(f"Orden no calculado: {sort} (disponibles: {self.sorts})")
+            # Grupo sin filas en este snapshot
+            return np.empty(0, dtype=np.int64)
+        return orden
+
+    def count(self, sort, group=None):
+        """Filas que entran con ese filtro (``group`` None = todas)"""
+        return len(self._order(sort, group))
+
+    def page_count(self, sort, page_size, group=None):
+        """Número de páginas de ``page_size`` filas (al menos una)"""
+        return max(1, -(-self.count(sort, group) // page_size))
+
+    def page(self, sort, page, page_size, group=None):
+        """Filas (posiciones ``iloc``) de la página ``page`` (desde 0) en ese orden"""
+        inicio = page * page_size
+        return self._order(sort, group)[inicio:inicio + page_size]
@@ -0,0 +1,103 @@
+"""Descarga, parseo y guardado de los dumps de uno o varios mundos en el almacén de snapshots"""
+import email.utils
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from .conquests import ConquestLog
+from .fetch import DUMPS, WorldFetcher
+from .parse import PARSERS
+from .perf import RECORDER
+from .snapshots import DEFAULT_RETENTION, SnapshotStore
+
+
+# Dumps que se guardan como registro de solo-añadir en lugar de snapshots completos
+LOGS = {'conquers': ConquestLog}
+
+
+def latest_version(store, world, name):
+    """Última versión guardada de un dump: su snapshot o la última descarga de su registro"""
+    if name in LOGS:
+        return LOGS[name](store.root).last_timestamp(world)
+    return store.latest_timestamp(world, name)
+
+
+def _dump_timestamp(result):
+    """Hora de publicación del dump (Last-Modified) o la actual si no viene"""
+    if result.last_modified:
+        try:
+            return email.utils.parsedate_to_datetime(result.last_modified).astimezone(timezone.utc)
+        except (TypeError, ValueError):
+            pass
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def refresh_world(fetcher, store, names=None, retention=DEFAULT_RETENTION):
+    """Descarga los dumps y guarda un snapshot por cada uno que haya cambiado.
+
+    Devuelve {dump: FetchResult}; los 304 no generan snapshot nuevo. Los
+    dumps de ``LOGS`` solo añaden a su registro las filas que no tenía.
+
+    Los ETag/Last-Modified de lo guardado se quedan en el almacén, así que
+    un fetcher nuevo (otro proceso, la CLI, un reinicio de la app) también
+    pregunta con peticiones condicionales en lugar de bajarlo todo.
+    """
+    world = fetcher.world
+    fetcher.remember({
+        name: validador for name, validador in store.validators(world).items()
+        if name in DUMPS and latest_version(store, world, name) is not None
+    })
+    resultados = fetcher.fetch_all(names)
+    guardados = {}
+    for name, result in resultados.items():
+        if result.status != 200:
+            continue
+        with RECORDER.stage('parse'):
+            df = PARSERS[name](result.body)
+        if df is None:
+            continue
+        if name in LOGS:
+            LOGS[name](store.root).append(world, df, _dump_timestamp(result))
+        else:
+            store.write(world, name, df, _dump_timestamp(result))
+            store.compact(world, name, retention)
+        guardados[name] = {'url': result.url, 'etag': result.etag, 'last_modified': result.last_modified}
+    store.save_validators(world, guardados)
+    return resultados
+
+
+def _refresh_world_job(world, root, base_url, names, retention):
+    """Trabajo de un proceso: un mundo con su propia sesión HTTP y su almacén"""
+    fetcher = WorldFetcher(world, base_url=base_url)
+    try:
+        resultados = refresh_world(fetcher, SnapshotStore(root), names, retention)
+    finally:
+        fetcher.close()
+    # Solo vuelve el estado: los cuerpos ya están guardados como snapshots
+    return {name: (result.status, result.error) for name, result in resultados.items()}
+
+
+def refresh_worlds(worlds, root, base_url=None, names=None, retention=DEFAULT_RETENTION, processes=None):
+    """Refresca varios mundos en paralelo, cada uno en su proceso (como mucho ``processes``).
+
+    Es un generador de ``(mundo, {dump: (status, error)})`` en el orden en
+    que terminan, así un mundo lento no retrasa a los demás. Si un mundo
+    falla entero, todos sus dumps llevan status 0 y el error. ``base_url``
+    puede llevar ``{world}`` para apuntar cada mundo a su carpeta.
+    """
+    worlds = list(worlds)
+    processes = min(processes or os.cpu_count() or 1, len(worlds)) or 1
+    # spawn: el proceso que llama puede tener hilos (Streamlit, el planificador)
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=processes, mp_context=contexto) as pool:
+        pendientes = {
+            pool.submit(_refresh_world_job, world, root, base_url, names, retention): world
+            for world in worlds
+        }
+        for futuro in as_completed(pendientes):
+            world = pendientes[futuro]
+            try:
+                yield world, futuro.result()
+            except Exception as e:
+                yield world, {name: (0, str(e)) for name in (names or DUMPS)}
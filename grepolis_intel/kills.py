@@ -0,0 +1,59 @@
+"""Puntos de combate (ODA/ODD) de los dumps player_kills_*.txt cruzados con los jugadores
+
+Cada dump trae (puesto, ID, puntos) solo de los jugadores que han
+combatido, ya ordenado por ID al parsear: el cruce con la tabla de
+jugadores es un ``searchsorted`` por columna. Lo ganado desde el snapshot
+anterior de cada dump dice quién está combatiendo ahora.
+"""
+import numpy as np
+
+# Dump -> columna en la tabla de jugadores (y ``Delta_<columna>`` con lo ganado desde el anterior)
+KILL_COLUMNS = {
+    'kills_att': 'Puntos_Ataque',
+    'kills_def': 'Puntos_Defensa',
+    'kills_all': 'Puntos_Combate',
+}
+DELTA_PREFIX = 'Delta_'
+
+
+def kill_points(player_ids, kills, order=None):
+    """Puntos de combate de cada jugador (0 si no aparece en el dump o no hay dump).
+
+    ``order`` es el argsort de ``player_ids``: con los IDs buscados en orden
+    el ``searchsorted`` es varias veces más rápido que con la tabla por ranking.
+    """
+    player_ids = np.asarray(player_ids, dtype=np.int64)
+    resultado = np.zeros(len(player_ids), dtype=np.int64)
+    if kills is None or len(kills) == 0:
+        return resultado
+    if order is None:
+        order = np.argsort(player_ids, kind='stable')
+    ids = kills['ID'].to_numpy(dtype=np.int64)
+    puntos = kills['Puntos_Combate'].to_numpy(dtype=np.int64)
+    buscados = player_ids[order]
+    pos = np.minimum(np.searchsorted(ids, buscados), len(ids) - 1)
+    resultado[order] = np.where(ids[pos] == buscados, puntos[pos], 0)
+    return resultado
+
+
+def add_kill_points(players_data, kills, previous=None):
+    """Tabla de jugadores con los puntos de cada dump de ``kills`` ({dump: DataFrame o None}).
+
+    ``previous`` son los snapshots anteriores de esos dumps; sin ellos los
+    ``Delta_*`` quedan a 0. Las columnas se añaden siempre, a 0 si falta el
+    dump, para que las tablas que las muestran no dependan de él.
+    """
+    ids = players_data['ID'].to_numpy(dtype=np.int64)
+    orden = np.argsort(ids, kind='stable')
+    previous = previous or {}
+    columnas = {}
+    for dump, columna in KILL_COLUMNS.items():
+        actual = kill_points(ids, kills.get(dump), orden)
+        anterior = previous.get(dump)
+        columnas[columna] = actual
+        # Un reinicio del dump no puede dar combates negativos
+        if anterior is not None:
+            columnas[DELTA_PREFIX + columna] = np.maximum(actual - kill_points(ids, anterior, orden), 0)
+        else:
+            columnas[DELTA_PREFIX + columna] = np.zeros(len(ids), dtype=np.int64)
+    return players_data.assign(**columnas)
@@ -0,0 +1,63 @@
+"""Métricas derivadas de los jugadores, calculadas una vez por snapshot
+
+Cada métrica se declara en ``PLAYER_METRICS`` (columna -> función que recibe
+la tabla de jugadores y devuelve la columna). Para añadir una nueva basta
+con registrarla aquí con ``@player_metric``; las pestañas solo leen columnas.
+Las métricas se calculan en el orden en que se registran, así que una
+puede usar las anteriores.
+"""
+import numpy as np
+import pandas as pd
+
+MILITARY_BINS = [0, 1000, 3000, 6000, 15000, float('inf')]
+MILITARY_LABELS = ['🟥 Recluta', '🟨 Soldado', '🟦 Veterano', '🟪 Elite', '🟫 Legendario']
+
+PLAYER_METRICS = {}
+
+
+def player_metric(column):
+    """Registra una función como métrica derivada en la columna ``column``"""
+    def registrar(func):
+        PLAYER_METRICS[column] = func
+        return func
+    return registrar
+
+
+@player_metric('Categoria_Militar')
+def military_category(players_data):
+    """Categoría por tramos de puntos"""
+    return pd.cut(players_data['Puntos'], bins=MILITARY_BINS, labels=MILITARY_LABELS)
+
+
+@player_metric('Potencial_Militar')
+def military_potential(players_data):
+    """Estimación de capacidad militar a partir de puntos y ciudades"""
+    puntos = players_data['Puntos'].to_numpy(dtype=np.int64)
+    ciudades = players_data['Ciudades'].to_numpy(dtype=np.int64)
+    return (puntos * 0.6 + ciudades * 200).astype(np.int64)
+
+
+@player_metric('Puntos_por_Ciudad')
+def points_per_city(players_data):
+    """Puntos medios por ciudad (0 sin ciudades)"""
+    puntos = players_data['Puntos'].to_numpy(dtype=np.float64)
+    ciudades = players_data['Ciudades'].to_numpy(dtype=np.float64)
+    return np.divide(puntos, ciudades, out=np.zeros(len(puntos)), where=ciudades > 0).round(1)
+
+
+@player_metric('Percentil')
+def rank_percentile(players_data):
+    """Porcentaje del servidor que queda por debajo en el ranking"""
+    n = len(players_data)
+    if n == 0:
+        return np.empty(0)
+    return (1 - players_data['Ranking'].to_numpy(dtype=np.float64) / n) * 100
+
+
+def add_player_metrics(players_data, metrics=None):
+    """Tabla de jugadores con todas las métricas registradas (o las de ``metrics``)"""
+    # Copia superficial: solo se añaden columnas
+    resultado = players_data.copy(deep=False)
+    for columna in (metrics or PLAYER_METRICS):
+        resultado[columna] = PLAYER_METRICS[columna](resultado)
+    return resultado
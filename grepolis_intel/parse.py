@@ -0,0 +1,134 @@
+"""Conversión de los dumps de Grepolis a DataFrames con tipos compactos
+
+Los bytes se leen directamente con el lector CSV de Arrow (sin pasar por un
+``str`` de Python) a enteros de tamaño fijo y cadenas Arrow. Los nombres vienen
+URL-encoded (``Im+a+New+Rookie``) y se decodifican una sola vez al parsear.
+"""
+from urllib.parse import unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv
+
+STRING = pd.StringDtype("pyarrow")
+
+# Esquema de cada dump: columna -> tipo Arrow, en el orden publicado por Grepolis
+PLAYERS_SCHEMA = {
+    'ID': pa.int32(),
+    'Nombre': pa.string(),
+    'ID_Alianza': pa.int32(),
+    'Puntos': pa.int32(),
+    'Ranking': pa.int32(),
+    'Ciudades': pa.int16(),
+}
+ALLIANCES_SCHEMA = {
+    'ID_Alianza': pa.int32(),
+    'Nombre_Alianza': pa.string(),
+    'Puntos_Alianza': pa.int32(),
+    'Ciudades_Alianza': pa.int32(),
+    'Miembros': pa.int16(),
+    'Ranking_Alianza': pa.int32(),
+}
+TOWNS_SCHEMA = {
+    'ID_Ciudad': pa.int32(),
+    'ID_Jugador': pa.int32(),
+    'Nombre_Ciudad': pa.string(),
+    'Coord_X': pa.uint16(),
+    'Coord_Y': pa.uint16(),
+    'Posicion_Isla': pa.uint8(),
+    'Puntos_Ciudad': pa.int32(),
+}
+# player_kills_{att,def,all}.txt: puesto en ese ranking, jugador y puntos de combate
+KILLS_SCHEMA = {
+    'Ranking_Combate': pa.int32(),
+    'ID': pa.int32(),
+    'Puntos_Combate': pa.int64(),
+}
+# Fecha en segundos Unix; los IDs vacíos (ciudad fantasma, sin alianza) quedan a 0
+CONQUERS_SCHEMA = {
+    'ID_Ciudad': pa.int32(),
+    'Fecha': pa.int64(),
+    'ID_Nuevo': pa.int32(),
+    'ID_Anterior': pa.int32(),
+    'ID_Alianza_Nueva': pa.int32(),
+    'ID_Alianza_Anterior': pa.int32(),
+    'Puntos_Ciudad': pa.int32(),
+}
+
+
+def decode_names(array):
+    """Decodifica nombres URL-encoded: '+' -> ' ' en Arrow y '%XX' solo donde aparece"""
+    array = pc.replace_substring(array, '+', ' ')
+    con_escape = pc.fill_null(pc.match_substring(array, '%'), False)
+    if not pc.any(con_escape).as_py():
+        return array
+    # Cada nombre distinto se decodifica una sola vez (las ciudades repiten mucho)
+    escapados = pc.filter(array, con_escape).dictionary_encode()
+    decodificados = pa.array([unquote(v) for v in escapados.dictionary.to_pylist()], type=pa.string())
+    return pc.replace_with_mask(array, con_escape, decodificados.take(escapados.indices))
+
+
+def read_dump(body, schema, name_columns=()):
+    """Lee un dump CSV sin cabecera con el esquema dado; los IDs vacíos quedan a 0"""
+    tabla = csv.read_csv(
+        pa.BufferReader(body),
+        read_options=csv.ReadOptions(column_names=list(schema)),
+        convert_options=csv.ConvertOptions(column_types=schema, strings_can_be_null=True),
+    )
+    columnas = {}
+    for nombre, tipo in schema.items():
+        columna = tabla.column(nombre).combine_chunks()
+        if nombre in name_columns:
+            columna = decode_names(columna)
+        elif pa.types.is_integer(tipo):
+            columna = pc.fill_null(columna, 0)
+        columnas[nombre] = columna
+    return pa.table(columnas).to_pandas(types_mapper={pa.string(): STRING}.get)
+
+
+def parse_players(body):
+    """players.txt -> jugadores ordenados por ranking"""
+    players_data = read_dump(body, PLAYERS_SCHEMA, name_columns=('Nombre',))
+    players_data = players_data.dropna(subset=['Nombre'])
+    return players_data.sort_values('Ranking', ignore_index=True)
+
+
+def parse_alliances(body):
+    """alliances.txt -> alianzas (None si el dump está vacío)"""
+    if len(body.strip()) == 0:
+        return None
+    alliance_data = read_dump(body, ALLIANCES_SCHEMA, name_columns=('Nombre_Alianza',))
+    if len(alliance_data) == 0:
+        return None
+    return alliance_data
+
+
+def parse_towns(body):
+    """towns.txt -> ciudades (ID_Jugador 0 = ciudad fantasma)"""
+    return read_dump(body, TOWNS_SCHEMA, name_columns=('Nombre_Ciudad',))
+
+
+def parse_conquers(body):
+    """conquers.txt -> conquistas ordenadas por fecha (None si el dump está vacío)"""
+    if len(body.strip()) == 0:
+        return None
+    return read_dump(body, CONQUERS_SCHEMA).sort_values('Fecha', kind='stable', ignore_index=True)
+
+
+def parse_kills(body):
+    """player_kills_*.txt -> puntos de combate ordenados por ID (None si el dump está vacío)"""
+    if len(body.strip()) == 0:
+        return None
+    return read_dump(body, KILLS_SCHEMA).sort_values('ID', ignore_index=True)
+
+
+PARSERS = {
+    'players': parse_players,
+    'alliances': parse_alliances,
+    'towns': parse_towns,
+    'conquers': parse_conquers,
+    'kills_att': parse_kills,
+    'kills_def': parse_kills,
+    'kills_all': parse_kills,
+}
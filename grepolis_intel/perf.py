@@ -0,0 +1,155 @@
+"""Tiempos por etapa y aciertos de caché, con exportación JSON y Prometheus
+
+``RECORDER`` es el registro del proceso. Cada etapa se mide con
+``RECORDER.stage(nombre)`` y acumula llamadas, tiempo total y máximo. Si el
+hilo ha llamado a ``begin_run`` (un rerun de Streamlit), la etapa también se
+anota en la lista de ese rerun; las etapas de otros hilos (descargas en
+segundo plano) solo cuentan en los totales.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PerfRecorder:
+    """Acumula tiempos por etapa y aciertos/fallos por caché; seguro entre hilos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stages = {}  # nombre -> [llamadas, segundos, máximo]
+        self._caches = {}  # nombre -> [aciertos, fallos]
+        self._last_export = 0.0
+
+    def observe(self, name, seconds):
+        with self._lock:
+            stats = self._stages.setdefault(name, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+        run = getattr(self._local, 'run', None)
+        if run is not None:
+            run.append((name, seconds))
+
+    @contextmanager
+    def stage(self, name):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - inicio)
+
+    def timed(self, name):
+        """Decorador: mide cada llamada como la etapa ``name``"""
+        def decorar(func):
+            @functools.wraps(func)
+            def medida(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+            return medida
+        return decorar
+
+    def cache_event(self, name, hit):
+        with self._lock:
+            stats = self._caches.setdefault(name, [0, 0])
+            stats[0 if hit else 1] += 1
+        run = getattr(self._local, 'run_caches', None)
+        if run is not None:
+            run.setdefault(name, [0, 0])[0 if hit else 1] += 1
+
+    def cached(self, name, cache_decorator):
+        """Aplica ``cache_decorator`` (p. ej. ``st.cache_resource(...)``) contando aciertos.
+
+        El cuerpo solo se ejecuta en un fallo de caché: ahí se marca el fallo
+        y se mide como la etapa ``name``. Admite llamadas anidadas.
+        """
+        def decorar(func):
+            @functools.wraps(func)
+            def cuerpo(*args, **kwargs):
+                self._local.cache_stack[-1] = False
+                with self.stage(name):
+                    return func(*args, **kwargs)
+
+            cacheada = cache_decorator(cuerpo)
+
+            @functools.wraps(func)
+            def llamada(*args, **kwargs):
+                pila = getattr(self._local, 'cache_stack', None)
+                if pila is None:
+                    pila = self._local.cache_stack = []
+                pila.append(True)
+                try:
+                    return cacheada(*args, **kwargs)
+                finally:
+                    self.cache_event(name, pila.pop())
+
+            llamada.clear = getattr(cacheada, 'clear', None)
+            return llamada
+        return decorar
+
+    def begin_run(self):
+        """Empieza a anotar las etapas de este hilo (un rerun); devuelve la lista"""
+        self._local.run = []
+        self._local.run_caches = {}
+        return self._local.run
+
+    def run_timings(self):
+        """[(etapa, segundos)] del rerun en curso en este hilo"""
+        return list(getattr(self._local, 'run', None) or [])
+
+    def run_caches(self):
+        """{caché: [aciertos, fallos]} del rerun en curso en este hilo"""
+        return {nombre: list(v) for nombre, v in (getattr(self._local, 'run_caches', None) or {}).items()}
+
+    def snapshot(self):
+        with self._lock:
+            etapas = {
+                nombre: {'count': n, 'seconds': round(total, 6), 'max': round(maximo, 6),
+                         'mean': round(total / n, 6) if n else 0.0}
+                for nombre, (n, total, maximo) in sorted(self._stages.items())
+            }
+            caches = {
+                nombre: {'hits': h, 'misses': m, 'hit_rate': round(h / (h + m), 4) if h + m else 0.0}
+                for nombre, (h, m) in sorted(self._caches.items())
+            }
+        return {'stages': etapas, 'caches': caches}
+
+    def to_prometheus(self, prefix='grepolis'):
+        """Formato de texto de Prometheus"""
+        datos = self.snapshot()
+        lineas = []
+        for metrica, tipo, ayuda, origen, clave, etiqueta in (
+            ('stage_calls_total', 'counter', "Llamadas por etapa", 'stages', 'count', 'stage'),
+            ('stage_seconds_total', 'counter', "Segundos acumulados por etapa", 'stages', 'seconds', 'stage'),
+            ('stage_seconds_max', 'gauge', "Llamada más lenta por etapa", 'stages', 'max', 'stage'),
+            ('cache_hits_total', 'counter', "Aciertos por caché", 'caches', 'hits', 'cache'),
+            ('cache_misses_total', 'counter', "Fallos por caché", 'caches', 'misses', 'cache'),
+        ):
+            lineas.append(f"# HELP {prefix}_{metrica} {ayuda}")
+            lineas.append(f"# TYPE {prefix}_{metrica} {tipo}")
+            for nombre, valores in datos[origen].items():
+                lineas.append(f'{prefix}_{metrica}{{{etiqueta}="{nombre}"}} {valores[clave]}')
+        return '\n'.join(lineas) + '\n'
+
+    def export(self, directory, min_interval=10.0):
+        """Escribe metrics.json y metrics.prom en ``directory`` (como mucho cada ``min_interval`` s)"""
+        ahora = time.monotonic()
+        with self._lock:
+            if ahora - self._last_export < min_interval:
+                return False
+            self._last_export = ahora
+        os.makedirs(directory, exist_ok=True)
+        datos = dict(self.snapshot(), updated=time.time())
+        for fichero, contenido in (('metrics.json', json.dumps(datos, indent=2)), ('metrics.prom', self.to_prometheus())):
+            ruta = os.path.join(directory, fichero)
+            temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporal, 'w') as f:
+                f.write(contenido)
+            os.replace(temporal, ruta)
+        return True
+
+
+RECORDER = PerfRecorder()
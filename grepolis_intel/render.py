@@ -0,0 +1,125 @@
+"""Caché LRU de figuras y tablas ya construidas, con presupuesto de memoria
+
+Con el mismo snapshot y los mismos widgets, un rerun vuelve a construir
+exactamente las mismas figuras de Plotly y tablas formateadas. ``RenderCache``
+las guarda por clave (snapshot, pestaña, valores de los widgets) y, cuando
+pasan de ``budget`` bytes, descarta las que hace más tiempo que no se usan.
+
+Las tablas se guardan ya convertidas a ``pyarrow.Table``: ``st.dataframe``
+la serializa tal cual, sin volver a pasar por pandas. Las figuras guardadas
+se comparten entre reruns y sesiones, así que no se deben modificar después
+de sacarlas de la caché.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .perf import RECORDER
+
+DEFAULT_BUDGET = 128 * 1024 * 1024
+
+
+def payload_size(value):
+    """Bytes aproximados de una tabla, figura de Plotly o estructura anidada"""
+    if isinstance(value, pa.Table):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(payload_size(k) + payload_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(v) for v in value) + 8 * len(value)
+    if hasattr(value, 'to_plotly_json'):
+        return payload_size(value.to_plotly_json())
+    return 64
+
+
+def table_payload(data):
+    """Tabla lista para ``st.dataframe``: ``pyarrow.Table`` si se puede convertir, si no la original"""
+    if not isinstance(data, pd.DataFrame):
+        return data
+    try:
+        return pa.Table.from_pandas(data)
+    except (pa.ArrowException, TypeError, ValueError, OverflowError):
+        # Columnas de tipos mezclados: que Streamlit las arregle al serializar
+        return data
+
+
+class RenderCache:
+    """Figuras y tablas por clave, expulsando las menos usadas al pasar de ``budget`` bytes.
+
+    Cada tipo (``figure``, ``table``) cuenta sus aciertos y fallos en
+    ``recorder`` como la caché ``render.<tipo>``; la construcción en un
+    fallo se mide como la etapa del mismo nombre.
+    """
+
+    def __init__(self, budget=DEFAULT_BUDGET, recorder=RECORDER):
+        self.budget = budget
+        self.recorder = recorder
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (tipo, clave) -> (valor, bytes)
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, kind, key, build, convert=None):
+        """Valor guardado para (``kind``, ``key``) o, en un fallo, ``convert(build())``"""
+        clave = (kind, key)
+        nombre = f'render.{kind}'
+        with self._lock:
+            entrada = self._entries.get(clave)
+            if entrada is not None:
+                self._entries.move_to_end(clave)
+                self._hits += 1
+        if entrada is not None:
+            self.recorder.cache_event(nombre, True)
+            return entrada[0]
+
+        with self.recorder.stage(nombre):
+            valor = build()
+            if convert is not None:
+                valor = convert(valor)
+        tamano = payload_size(valor)
+        self.recorder.cache_event(nombre, False)
+        with self._lock:
+            self._misses += 1
+            # Lo que no cabe ni solo no se guarda (ni vacía la caché)
+            if tamano <= self.budget:
+                anterior = self._entries.pop(clave, None)
+                if anterior is not None:
+                    self._bytes -= anterior[1]
+                self._entries[clave] = (valor, tamano)
+                self._bytes += tamano
+                while self._bytes > self.budget:
+                    _, (_, liberado) = self._entries.popitem(last=False)
+                    self._bytes -= liberado
+                    self._evictions += 1
+        return valor
+
+    def figure(self, key, build):
+        """Figura de ``build()`` guardada por ``key``"""
+        return self.get('figure', key, build)
+
+    def table(self, key, build):
+        """Tabla de ``build()`` guardada por ``key`` como payload de Arrow"""
+        return self.get('table', key, build, convert=table_payload)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries), 'bytes': self._bytes, 'budget': self.budget,
+                'hits': self._hits, 'misses': self._misses, 'evictions': self._evictions,
+            }
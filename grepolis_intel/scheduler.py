@@ -0,0 +1,162 @@
+"""Refresco de los dumps en segundo plano, fuera del camino de las peticiones
+
+Grepolis publica los dumps una vez por hora. El planificador programa la
+siguiente descarga justo después de la próxima publicación esperada (la
+última vista + una hora) y, si el dump aún no ha cambiado, reintenta con
+peticiones condicionales baratas (304) hasta que aparece.
+
+Los lectores nunca esperan a la red: siempre ven el último snapshot
+completo (``versions``) mientras se descarga el siguiente, y el cambio de
+versión es una única asignación del diccionario (stale-while-revalidate).
+"""
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from .fetch import DUMPS
+from .ingest import latest_version, refresh_world
+from .snapshots import DEFAULT_RETENTION
+
+PUBLISH_INTERVAL = timedelta(hours=1)
+PUBLISH_MARGIN = timedelta(minutes=2)
+RETRY_INTERVAL = timedelta(minutes=5)
+
+
+@dataclass
+class DatasetStatus:
+    """Resultado de la última comprobación de un dump"""
+    checked: Optional[datetime] = None
+    status: Optional[int] = None
+    error: Optional[str] = None
+
+
+class RefreshScheduler:
+    """Hilo único que descarga los dumps cuando toca o cuando se le pide.
+
+    ``request(names)`` encola un refresco de esos datasets y vuelve al
+    momento; ``refresh(names)`` lo hace en el hilo que llama (solo para el
+    primer arranque, cuando no hay nada que servir). Los refrescos nunca se
+    solapan: comparten un lock.
+    """
+
+    def __init__(self, fetcher, store, interval=PUBLISH_INTERVAL, margin=PUBLISH_MARGIN,
+                 retry=RETRY_INTERVAL, retention=DEFAULT_RETENTION):
+        self.fetcher = fetcher
+        self.store = store
+        self.world = fetcher.world
+        self.interval = interval
+        self.margin = margin
+        self.retry = retry
+        self.retention = retention
+
+        self.versions = {name: latest_version(store, self.world, name) for name in DUMPS}
+        self.status = {name: DatasetStatus() for name in DUMPS}
+        self.next_run = None
+
+        self._refresh_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def refreshing(self):
+        return self._refresh_lock.locked()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name=f"grepolis-refresh-{self.world}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def request(self, names=None):
+        """Pide un refresco en segundo plano de esos datasets (todos por defecto)"""
+        with self._lock:
+            self._pending.update(names or DUMPS)
+        self._wake.set()
+
+    def revalidate(self, names, now=None):
+        """Como ``request`` pero solo para los que no se han comprobado en el último ``retry``"""
+        now = now or datetime.now(timezone.utc)
+        viejos = [n for n in names if self.status[n].checked is None or now - self.status[n].checked > self.retry]
+        if viejos:
+            self.request(viejos)
+
+    def refresh(self, names=None):
+        """Descarga y guarda ahora en este hilo; devuelve {dump: FetchResult}"""
+        names = list(names or DUMPS)
+        with self._refresh_lock:
+            resultados = refresh_world(self.fetcher, self.store, names, self.retention)
+            ahora = datetime.now(timezone.utc)
+            versiones = dict(self.versions)
+            for name, result in resultados.items():
+                self.status[name] = DatasetStatus(ahora, result.status, result.error)
+                versiones[name] = latest_version(self.store, self.world, name)
+            # Cambio atómico: los lectores ven la versión anterior o la nueva completa
+            self.versions = versiones
+        return resultados
+
+    def age(self, name, now=None):
+        """Antigüedad del snapshot en uso de un dataset (None si no hay)"""
+        version = self.versions.get(name)
+        if version is None:
+            return None
+        return (now or datetime.now(timezone.utc)) - version
+
+    def is_stale(self, name, now=None):
+        """El snapshot ya debería haberse sustituido por una publicación más nueva"""
+        edad = self.age(name, now)
+        return edad is None or edad > self.interval + self.margin + self.retry
+
+    def next_refresh(self, now=None):
+        """Próxima descarga: la primera publicación esperada que aún no ha llegado.
+
+        Cada dump espera la suya (su versión + ``interval``); si ya pasó, se
+        reintenta dentro de ``retry``. Un dump que lleva más de un intervalo
+        sin publicarse no marca el ritmo (se sigue comprobando con los demás),
+        para que uno que el servidor ya no actualiza no deje el planificador
+        reintentando cada ``retry`` para siempre.
+        """
+        now = now or datetime.now(timezone.utc)
+        vistas = [v for v in self.versions.values() if v is not None]
+        if not vistas:
+            return now
+        proximas = []
+        for version in vistas:
+            esperada = version + self.interval + self.margin
+            if esperada > now:
+                proximas.append(esperada)
+            elif now - esperada < self.interval:
+                proximas.append(now + self.retry)
+        return min(proximas) if proximas else now + self.retry
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.next_run = self.next_refresh()
+            espera = (self.next_run - datetime.now(timezone.utc)).total_seconds()
+            pedido = self._wake.wait(max(espera, 0))
+            if self._stop.is_set():
+                break
+
+            with self._lock:
+                names = sorted(self._pending) if pedido else list(DUMPS)
+                self._pending.clear()
+                self._wake.clear()
+            if not names:
+                continue
+            try:
+                self.refresh(names)
+            except Exception as e:
+                ahora = datetime.now(timezone.utc)
+                for name in names:
+                    self.status[name] = DatasetStatus(ahora, None, str(e))
+                # Sin esto un fallo persistente repetiría la descarga sin pausa
+                self._stop.wait(self.retry.total_seconds())
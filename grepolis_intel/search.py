@@ -0,0 +1,267 @@
+"""Índice de búsqueda de nombres (jugadores, alianzas y ciudades)
+
+Se construye una vez por snapshot. Los nombres se normalizan (minúsculas y
+sin tildes) y se indexan de dos formas:
+
+- un array ordenado de nombres para prefijos y coincidencias exactas por
+  ``searchsorted`` (equivalente a recorrer un trie);
+- listas invertidas de n-gramas de 1 a 3 caracteres (estilo CSR) para
+  "contiene" y para búsquedas tolerantes a errores por n-gramas compartidos.
+  Guardan posiciones en orden de prioridad, así que con ``limit`` se puede
+  parar en cuanto aparecen las mejores.
+
+Escala medida con ``benchmarks/bench_search.py`` (100.000 nombres, un núcleo):
+exacto, prefijo y "contiene" con ``limit`` tardan menos de 1 ms, lo que pide
+la búsqueda mientras se escribe. Sin ``limit``, "contiene" devuelve todas las
+coincidencias (unos 2 ms con 18.000). La aproximada puntúa hasta
+``_MAX_CANDIDATES`` nombres con ``difflib`` y tarda 2-4 ms. Construir el índice
+lleva cerca de 1 s, una vez por snapshot.
+"""
+import unicodedata
+from difflib import SequenceMatcher
+
+import numpy as np
+
+MODES = ("Contiene", "Exacto", "Empieza con", "Aproximado")
+_BITS = 21  # Un punto de código Unicode cabe en 21 bits
+_MAX_CANDIDATES = 50
+# Una transposición de dos letras cuenta casi como un acierto
+_TRANSPOSITION_WEIGHT = 0.9
+
+
+def normalize(name):
+    """Minúsculas y sin tildes, para comparar como lo haría un jugador"""
+    descompuesto = unicodedata.normalize('NFKD', str(name).casefold())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def _gram_codes(codigos, g):
+    """Códigos de todos los n-gramas de longitud g de una matriz (nombres x caracteres)"""
+    n, ancho = codigos.shape
+    if ancho < g:
+        return np.empty((n, 0), dtype=np.int64)
+    resultado = np.zeros((n, ancho - g + 1), dtype=np.int64)
+    valido = np.ones_like(resultado, dtype=bool)
+    for i in range(g):
+        columna = codigos[:, i:ancho - g + 1 + i].astype(np.int64)
+        resultado = (resultado << _BITS) | columna
+        valido &= columna != 0
+    return np.where(valido, resultado, -1)
+
+
+def _transpositions(texto):
+    """Variantes con dos letras contiguas intercambiadas ("zues" -> "zeus", ...) y el trozo que cambia"""
+    variantes = []
+    for i in range(len(texto) - 1):
+        if texto[i] != texto[i + 1]:
+            variante = texto[:i] + texto[i + 1] + texto[i] + texto[i + 2:]
+            variantes.append((variante, variante[max(0, i - 1):i + 3]))
+    return variantes
+
+
+def _similarity(consulta, variantes, nombre, min_score=0.0):
+    """Similitud de texto con la consulta o, algo penalizada, con alguna de sus transposiciones.
+
+    Solo se prueban las transposiciones cuyo trozo cambiado aparece en el nombre.
+    """
+    comparador = SequenceMatcher(None, consulta, nombre)
+    puntuacion = comparador.ratio()
+    # Las variantes tienen las mismas letras: quick_ratio acota a todas a la vez
+    if not variantes or _TRANSPOSITION_WEIGHT * comparador.quick_ratio() <= max(puntuacion, min_score):
+        return puntuacion
+    for variante, trozo in variantes:
+        if trozo in nombre:
+            comparador.set_seq1(variante)
+            puntuacion = max(puntuacion, _TRANSPOSITION_WEIGHT * comparador.ratio())
+    return puntuacion
+
+
+def _query_codes(texto, g):
+    codigos = np.array([[ord(c) for c in texto]], dtype=np.int64)
+    return np.unique(_gram_codes(codigos, g)[0])
+
+
+class NameSearchIndex:
+    """Búsqueda por prefijo, exacta, "contiene" y aproximada sobre una columna de nombres.
+
+    Los resultados son filas (posiciones) de la tabla original ordenadas por
+    relevancia: exacto, luego prefijo, luego ``priority`` ascendente (p. ej.
+    el ranking).
+    """
+
+    def __init__(self, names, priority=None):
+        nombres = [normalize(n) if n is not None and n == n else '' for n in names]
+        n = len(nombres)
+        self.names = np.array(nombres, dtype=str) if n else np.array([], dtype='<U1')
+        self.priority = np.asarray(priority if priority is not None else np.arange(n))
+        self._priority_span = int(self.priority.max(initial=0)) + 1
+
+        # Las listas de n-gramas guardan posiciones en orden de prioridad, no filas:
+        # así sus primeros elementos ya son los más relevantes
+        self._by_priority = np.argsort(self.priority, kind='stable')
+        posicion = np.empty(n, dtype=np.int64)
+        posicion[self._by_priority] = np.arange(n)
+
+        # Prefijos y exactos: nombres ordenados
+        self._order = np.argsort(self.names, kind='stable')
+        self._sorted = self.names[self._order]
+        self._sorted_position = np.empty(n, dtype=np.int64)
+        self._sorted_position[self._order] = np.arange(n)
+
+        # N-gramas (1-3) -> posiciones por prioridad, en formato CSR
+        codigos = self.names.view(np.uint32).reshape(n, -1) if n else np.zeros((0, 1), np.uint32)
+        claves, filas = [], []
+        for g in (1, 2, 3):
+            gramas = _gram_codes(codigos, g)
+            validos = gramas >= 0
+            claves.append(gramas[validos])
+            filas.append(np.broadcast_to(posicion[:, None], gramas.shape)[validos])
+        claves = np.concatenate(claves)
+        filas = np.concatenate(filas)
+        orden = np.lexsort((filas, claves))
+        claves, filas = claves[orden], filas[orden]
+        # Un nombre cuenta una vez por n-grama aunque lo repita
+        unico = np.ones(len(claves), dtype=bool)
+        unico[1:] = (claves[1:] != claves[:-1]) | (filas[1:] != filas[:-1])
+        claves, filas = claves[unico], filas[unico]
+        self._keys, inicios = np.unique(claves, return_index=True)
+        self._offsets = np.append(inicios, len(claves))
+        self._postings = filas.astype(np.int32)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _posting(self, clave):
+        """Posiciones (en orden de prioridad) de los nombres con ese n-grama"""
+        i = np.searchsorted(self._keys, clave)
+        if i == len(self._keys) or self._keys[i] != clave:
+            return np.empty(0, dtype=np.int32)
+        return self._postings[self._offsets[i]:self._offsets[i + 1]]
+
+    def _rows(self, posiciones):
+        return self._by_priority[posiciones]
+
+    def _with_prefixes(self, filas, consulta, limit):
+        """Las ``limit`` mejores de ``filas`` más los exactos y prefijos de ``consulta``"""
+        inicio, _, fin = self._range(consulta)
+        prefijos = self._rank(self._order[inicio:fin], consulta, limit)
+        filas = np.sort(np.concatenate([prefijos, np.asarray(filas, dtype=np.int64)]))
+        filas = filas[np.r_[True, filas[1:] != filas[:-1]]] if len(filas) else filas
+        return self._rank(filas, consulta, limit)
+
+    def _range(self, consulta):
+        """Rango [inicio, fin) del array ordenado con ese prefijo y rango exacto"""
+        inicio = np.searchsorted(self._sorted, consulta, side='left')
+        fin_exacto = np.searchsorted(self._sorted, consulta, side='right')
+        fin = np.searchsorted(self._sorted, consulta + '\U0010ffff', side='left')
+        return inicio, fin_exacto, fin
+
+    def _rank(self, filas, consulta, limit=None):
+        """Ordena filas: exacto, prefijo y luego prioridad; con ``limit`` solo ordena los primeros"""
+        filas = np.asarray(filas, dtype=np.int64)
+        if len(filas) == 0:
+            return filas
+        inicio, fin_exacto, fin = self._range(consulta)
+        posicion = self._sorted_position[filas]
+        clase = np.where(posicion < fin_exacto, 0, np.where(posicion < fin, 1, 2))
+        clase[posicion < inicio] = 2
+        if limit is not None and limit < len(filas):
+            clave = clase * self._priority_span + self.priority[filas]
+            primeros = np.argpartition(clave, limit)[:limit]
+            filas, clase = filas[primeros], clase[primeros]
+        orden = np.lexsort((self.priority[filas], clase))
+        return filas[orden]
+
+    def exact(self, query, limit=None):
+        consulta = normalize(query)
+        inicio, fin_exacto, _ = self._range(consulta)
+        return self._rank(self._order[inicio:fin_exacto], consulta, limit)
+
+    def prefix(self, query, limit=None):
+        consulta = normalize(query)
+        if not consulta:
+            return np.empty(0, dtype=np.int64)
+        inicio, _, fin = self._range(consulta)
+        return self._rank(self._order[inicio:fin], consulta, limit)
+
+    def contains(self, query, limit=None):
+        """Nombres que contienen ``query``; con ``limit`` para en cuanto tiene los ``limit`` mejores.
+
+        Los exactos y los prefijos salen del array ordenado. El resto se toma
+        de las listas de n-gramas, que van en orden de prioridad: basta con
+        recorrerlas hasta tener ``limit`` coincidencias.
+        """
+        consulta = normalize(query)
+        if not consulta:
+            return np.empty(0, dtype=np.int64)
+        if len(consulta) <= 3:
+            # El propio n-grama es la respuesta exacta
+            posiciones = self._posting(_query_codes(consulta, len(consulta))[0])
+            if limit is None:
+                return self._rank(self._rows(posiciones), consulta)
+            return self._with_prefixes(self._rows(posiciones[:limit]), consulta, limit)
+
+        # Intersección de las listas de sus trigramas, recorriendo la más corta
+        listas = sorted((self._posting(c) for c in _query_codes(consulta, 3)), key=len)
+        bloque = len(listas[0]) if limit is None else max(4 * limit, 256)
+        encontrados, total = [], 0
+        for inicio in range(0, len(listas[0]), bloque):
+            candidatos = listas[0][inicio:inicio + bloque]
+            for lista in listas[1:]:
+                if len(candidatos) == 0:
+                    break
+                # Las listas están ordenadas: pertenencia por búsqueda binaria
+                pos = np.minimum(np.searchsorted(lista, candidatos), len(lista) - 1)
+                candidatos = candidatos[lista[pos] == candidatos] if len(lista) else lista
+            filas = self._rows(candidatos)
+            filas = filas[np.char.find(self.names[filas], consulta) >= 0]
+            encontrados.append(filas)
+            total += len(filas)
+            if limit is not None and total >= limit:
+                break
+        filas = np.concatenate(encontrados) if encontrados else np.empty(0, dtype=np.int64)
+        if limit is not None:
+            return self._with_prefixes(filas, consulta, limit)
+        return self._rank(filas, consulta)
+
+    def fuzzy(self, query, limit=10, min_score=0.5):
+        """Nombres parecidos aunque tengan errores: n-gramas compartidos + similitud de texto.
+
+        Los candidatos salen de los trigramas de la consulta y de sus
+        transposiciones; si no llegan a ``limit`` se buscan por bigramas y
+        luego por letras sueltas, para que los nombres cortos con una errata
+        también aparezcan.
+        """
+        consulta = normalize(query)
+        if not consulta:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        variantes = _transpositions(consulta)
+        comunes = np.zeros(len(self.names), dtype=np.int64)
+        for g in range(min(3, len(consulta)), 0, -1):
+            codigos = np.unique(np.concatenate([_query_codes(t, g) for t in (consulta, *(v for v, _ in variantes))]))
+            listas = [self._posting(c) for c in codigos]
+            comunes = np.bincount(np.concatenate(listas), minlength=len(self.names))
+            if np.count_nonzero(comunes) >= limit:
+                break
+        candidatos = np.flatnonzero(comunes)
+        if len(candidatos) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        if len(candidatos) > _MAX_CANDIDATES:
+            candidatos = candidatos[np.argpartition(-comunes[candidatos], _MAX_CANDIDATES)[:_MAX_CANDIDATES]]
+        candidatos = self._rows(candidatos)
+
+        puntuacion = np.array([_similarity(consulta, variantes, self.names[f], min_score) for f in candidatos])
+        validos = puntuacion >= min_score
+        candidatos, puntuacion = candidatos[validos], puntuacion[validos]
+        orden = np.lexsort((self.priority[candidatos], -puntuacion))[:limit]
+        return candidatos[orden], puntuacion[orden]
+
+    def search(self, query, mode="Contiene", limit=None):
+        """Filas que coinciden con ``query`` según el modo (ver ``MODES``)"""
+        if mode == "Exacto":
+            return self.exact(query, limit)
+        if mode == "Empieza con":
+            return self.prefix(query, limit)
+        if mode == "Aproximado":
+            return self.fuzzy(query, limit=limit or 20)[0]
+        return self.contains(query, limit)
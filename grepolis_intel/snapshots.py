@@ -0,0 +1,140 @@
+"""Almacén local de snapshots en Parquet, uno por mundo, dump y hora de publicación
+
+Estructura en disco::
+
+    <root>/<mundo>/<dump>/20261017T130000Z.parquet
+    <root>/<mundo>/validators.json    (ETag/Last-Modified de la última descarga guardada)
+"""
+import json
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+TS_FORMAT = '%Y%m%dT%H%M%SZ'
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Cuántos snapshots conservar según su antigüedad.
+
+    Se guardan todos los de las últimas ``keep_all_hours`` horas, el último de
+    cada día hasta ``keep_daily_days`` días y el último de cada semana ISO a
+    partir de ahí. ``max_age_days`` (opcional) borra todo lo más antiguo.
+    """
+    keep_all_hours: int = 48
+    keep_daily_days: int = 60
+    max_age_days: int = None
+
+
+DEFAULT_RETENTION = RetentionPolicy()
+
+
+def _format_ts(timestamp):
+    return timestamp.astimezone(timezone.utc).strftime(TS_FORMAT)
+
+
+def _parse_ts(nombre):
+    return datetime.strptime(nombre, TS_FORMAT).replace(tzinfo=timezone.utc)
+
+
+class SnapshotStore:
+    """Snapshots en Parquet indexados por (mundo, dump, timestamp)"""
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _dir(self, world, dataset):
+        return os.path.join(self.root, world, dataset)
+
+    def _validators_path(self, world):
+        return os.path.join(self.root, world, 'validators.json')
+
+    def validators(self, world):
+        """ETag/Last-Modified de lo último guardado de cada dump: {dump: {url, etag, last_modified}}"""
+        try:
+            with open(self._validators_path(world)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save_validators(self, world, validators):
+        """Actualiza los validadores de esos dumps (``{dump: {url, etag, last_modified}}``)"""
+        if not validators:
+            return
+        path = self._validators_path(world)
+        with self._lock:
+            guardados = self.validators(world)
+            guardados.update(validators)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump(guardados, f, indent=1, sort_keys=True)
+            os.replace(tmp, path)
+
+    def _path(self, world, dataset, timestamp):
+        return os.path.join(self._dir(world, dataset), _format_ts(timestamp) + '.parquet')
+
+    def write(self, world, dataset, df, timestamp=None):
+        """Guarda un snapshot de forma atómica; no reescribe uno ya existente"""
+        timestamp = timestamp or datetime.now(timezone.utc)
+        path = self._path(world, dataset, timestamp)
+        if os.path.exists(path):
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        return path
+
+    def timestamps(self, world, dataset):
+        """Timestamps disponibles, del más antiguo al más reciente"""
+        try:
+            nombres = os.listdir(self._dir(world, dataset))
+        except FileNotFoundError:
+            return []
+        return sorted(_parse_ts(n[:-len('.parquet')]) for n in nombres if n.endswith('.parquet'))
+
+    def latest_timestamp(self, world, dataset):
+        timestamps = self.timestamps(world, dataset)
+        return timestamps[-1] if timestamps else None
+
+    def previous_timestamp(self, world, dataset, timestamp):
+        """Snapshot inmediatamente anterior a ``timestamp``, o None"""
+        anteriores = [ts for ts in self.timestamps(world, dataset) if ts < timestamp]
+        return anteriores[-1] if anteriores else None
+
+    def read(self, world, dataset, timestamp=None):
+        """Lee un snapshot (el más reciente si no se indica timestamp); None si no hay"""
+        timestamp = timestamp or self.latest_timestamp(world, dataset)
+        if timestamp is None:
+            return None
+        return pd.read_parquet(self._path(world, dataset, timestamp))
+
+    def compact(self, world, dataset, policy=DEFAULT_RETENTION, now=None):
+        """Aplica la política de retención; devuelve los timestamps borrados"""
+        now = now or datetime.now(timezone.utc)
+        conservar = {}
+        borrar = []
+        for ts in self.timestamps(world, dataset):
+            edad = now - ts
+            if policy.max_age_days is not None and edad > timedelta(days=policy.max_age_days):
+                borrar.append(ts)
+            elif edad <= timedelta(hours=policy.keep_all_hours):
+                conservar[ts] = ts
+            else:
+                if edad <= timedelta(days=policy.keep_daily_days):
+                    grupo = ('dia', ts.date())
+                else:
+                    grupo = ('semana',) + tuple(ts.isocalendar()[:2])
+                # Se recorre en orden, así que queda el último de cada grupo
+                if grupo in conservar:
+                    borrar.append(conservar[grupo])
+                conservar[grupo] = ts
+
+        for ts in borrar:
+            os.remove(self._path(world, dataset, ts))
+        return borrar
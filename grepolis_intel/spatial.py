@@ -0,0 +1,274 @@
+"""Índice espacial de ciudades y agregados por océano
+
+Las coordenadas de towns.txt son las de la isla (0-999). Un océano es un
+sector de 100x100 campos y se numera como en el juego: ``(x // 100) * 10 + y // 100``,
+de 0 a ``N_OCEANS - 1``.
+"""
+import numpy as np
+import pandas as pd
+
+MAP_SIZE = 1000
+# Lado de un océano en campos
+OCEAN_SIZE = 100
+DEFAULT_CELL = 20
+
+
+def ocean_of(x, y):
+    """Número de océano de unas coordenadas (escalares o arrays)"""
+    x = np.asarray(x, dtype=np.int32)
+    y = np.asarray(y, dtype=np.int32)
+    return (x // OCEAN_SIZE) * OCEANS_PER_SIDE + y // OCEAN_SIZE
+
+
+# Océanos por lado del mapa y en total (el número de océano va de 0 a N_OCEANS - 1)
+OCEANS_PER_SIDE = MAP_SIZE // OCEAN_SIZE
+N_OCEANS = OCEANS_PER_SIDE ** 2
+
+
+def _expand_slices(starts, counts):
+    """Concatena los rangos [start, start + count) sin bucle de Python"""
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    desplazamiento = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return desplazamiento + np.arange(total)
+
+
+class TownGrid:
+    """Rejilla de cubos sobre las ciudades de un snapshot (estilo CSR).
+
+    Las ciudades se ordenan por celda y ``offsets[c]:offsets[c + 1]`` da las
+    posiciones (en ``order``) de las ciudades de la celda ``c``. Las consultas
+    por radio solo miran las celdas que tocan el círculo.
+    """
+
+    def __init__(self, towns_data, cell=DEFAULT_CELL):
+        self.towns = towns_data
+        self.cell = cell
+        self.x = towns_data['Coord_X'].to_numpy(dtype=np.int32)
+        self.y = towns_data['Coord_Y'].to_numpy(dtype=np.int32)
+        self.ids = towns_data['ID_Ciudad'].to_numpy(dtype=np.int64)
+        self.owners = towns_data['ID_Jugador'].to_numpy(dtype=np.int64)
+
+        lado = int(max(self.x.max(initial=0), self.y.max(initial=0))) + 1
+        self.ncells = -(-lado // cell)
+        celdas = (self.x // cell) * self.ncells + self.y // cell
+        self.order = np.argsort(celdas, kind='stable')
+        self.offsets = np.zeros(self.ncells * self.ncells + 1, dtype=np.int64)
+        np.cumsum(np.bincount(celdas, minlength=self.ncells * self.ncells), out=self.offsets[1:])
+
+        # Para buscar ciudades por ID y por dueño
+        self._by_id = np.argsort(self.ids, kind='stable')
+        self._by_owner = np.argsort(self.owners, kind='stable')
+
+    def query_radius(self, cx, cy, radius):
+        """Ciudades a distancia <= radius de cada centro, en lote.
+
+        Devuelve (índice de centro, fila de la ciudad en ``towns``, distancia),
+        arrays paralelos ordenados por centro.
+        """
+        cx = np.atleast_1d(np.asarray(cx, dtype=np.int32))
+        cy = np.atleast_1d(np.asarray(cy, dtype=np.int32))
+        rc = int(np.ceil(radius / self.cell))
+        desplazamientos = np.arange(-rc, rc + 1)
+
+        gx = (cx // self.cell)[:, None, None] + desplazamientos[None, :, None]
+        gy = (cy // self.cell)[:, None, None] + desplazamientos[None, None, :]
+        gx, gy = np.broadcast_arrays(gx, gy)
+        valida = (gx >= 0) & (gx < self.ncells) & (gy >= 0) & (gy < self.ncells)
+        centro = np.broadcast_to(np.arange(len(cx))[:, None, None], gx.shape)[valida]
+        celdas = gx[valida] * self.ncells + gy[valida]
+
+        inicios = self.offsets[celdas]
+        cuentas = self.offsets[celdas + 1] - inicios
+        filas = self.order[_expand_slices(inicios, cuentas)]
+        centro = np.repeat(centro, cuentas)
+
+        dx = self.x[filas] - cx[centro]
+        dy = self.y[filas] - cy[centro]
+        distancia = np.sqrt((dx * dx + dy * dy).astype(np.float64))
+        dentro = distancia <= radius
+        return centro[dentro], filas[dentro], distancia[dentro]
+
+    def town_rows(self, town_ids):
+        """Filas de ``towns`` para los IDs dados (-1 si no existe)"""
+        town_ids = np.atleast_1d(np.asarray(town_ids, dtype=np.int64))
+        if len(self.ids) == 0:
+            return np.full(len(town_ids), -1)
+        pos = np.minimum(np.searchsorted(self.ids, town_ids, sorter=self._by_id), len(self.ids) - 1)
+        filas = self._by_id[pos]
+        return np.where(self.ids[filas] == town_ids, filas, -1)
+
+    def player_rows(self, player_ids):
+        """Filas de ``towns`` de todas las ciudades de los jugadores dados"""
+        player_ids = np.atleast_1d(np.asarray(player_ids, dtype=np.int64))
+        inicio = np.searchsorted(self.owners, player_ids, side='left', sorter=self._by_owner)
+        fin = np.searchsorted(self.owners, player_ids, side='right', sorter=self._by_owner)
+        return self._by_owner[_expand_slices(inicio, fin - inicio)]
+
+    def within_box(self, x0, y0, x1, y1):
+        """Filas de las ciudades con x0 <= x <= x1 e y0 <= y <= y1 (solo se miran las celdas que tocan la caja)"""
+        gx = np.arange(max(x0 // self.cell, 0), min(x1 // self.cell, self.ncells - 1) + 1)
+        gy = np.arange(max(y0 // self.cell, 0), min(y1 // self.cell, self.ncells - 1) + 1)
+        celdas = (gx[:, None] * self.ncells + gy[None, :]).ravel()
+        inicios = self.offsets[celdas]
+        filas = self.order[_expand_slices(inicios, self.offsets[celdas + 1] - inicios)]
+        x, y = self.x[filas], self.y[filas]
+        return filas[(x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)]
+
+    def within(self, x, y, radius):
+        """Ciudades a distancia <= radius de un punto, ordenadas por distancia"""
+        _, filas, distancia = self.query_radius(x, y, radius)
+        orden = np.argsort(distancia, kind='stable')
+        return self._result(filas[orden], distancia[orden])
+
+    def within_town(self, town_id, radius):
+        """Ciudades a distancia <= radius de una ciudad (sin incluirla)"""
+        fila = self.town_rows(town_id)[0]
+        if fila < 0:
+            return self._result(np.empty(0, dtype=np.int64), np.empty(0))
+        resultado = self.within(self.x[fila], self.y[fila], radius)
+        return resultado[resultado['ID_Ciudad'] != self.ids[fila]].reset_index(drop=True)
+
+    def within_player(self, player_id, radius):
+        """Ciudades ajenas a distancia <= radius de cualquier ciudad del jugador.
+
+        ``Distancia`` es la distancia a la ciudad propia más cercana.
+        """
+        propias = self.player_rows(player_id)
+        _, filas, distancia = self.query_radius(self.x[propias], self.y[propias], radius)
+        ajenas = self.owners[filas] != player_id
+        filas, distancia = filas[ajenas], distancia[ajenas]
+        # Para cada ciudad, la menor distancia a cualquiera de las propias
+        orden = np.lexsort((distancia, filas))
+        filas, distancia = filas[orden], distancia[orden]
+        primera = np.r_[True, filas[1:] != filas[:-1]] if len(filas) else np.empty(0, bool)
+        filas, distancia = filas[primera], distancia[primera]
+        orden = np.argsort(distancia, kind='stable')
+        return self._result(filas[orden], distancia[orden])
+
+    def _result(self, filas, distancia):
+        resultado = self.towns.iloc[filas].reset_index(drop=True)
+        resultado['Distancia'] = distancia.round(1)
+        return resultado
+
+
+def _owner_alliance(duenos, players_data):
+    """Alianza del dueño de cada ciudad (0 si es fantasma, no tiene alianza o no está en el snapshot)"""
+    ids = players_data['ID'].to_numpy(dtype=np.int64)
+    if len(ids) == 0:
+        return np.zeros(len(duenos), dtype=np.int64)
+    orden = np.argsort(ids)
+    pos = np.minimum(np.searchsorted(ids, duenos, sorter=orden), len(ids) - 1)
+    encontrado = ids[orden[pos]] == duenos
+    return np.where(encontrado, players_data['ID_Alianza'].to_numpy(dtype=np.int64)[orden[pos]], 0)
+
+
+def ocean_summary(towns_data, players_data=None):
+    """Ciudades, puntos, jugadores y alianzas por océano en un solo pase de bincount.
+
+    Con ``players_data`` se añade la alianza dominante (la que más puntos de
+    ciudad tiene en el océano) y su cuota.
+    """
+    oceano = ocean_of(towns_data['Coord_X'].to_numpy(), towns_data['Coord_Y'].to_numpy())
+    puntos = towns_data['Puntos_Ciudad'].to_numpy(dtype=np.int64)
+    duenos = towns_data['ID_Jugador'].to_numpy(dtype=np.int64)
+    n = N_OCEANS
+
+    resumen = pd.DataFrame({
+        'Ciudades': np.bincount(oceano, minlength=n),
+        'Puntos': np.bincount(oceano, weights=puntos, minlength=n).astype(np.int64),
+        'Fantasma': np.bincount(oceano, weights=duenos == 0, minlength=n).astype(np.int64),
+    })
+    pares = np.unique(oceano[duenos != 0].astype(np.int64) << 32 | duenos[duenos != 0])
+    resumen['Jugadores'] = np.bincount(pares >> 32, minlength=n)
+
+    if players_data is not None:
+        alianza = _owner_alliance(duenos, players_data)
+        con_alianza = alianza != 0
+        clave = oceano[con_alianza].astype(np.int64) << 32 | alianza[con_alianza]
+        claves, inversa = np.unique(clave, return_inverse=True)
+        puntos_par = np.bincount(inversa, weights=puntos[con_alianza])
+        oceano_par = claves >> 32
+        resumen['Alianzas'] = np.bincount(oceano_par, minlength=n)
+
+        # Alianza con más puntos por océano: ordenar por (océano, puntos) y coger la última
+        orden_par = np.lexsort((puntos_par, oceano_par))
+        ultima = np.r_[oceano_par[orden_par][1:] != oceano_par[orden_par][:-1], True] if len(orden_par) else np.empty(0, bool)
+        ganadores = orden_par[ultima]
+        dominante = np.zeros(n, dtype=np.int64)
+        cuota = np.zeros(n)
+        dominante[oceano_par[ganadores]] = claves[ganadores] & 0xFFFFFFFF
+        cuota[oceano_par[ganadores]] = puntos_par[ganadores]
+        resumen['Alianza_Dominante'] = dominante
+        resumen['Cuota_Dominante'] = np.divide(cuota, resumen['Puntos'], out=np.zeros(n), where=resumen['Puntos'] > 0).round(3)
+
+    resumen.index.name = 'Oceano'
+    return resumen
+
+
+class OceanDominance:
+    """Matriz alianza x océano de ciudades y puntos de un snapshot, en un solo pase de bincount.
+
+    ``towns[i, o]`` y ``points[i, o]`` son las ciudades y los puntos de la
+    alianza ``alliances[i]`` (ordenadas por ID) en el océano ``o``.
+    ``ocean_towns``/``ocean_points`` cuentan todas las ciudades del océano,
+    también las fantasma y las de jugadores sin alianza: son la base de las cuotas.
+    """
+
+    def __init__(self, towns_data, players_data):
+        n = N_OCEANS
+        oceano = ocean_of(towns_data['Coord_X'].to_numpy(), towns_data['Coord_Y'].to_numpy())
+        puntos = towns_data['Puntos_Ciudad'].to_numpy(dtype=np.int64)
+        alianza = _owner_alliance(towns_data['ID_Jugador'].to_numpy(dtype=np.int64), players_data)
+
+        self.ocean_towns = np.bincount(oceano, minlength=n)
+        self.ocean_points = np.bincount(oceano, weights=puntos, minlength=n).astype(np.int64)
+
+        con_alianza = alianza != 0
+        self.alliances, fila = np.unique(alianza[con_alianza], return_inverse=True)
+        celda = fila * n + oceano[con_alianza]
+        forma = (len(self.alliances), n)
+        self.towns = np.bincount(celda, minlength=forma[0] * n).reshape(forma)
+        self.points = np.bincount(celda, weights=puntos[con_alianza], minlength=forma[0] * n).astype(np.int64).reshape(forma)
+
+    @property
+    def share(self):
+        """Cuota de los puntos de cada océano (0-1) que tiene cada alianza"""
+        return np.divide(self.points, self.ocean_points, out=np.zeros(self.points.shape), where=self.ocean_points > 0)
+
+    def top(self, n):
+        """IDs de las ``n`` alianzas con más puntos de ciudad en el mapa"""
+        orden = np.argsort(-self.points.sum(axis=1), kind='stable')[:n]
+        return self.alliances[orden]
+
+    def matrix(self, alliance_ids, value='towns'):
+        """``towns``, ``points`` o ``share`` de las alianzas dadas (filas a 0 si no tienen ciudades)"""
+        alliance_ids = np.asarray(alliance_ids, dtype=np.int64)
+        valores = self.share if value == 'share' else getattr(self, value)
+        resultado = np.zeros((len(alliance_ids), N_OCEANS), dtype=valores.dtype)
+        if len(self.alliances):
+            pos = np.minimum(np.searchsorted(self.alliances, alliance_ids), len(self.alliances) - 1)
+            existe = self.alliances[pos] == alliance_ids
+            resultado[existe] = valores[pos[existe]]
+        return resultado
+
+    def changes(self, previous):
+        """Territorio ganado y perdido desde el snapshot ``previous``: una fila por (alianza, océano)
+        cuyo número de ciudades cambió, de mayor a menor cambio absoluto"""
+        ids = np.union1d(self.alliances, previous.alliances)
+        ahora, antes = self.matrix(ids), previous.matrix(ids)
+        cuota, cuota_antes = self.matrix(ids, 'share'), previous.matrix(ids, 'share')
+        fila, oceano = np.nonzero(ahora != antes)
+        cambios = pd.DataFrame({
+            'ID_Alianza': ids[fila],
+            'Oceano': oceano,
+            'Ciudades_Antes': antes[fila, oceano],
+            'Ciudades': ahora[fila, oceano],
+            'Cambio_Ciudades': ahora[fila, oceano] - antes[fila, oceano],
+            'Cuota_Antes': cuota_antes[fila, oceano].round(3),
+            'Cuota': cuota[fila, oceano].round(3),
+        })
+        cambios['Cambio_Cuota'] = (cambios['Cuota'] - cambios['Cuota_Antes']).round(3)
+        orden = np.argsort(-np.abs(cambios['Cambio_Ciudades'].to_numpy()), kind='stable')
+        return cambios.iloc[orden].reset_index(drop=True)
@@ -0,0 +1,164 @@
+"""Tablas de las pestañas calculadas sin Streamlit (las usan la app y la CLI)"""
+import numpy as np
+import pandas as pd
+
+from .activity import GHOST_LABEL, STATUS_LABELS
+from .indexes import SortedPages
+from .spatial import ocean_of
+from .targets import owner_column
+
+ROSTER_COLUMNS = [
+    'Ranking', 'Nombre', 'Puntos', 'Ciudades', 'Puntos_por_Ciudad',
+    'Categoria_Militar', 'Estado', 'Potencial_Militar',
+    'Puntos_Ataque', 'Puntos_Defensa', 'Delta_Puntos_Combate',
+]
+PLAYER_PAGE_COLUMNS = ['Ranking', 'Nombre', 'Puntos', 'Ciudades', 'Estado', 'Ultima_Actividad']
+
+
+def top_players(players_data, alliances_data=None, n=10):
+    """Los n primeros del ranking con el nombre de su alianza"""
+    top = players_data.nsmallest(n, 'Ranking')
+    alianza = top['ID_Alianza'].to_numpy(dtype=np.int64)
+    if alliances_data is not None:
+        nombres = alliances_data.set_index('ID_Alianza')['Nombre_Alianza']
+        nombre_alianza = pd.Series(alianza).map(nombres).fillna("Sin alianza").to_numpy()
+    else:
+        nombre_alianza = np.array(["Sin alianza" if a == 0 else f"ID: {a}" for a in alianza], dtype=object)
+    return pd.DataFrame({
+        'Ranking': top['Ranking'].to_numpy(),
+        'Nombre': top['Nombre'].to_numpy(),
+        'Puntos': top['Puntos'].to_numpy(),
+        'Alianza': nombre_alianza,
+    })
+
+
+def alliance_roster(players_table, index, alliance_id, columns=ROSTER_COLUMNS):
+    """Miembros de una alianza en orden de ranking, con sus métricas derivadas"""
+    return players_table.iloc[index.alliance_rows(alliance_id)][list(columns)].reset_index(drop=True)
+
+
+def rank_targets(players_data, gaps, row):
+    """Puntos que le faltan al jugador de la fila ``row`` para subir cada salto de ranking.
+
+    ``gaps`` es el ``RankGaps`` del snapshot. Solo aparecen los saltos posibles.
+    """
+    objetivos = gaps.target_rows[row]
+    posible = objetivos >= 0
+    objetivos = objetivos[posible]
+    return pd.DataFrame({
+        'Salto': gaps.jumps[posible],
+        'Ranking_Meta': players_data['Ranking'].to_numpy()[objetivos],
+        'Puntos_Necesarios': gaps.needed[row][posible],
+        'Jugador': players_data['Nombre'].take(objetivos).to_numpy(dtype=object),
+        'ID_Objetivo': players_data['ID'].to_numpy()[objetivos],
+    })
+
+
+def closest_to_climb(players_data, gaps, rows, jump, n=None):
+    """Jugadores de ``rows`` (p. ej. una alianza) ordenados por los puntos que les faltan para subir ``jump`` puestos"""
+    rows = np.asarray(rows, dtype=np.int64)
+    necesarios = gaps.needed_for(jump, rows)
+    posible = necesarios >= 0
+    rows, necesarios = rows[posible], necesarios[posible]
+    orden = np.argsort(necesarios, kind='stable')[:n]
+    rows, objetivos = rows[orden], gaps.targets_for(jump, rows[orden])
+    # Solo se convierten a objetos los nombres que salen en la tabla
+    nombres = players_data['Nombre']
+    ids = players_data['ID'].to_numpy()
+    return pd.DataFrame({
+        'ID': ids[rows],
+        'Nombre': nombres.take(rows).to_numpy(dtype=object),
+        'Ranking': players_data['Ranking'].to_numpy()[rows],
+        'Puntos': players_data['Puntos'].to_numpy()[rows],
+        'Puntos_Necesarios': necesarios[orden],
+        'Jugador': nombres.take(objetivos).to_numpy(dtype=object),
+        'ID_Objetivo': ids[objetivos],
+    })
+
+
+def _status_order(estado):
+    """Estado -> posición en ``STATUS_LABELS`` (Activo primero, sin estado al final)"""
+    codigo = pd.Categorical(estado, categories=STATUS_LABELS).codes.astype(np.int64)
+    return np.where(codigo < 0, len(STATUS_LABELS), codigo)
+
+
+def player_pages(players_table):
+    """Órdenes de la lista de jugadores del servidor, filtrables por estado"""
+    return SortedPages({
+        'Ranking': (players_table['Ranking'], True),
+        'Nombre': (players_table['Nombre'], True),
+        'Puntos': (players_table['Puntos'], False),
+        'Estado': (_status_order(players_table['Estado']), True),
+    }, groups=players_table['Estado'])
+
+
+def town_pages(towns_data, players_table):
+    """Órdenes de todas las ciudades, filtrables por el estado de su dueño (``GHOST_LABEL`` sin dueño)"""
+    estado = owner_column(towns_data, players_table, 'Estado', GHOST_LABEL)
+    return SortedPages({
+        'Puntos': (towns_data['Puntos_Ciudad'], False),
+        'Nombre': (towns_data['Nombre_Ciudad'], True),
+        'Océano': (ocean_of(towns_data['Coord_X'].to_numpy(), towns_data['Coord_Y'].to_numpy()), True),
+        'Jugador': (owner_column(towns_data, players_table, 'Nombre', None), True),
+    }, groups=estado)
+
+
+def town_page(towns_data, players_table, index, rows):
+    """Ciudades de una página con el nombre y el estado de su dueño"""
+    # Solo se tocan las filas de la página, nunca las columnas enteras
+    ciudades = towns_data.iloc[np.asarray(rows, dtype=np.int64)]
+    filas = index.rows_by_id(ciudades['ID_Jugador'].to_numpy())
+    con_dueno = filas >= 0
+    jugador = np.full(len(filas), GHOST_LABEL, dtype=object)
+    estado = np.full(len(filas), GHOST_LABEL, dtype=object)
+    jugador[con_dueno] = players_table['Nombre'].take(filas[con_dueno]).to_numpy(dtype=object)
+    estado[con_dueno] = players_table['Estado'].take(filas[con_dueno]).to_numpy(dtype=object)
+    x = ciudades['Coord_X'].to_numpy()
+    y = ciudades['Coord_Y'].to_numpy()
+    return pd.DataFrame({
+        'Nombre_Ciudad': ciudades['Nombre_Ciudad'].to_numpy(dtype=object),
+        'Jugador': jugador,
+        'Estado': estado,
+        'Puntos_Ciudad': ciudades['Puntos_Ciudad'].to_numpy(),
+        'Oceano': ocean_of(x, y),
+        'Coord_X': x,
+        'Coord_Y': y,
+    })
+
+
+def _names(table, column, rows, ids, zero_label):
+    """Nombre de cada ID ya cruzado a ``rows``: ``zero_label`` para el ID 0 y "ID: n" si no está en la tabla"""
+    nombres = np.array([zero_label if i == 0 else f"ID: {i}" for i in ids], dtype=object)
+    existe = rows >= 0
+    if table is not None and existe.any():
+        nombres[existe] = table[column].take(rows[existe]).to_numpy(dtype=object)
+    return nombres
+
+
+def conquest_table(conquests, rows, players_table, index, grid=None, n=None, distance=None):
+    """Conquistas de ``rows`` (las más recientes primero) con los nombres de ciudad, jugadores y alianzas.
+
+    ``conquests`` es el ``ConquestIndex`` de la versión en uso; los nombres
+    salen del snapshot actual, así que un jugador borrado aparece por su ID.
+    ``distance`` (alineada con ``rows``, como la de ``ConquestIndex.near``)
+    añade la columna ``Distancia``.
+    """
+    rows = np.asarray(rows, dtype=np.int64)[::-1][:n]
+    datos = conquests.frame(rows)
+    ciudades = datos['ID_Ciudad'].to_numpy()
+    nuevo, anterior = datos['ID_Nuevo'].to_numpy(), datos['ID_Anterior'].to_numpy()
+    alianza, alianza_anterior = datos['ID_Alianza_Nueva'].to_numpy(), datos['ID_Alianza_Anterior'].to_numpy()
+    resultado = pd.DataFrame({
+        'Fecha': datos['Fecha'],
+        'Ciudad': _names(grid.towns if grid is not None else None, 'Nombre_Ciudad',
+                         grid.town_rows(ciudades) if grid is not None else np.full(len(rows), -1), ciudades, ""),
+        'Conquistador': _names(players_table, 'Nombre', index.rows_by_id(nuevo), nuevo, GHOST_LABEL),
+        'Alianza': _names(index.alliances, 'Nombre_Alianza', index.alliance_rows_by_id(alianza), alianza, "Sin alianza"),
+        'Anterior': _names(players_table, 'Nombre', index.rows_by_id(anterior), anterior, GHOST_LABEL),
+        'Alianza_Anterior': _names(index.alliances, 'Nombre_Alianza', index.alliance_rows_by_id(alianza_anterior),
+                                   alianza_anterior, "Sin alianza"),
+        'Puntos_Ciudad': datos['Puntos_Ciudad'].to_numpy(),
+    })
+    if distance is not None:
+        resultado['Distancia'] = np.asarray(distance)[::-1][:n].round(1)
+    return resultado
@@ -0,0 +1,158 @@
+"""Búsqueda en lote de los objetivos más cercanos para farmeo y ataques"""
+import numpy as np
+import pandas as pd
+
+from .spatial import TownGrid
+
+# Velocidad base de cada unidad (campos por hora, sin bonificaciones)
+UNIT_SPEEDS = {
+    "Espadachín": 8,
+    "Hondero": 14,
+    "Arquero": 12,
+    "Hoplita": 6,
+    "Jinete": 22,
+    "Carro": 18,
+    "Catapulta": 2,
+    "Bote de transporte": 8,
+    "Birreme": 15,
+    "Barco de fuego": 13,
+    "Brulote": 5,
+    "Bote rápido": 15,
+    "Trirreme": 15,
+    "Barco colonizador": 3,
+}
+
+TARGET_MODES = ("Fantasma", "Inactivas", "Alianza", "Puntos")
+INACTIVE_STATUSES = ("🟠 Inactivo", "🔴 Offline")
+
+
+def travel_hours(distance, speed, world_speed=1.0):
+    """Tiempo de viaje aproximado en horas para una velocidad en campos/hora"""
+    return np.asarray(distance, dtype=np.float64) / (speed * world_speed)
+
+
+def owner_column(towns_data, players_data, column, default):
+    """Valor de ``column`` del dueño de cada ciudad, cruzando IDs ordenados"""
+    ids = players_data['ID'].to_numpy(dtype=np.int64)
+    duenos = towns_data['ID_Jugador'].to_numpy(dtype=np.int64)
+    valores = players_data[column].to_numpy()
+    if len(ids) == 0:
+        return np.full(len(duenos), default)
+    orden = np.argsort(ids, kind='stable')
+    pos = orden[np.minimum(np.searchsorted(ids, duenos, sorter=orden), len(ids) - 1)]
+    return np.where(ids[pos] == duenos, valores[pos], default)
+
+
+def candidate_mask(towns_data, players_with_status, mode, alliance_id=None, max_points=None, exclude_alliance=None):
+    """Máscara de ciudades objetivo según el modo elegido.
+
+    - ``Fantasma``: ciudades sin dueño
+    - ``Inactivas``: ciudades de jugadores inactivos u offline
+    - ``Alianza``: ciudades de la alianza ``alliance_id``
+    - ``Puntos``: ciudades con ``Puntos_Ciudad <= max_points``
+
+    ``exclude_alliance`` descarta siempre las ciudades de esa alianza (la propia).
+    """
+    duenos = towns_data['ID_Jugador'].to_numpy()
+    alianza = owner_column(towns_data, players_with_status, 'ID_Alianza', 0)
+
+    if mode == "Fantasma":
+        mascara = duenos == 0
+    elif mode == "Inactivas":
+        estado = owner_column(towns_data, players_with_status, 'Estado', '')
+        mascara = (duenos != 0) & np.isin(estado, INACTIVE_STATUSES)
+    elif mode == "Alianza":
+        mascara = (duenos != 0) & (alianza == alliance_id)
+    elif mode == "Puntos":
+        mascara = towns_data['Puntos_Ciudad'].to_numpy() <= max_points
+    else:
+        raise ValueError(f"Modo de objetivo desconocido: {mode}")
+
+    if exclude_alliance:
+        mascara &= alianza != exclude_alliance
+    return mascara
+
+
+def nearest_pairs(grid, source_rows, target_rows, k, start_radius=10, max_radius=1500):
+    """Los k objetivos más cercanos de cada ciudad origen, en una consulta muchos-a-muchos.
+
+    Construye una rejilla solo con los objetivos y consulta todos los orígenes
+    a la vez; los que no llegan a k resultados repiten con el radio doble.
+    Devuelve (fila origen, fila objetivo, distancia) en filas de ``grid.towns``.
+    """
+    source_rows = np.asarray(source_rows, dtype=np.int64)
+    target_rows = np.asarray(target_rows, dtype=np.int64)
+    vacio = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0))
+    if len(source_rows) == 0 or len(target_rows) == 0:
+        return vacio
+
+    objetivos = TownGrid(grid.towns.iloc[target_rows])
+    sx, sy = grid.x[source_rows], grid.y[source_rows]
+    pendientes = np.arange(len(source_rows))
+    origen, destino, distancia = [], [], []
+    radio = start_radius
+    while len(pendientes):
+        centro, filas, d = objetivos.query_radius(sx[pendientes], sy[pendientes], radio)
+        cuentas = np.bincount(centro, minlength=len(pendientes))
+        # Con k o más dentro del radio los k más cercanos ya son exactos
+        listos = (cuentas >= k) | (radio >= max_radius)
+        tomar = listos[centro]
+        origen.append(pendientes[centro[tomar]])
+        destino.append(filas[tomar])
+        distancia.append(d[tomar])
+        pendientes = pendientes[~listos]
+        radio *= 2
+
+    origen = np.concatenate(origen)
+    destino = np.concatenate(destino)
+    distancia = np.concatenate(distancia)
+
+    # Los k primeros de cada origen por distancia
+    orden = np.lexsort((distancia, origen))
+    origen, destino, distancia = origen[orden], destino[orden], distancia[orden]
+    inicio_grupo = np.searchsorted(origen, origen, side='left')
+    dentro = np.arange(len(origen)) - inicio_grupo < k
+    return source_rows[origen[dentro]], target_rows[destino[dentro]], distancia[dentro]
+
+
+def find_targets(grid, players_with_status, player_ids, mask, k=10, speed=UNIT_SPEEDS["Birreme"], world_speed=1.0):
+    """Los k objetivos más cercanos para cada jugador de ``player_ids``.
+
+    Para cada (jugador, objetivo) se queda con la ciudad propia más cercana.
+    El resultado va ordenado por jugador y distancia, con el tiempo de viaje
+    para la velocidad de unidad indicada. Las ciudades de los propios
+    ``player_ids`` nunca son objetivo, tengan o no alianza.
+    """
+    player_ids = np.atleast_1d(np.asarray(player_ids, dtype=np.int64))
+    fuentes = grid.player_rows(player_ids)
+    objetivos = np.flatnonzero(np.asarray(mask, dtype=bool) & ~np.isin(grid.owners, player_ids))
+    origen, destino, distancia = nearest_pairs(grid, fuentes, objetivos, k)
+
+    jugador = grid.owners[origen]
+    orden = np.lexsort((distancia, destino, jugador))
+    jugador, origen, destino, distancia = jugador[orden], origen[orden], destino[orden], distancia[orden]
+    primero = np.ones(len(jugador), dtype=bool)
+    primero[1:] = (jugador[1:] != jugador[:-1]) | (destino[1:] != destino[:-1])
+    jugador, origen, destino, distancia = jugador[primero], origen[primero], destino[primero], distancia[primero]
+
+    orden = np.lexsort((distancia, jugador))
+    jugador, origen, destino, distancia = jugador[orden], origen[orden], destino[orden], distancia[orden]
+    dentro = np.arange(len(jugador)) - np.searchsorted(jugador, jugador, side='left') < k
+    jugador, origen, destino, distancia = jugador[dentro], origen[dentro], destino[dentro], distancia[dentro]
+
+    towns = grid.towns
+    objetivos_df = towns.iloc[destino].reset_index(drop=True)
+    resultado = pd.DataFrame({
+        'ID_Jugador_Origen': jugador,
+        'Ciudad_Origen': towns['Nombre_Ciudad'].to_numpy()[origen],
+        'ID_Ciudad': objetivos_df['ID_Ciudad'].to_numpy(),
+        'Nombre_Ciudad': objetivos_df['Nombre_Ciudad'].to_numpy(),
+        'ID_Jugador': objetivos_df['ID_Jugador'].to_numpy(),
+        'Puntos_Ciudad': objetivos_df['Puntos_Ciudad'].to_numpy(),
+        'Coord_X': objetivos_df['Coord_X'].to_numpy(),
+        'Coord_Y': objetivos_df['Coord_Y'].to_numpy(),
+        'Distancia': distancia.round(1),
+        'Horas': travel_hours(distancia, speed, world_speed).round(2),
+    })
+    resultado['Dueño'] = owner_column(objetivos_df, players_with_status, 'Nombre', "👻 Fantasma")
+    return resultado
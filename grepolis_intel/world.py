@@ -0,0 +1,52 @@
+"""Carga de un mundo sin Streamlit: snapshots guardados -> tablas derivadas
+
+Es la misma cadena que sigue la app (actividad, métricas, índices) para
+usarla desde la CLI, cron jobs o bots.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+import pandas as pd
+
+from .activity import ActivityTracker
+from .indexes import PlayerIndex, RankGaps
+from .kills import KILL_COLUMNS, add_kill_points
+from .metrics import add_player_metrics
+
+
+@dataclass
+class WorldTables:
+    """Tablas de un snapshot de un mundo, listas para consultar"""
+    world: str
+    players: pd.DataFrame
+    index: PlayerIndex
+    alliances: Optional[pd.DataFrame] = None
+    towns: Optional[pd.DataFrame] = None
+    gaps: Optional[RankGaps] = None
+
+
+def load_world(store, world, tracker=None):
+    """Último snapshot de cada dump del mundo con actividad, combates y métricas derivadas.
+
+    Devuelve None si todavía no hay snapshot de jugadores.
+    """
+    players_ts = store.latest_timestamp(world, 'players')
+    if players_ts is None:
+        return None
+    alliances_ts = store.latest_timestamp(world, 'alliances')
+    towns_ts = store.latest_timestamp(world, 'towns')
+
+    tracker = tracker or ActivityTracker()
+    tracker.sync(store, world)
+    kills, previous = {}, {}
+    for dump in KILL_COLUMNS:
+        ts = store.latest_timestamp(world, dump)
+        if ts is not None:
+            kills[dump] = store.read(world, dump, ts)
+            anterior = store.previous_timestamp(world, dump, ts)
+            previous[dump] = store.read(world, dump, anterior) if anterior is not None else None
+    players = tracker.classify(store.read(world, 'players', players_ts))
+    players = add_player_metrics(add_kill_points(players, kills, previous))
+    alliances = store.read(world, 'alliances', alliances_ts) if alliances_ts is not None else None
+    towns = store.read(world, 'towns', towns_ts) if towns_ts is not None else None
+    return WorldTables(world, players, PlayerIndex(players, alliances), alliances, towns, RankGaps(players))
@@ -0,0 +1,132 @@
+"""Mapa del mundo: rasters de densidad precalculados por snapshot y puntos de la ventana visible
+
+Pintar las ~100.000 ciudades de un mundo como puntos bloquea el navegador.
+``DensityTiles`` cuenta las ciudades por celda a varios niveles de zoom
+(``TILE_LEVELS`` campos por celda), por estado del dueño y por alianza, una
+vez por snapshot; las vistas de todo el mundo son esos rasters. Al acercarse
+(un océano o unos pocos) la ventana tiene pocas ciudades y se pintan como
+puntos con WebGL, sacadas de ``TownGrid.within_box``.
+"""
+import numpy as np
+import pandas as pd
+
+from .activity import GHOST_LABEL, STATUS_LABELS
+from .spatial import MAP_SIZE, N_OCEANS, OCEAN_SIZE, OCEANS_PER_SIDE, ocean_of
+from .tables import town_page
+
+# Campos por celda de cada nivel: 50x50, 100x100 y 200x200 celdas para el mundo entero
+TILE_LEVELS = (20, 10, 5)
+# Capas por estado del dueño, en este orden (las fantasma al final)
+MAP_LAYERS = (*STATUS_LABELS, GHOST_LABEL)
+# Por encima de tantas ciudades en la ventana se pinta el raster en vez de los puntos
+MAX_POINTS = 20_000
+
+
+def ocean_box(ocean, span=1):
+    """Caja (x0, y0, x1, y1) de ``span`` x ``span`` océanos centrada en ``ocean`` (recortada al mapa)"""
+    lado = OCEAN_SIZE * span
+    x0 = (ocean // OCEANS_PER_SIDE) * OCEAN_SIZE - OCEAN_SIZE * (span // 2)
+    y0 = (ocean % OCEANS_PER_SIDE) * OCEAN_SIZE - OCEAN_SIZE * (span // 2)
+    x0 = min(max(x0, 0), MAP_SIZE - lado)
+    y0 = min(max(y0, 0), MAP_SIZE - lado)
+    return x0, y0, x0 + lado - 1, y0 + lado - 1
+
+
+class DensityTiles:
+    """Ciudades por celda de cada nivel de zoom, por estado del dueño y por alianza.
+
+    Los estados son un cubo denso ``(capa, x, y)`` por nivel, de un solo
+    ``bincount``. Las alianzas son pocas ciudades repartidas entre muchas
+    alianzas: se guardan como pares (alianza, celda) ordenados con su cuenta,
+    y el raster de una alianza es un rango contiguo de esos pares.
+    """
+
+    def __init__(self, towns_data, players_table, index, levels=TILE_LEVELS):
+        self.levels = tuple(sorted(levels, reverse=True))
+        x = np.minimum(towns_data['Coord_X'].to_numpy(dtype=np.int64), MAP_SIZE - 1)
+        y = np.minimum(towns_data['Coord_Y'].to_numpy(dtype=np.int64), MAP_SIZE - 1)
+
+        # Un solo cruce ciudad -> dueño; capa y alianza se codifican por jugador, no por ciudad
+        filas = index.rows_by_id(towns_data['ID_Jugador'].to_numpy())
+        con_dueno = filas >= 0
+        capa = np.full(len(filas), MAP_LAYERS.index(GHOST_LABEL), dtype=np.int64)
+        alianza = np.zeros(len(filas), dtype=np.int64)
+        if con_dueno.any():
+            codigo = pd.Categorical(players_table['Estado'], categories=MAP_LAYERS).codes.astype(np.int64)
+            codigo[codigo < 0] = MAP_LAYERS.index(GHOST_LABEL)
+            capa[con_dueno] = codigo[filas[con_dueno]]
+            alianza[con_dueno] = players_table['ID_Alianza'].to_numpy(dtype=np.int64)[filas[con_dueno]]
+        con_alianza = alianza != 0
+        # Océanos con alguna ciudad (los que se pueden elegir como ventana)
+        self.oceans = np.flatnonzero(np.bincount(ocean_of(x, y), minlength=N_OCEANS))
+
+        self._status = {}
+        self._alliance_keys = {}
+        self._alliance_counts = {}
+        for nivel in self.levels:
+            n = -(-MAP_SIZE // nivel)
+            celda = (x // nivel) * n + y // nivel
+            self._status[nivel] = np.bincount(
+                capa * (n * n) + celda, minlength=len(MAP_LAYERS) * n * n,
+            ).reshape(len(MAP_LAYERS), n, n)
+            claves, cuentas = np.unique(alianza[con_alianza] << 32 | celda[con_alianza], return_counts=True)
+            self._alliance_keys[nivel] = claves
+            self._alliance_counts[nivel] = cuentas
+
+    def level_for(self, width, max_cells=100):
+        """Nivel más fino que deja como mucho ``max_cells`` celdas a lo ancho de ``width`` campos"""
+        for nivel in reversed(self.levels):
+            if -(-width // nivel) <= max_cells:
+                return nivel
+        return self.levels[0]
+
+    def raster(self, level, status=None, alliance=None, box=None):
+        """Ciudades por celda ``[ix, iy]`` del nivel dado.
+
+        ``status`` es una etiqueta de ``MAP_LAYERS`` (todas si es None) y
+        ``alliance`` un ID de alianza (ignora ``status``). ``box`` =
+        (x0, y0, x1, y1) recorta a las celdas que tocan la caja. Devuelve
+        (raster, x de la esquina de cada columna, y de cada fila).
+        """
+        cubo = self._status[level]
+        n = cubo.shape[1]
+        if alliance is not None:
+            claves = self._alliance_keys[level]
+            inicio, fin = np.searchsorted(claves, [alliance << 32, (alliance + 1) << 32])
+            resultado = np.zeros(n * n, dtype=np.int64)
+            resultado[claves[inicio:fin] & 0xFFFFFFFF] = self._alliance_counts[level][inicio:fin]
+            resultado = resultado.reshape(n, n)
+        elif status is not None:
+            resultado = cubo[MAP_LAYERS.index(status)]
+        else:
+            resultado = cubo.sum(axis=0)
+
+        desde_x = desde_y = 0
+        hasta_x = hasta_y = n
+        if box is not None:
+            x0, y0, x1, y1 = box
+            desde_x, hasta_x = x0 // level, min(x1 // level + 1, n)
+            desde_y, hasta_y = y0 // level, min(y1 // level + 1, n)
+        return (
+            resultado[desde_x:hasta_x, desde_y:hasta_y],
+            np.arange(desde_x, hasta_x) * level,
+            np.arange(desde_y, hasta_y) * level,
+        )
+
+
+def map_points(towns_data, players_table, index, rows):
+    """Ciudades de la ventana para pintarlas como puntos, con su dueño, estado y alianza.
+
+    Las ciudades de una isla comparten coordenadas: ``X``/``Y`` las reparten
+    en un pequeño círculo según su posición en la isla para que no se tapen.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    puntos = town_page(towns_data, players_table, index, rows)
+    filas = index.rows_by_id(towns_data['ID_Jugador'].take(rows).to_numpy())
+    alianza = np.zeros(len(filas), dtype=np.int64)
+    alianza[filas >= 0] = players_table['ID_Alianza'].take(filas[filas >= 0]).to_numpy(dtype=np.int64)
+    puntos['ID_Alianza'] = alianza
+    angulo = towns_data['Posicion_Isla'].take(rows).to_numpy(dtype=np.float64) * (2 * np.pi / 20)
+    puntos['X'] = puntos['Coord_X'] + 0.35 * np.cos(angulo)
+    puntos['Y'] = puntos['Coord_Y'] + 0.35 * np.sin(angulo)
+    return puntos
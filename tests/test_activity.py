@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pandas.testing as pdt
+
+from grepolis_intel.activity import ActivityTracker
+from grepolis_intel.snapshots import SnapshotStore
+
+INICIO = datetime(2026, 8, 3, 0, 0, tzinfo=timezone.utc)
+HORAS = [0, 2, 6]
+
+
+def _snapshot(h):
+    """El 1 sube puntos en cada snapshot; el 2 solo en el último"""
+    return pd.DataFrame({
+        'ID': [1, 2, 3],
+        'Puntos': [1000 + 10 * h, 2000 + (50 if h == 6 else 0), 3000],
+        'Ranking': [3, 2, 1],
+    })
+
+
+def _almacen(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    for h in HORAS:
+        store.write('es137', 'players', _snapshot(h), INICIO + timedelta(hours=h))
+    return store
+
+
+def test_sync_con_until_no_aplica_snapshots_posteriores(tmp_path):
+    store = _almacen(tmp_path)
+    medio = INICIO + timedelta(hours=2)
+    tracker = ActivityTracker()
+    tracker.sync(store, 'es137', until=medio)
+    assert tracker.now == int(medio.timestamp())
+
+
+def test_classify_at_usa_el_estado_del_snapshot_fijado(tmp_path):
+    store = _almacen(tmp_path)
+    medio = INICIO + timedelta(hours=2)
+    esperado = ActivityTracker()
+    for h in HORAS[:2]:
+        esperado.update_players(INICIO + timedelta(hours=h), _snapshot(h))
+    esperado = esperado.classify(_snapshot(2))
+
+    # El detector compartido ya va por el último snapshot: no debe filtrarse
+    compartido = ActivityTracker()
+    compartido.sync(store, 'es137')
+    resultado = compartido.classify_at(store, 'es137', medio, _snapshot(2))
+    pdt.assert_frame_equal(resultado, esperado)
+    assert compartido.now == int((INICIO + timedelta(hours=6)).timestamp())
+
+    # Uno que aún no ha llegado avanza solo hasta el instante fijado
+    nuevo = ActivityTracker()
+    pdt.assert_frame_equal(nuevo.classify_at(store, 'es137', medio, _snapshot(2)), esperado)
+    assert nuevo.now == int(medio.timestamp())
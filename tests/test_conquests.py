@@ -0,0 +1,120 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from grepolis_intel.conquests import ConquestIndex, ConquestLog
+from grepolis_intel.parse import CONQUERS_SCHEMA
+from grepolis_intel.spatial import TownGrid
+
+T0 = 1_790_000_000
+
+
+def _conquistas(n=400, seed=3):
+    rnd = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'ID_Ciudad': rnd.integers(1, 60, n),
+        # Fechas repetidas a propósito: varias conquistas en el mismo segundo
+        'Fecha': np.sort(T0 + rnd.integers(0, 200, n) * 600),
+        'ID_Nuevo': rnd.integers(1, 15, n),
+        'ID_Anterior': rnd.integers(0, 15, n),
+        'ID_Alianza_Nueva': rnd.choice([0, 7, 8, 9], n),
+        'ID_Alianza_Anterior': rnd.choice([0, 7, 8, 9], n),
+        'Puntos_Ciudad': rnd.integers(100, 5000, n),
+    })[list(CONQUERS_SCHEMA)]
+
+
+def _publicacion(conquistas, hasta):
+    """conquers.txt publicado en ``hasta``: toda la temporada hasta entonces, en otro orden"""
+    return conquistas[conquistas['Fecha'] <= hasta].sample(frac=1, random_state=int(hasta) % 1000)
+
+
+def _ts(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc)
+
+
+def _ordenadas(df):
+    return df.sort_values(list(CONQUERS_SCHEMA), ignore_index=True)
+
+
+def test_append_y_reabrir_guarda_cada_conquista_una_vez(tmp_path):
+    todas = _conquistas()
+    cortes = np.unique(todas['Fecha'])[::17].tolist() + [int(todas['Fecha'].max())]
+    for corte in cortes:
+        # Un registro nuevo en cada descarga, como otro proceso o un reinicio
+        ConquestLog(str(tmp_path)).append('es137', _publicacion(todas, corte), _ts(corte + 60))
+    # Repetir la misma descarga no añade nada
+    assert ConquestLog(str(tmp_path)).append('es137', todas, _ts(cortes[-1] + 60)) == 0
+
+    registro = ConquestLog(str(tmp_path))
+    leidas = registro.read('es137')
+    pd.testing.assert_frame_equal(_ordenadas(leidas), _ordenadas(todas), check_dtype=False)
+    assert leidas['Fecha'].is_monotonic_increasing
+    assert registro.last_timestamp('es137') == _ts(cortes[-1] + 60)
+
+    registro.compact('es137')
+    assert len(registro._files('es137', 'new')) == 1
+    pd.testing.assert_frame_equal(_ordenadas(registro.read('es137')), _ordenadas(todas), check_dtype=False)
+    # Tras compactar se sigue añadiendo sin repetir
+    assert registro.append('es137', todas, _ts(cortes[-1] + 3600)) == 0
+
+    desde, hasta = T0 + 300 * 60, T0 + 900 * 60
+    intervalo = registro.read('es137', start=_ts(desde), end=hasta)
+    esperado = todas[todas['Fecha'].between(desde, hasta)]
+    pd.testing.assert_frame_equal(_ordenadas(intervalo), _ordenadas(esperado), check_dtype=False)
+
+
+def test_indices_igual_que_filtrar_con_pandas():
+    todas = _conquistas()
+    indice = ConquestIndex(todas)
+    datos = indice.data
+    desde, hasta = T0 + 200 * 600 // 3, T0 + 200 * 600 * 2 // 3
+    en_ventana = datos['Fecha'].between(desde, hasta)
+
+    def esperado(mascara):
+        return np.flatnonzero(mascara & en_ventana).tolist()
+
+    assert indice.window(desde, hasta).tolist() == esperado(True)
+    for ciudad in (1, 17, 59, 99):
+        assert indice.by_town(ciudad, desde, hasta).tolist() == esperado(datos['ID_Ciudad'] == ciudad)
+    for jugador in (0, 3, 14):
+        ganadas = datos['ID_Nuevo'] == jugador
+        perdidas = datos['ID_Anterior'] == jugador
+        assert indice.by_player(jugador, desde, hasta, role='gained').tolist() == esperado(ganadas)
+        assert indice.by_player(jugador, desde, hasta, role='lost').tolist() == esperado(perdidas)
+        assert indice.by_player(jugador, desde, hasta).tolist() == esperado(ganadas | perdidas)
+    for alianza in (0, 7, 9):
+        ganadas = datos['ID_Alianza_Nueva'] == alianza
+        perdidas = datos['ID_Alianza_Anterior'] == alianza
+        assert indice.by_alliance(alianza, _ts(desde), _ts(hasta), role='gained').tolist() == esperado(ganadas)
+        assert indice.by_alliance(alianza, desde, hasta).tolist() == esperado(ganadas | perdidas)
+
+    frame = indice.frame(indice.by_town(17))
+    assert str(frame['Fecha'].dt.tz) == 'UTC'
+    assert (frame['ID_Ciudad'] == 17).all()
+
+
+def test_conquistas_cercanas_igual_que_distancias_a_mano():
+    todas = _conquistas()
+    rnd = np.random.default_rng(5)
+    towns = pd.DataFrame({
+        'ID_Ciudad': np.arange(1, 60),
+        'ID_Jugador': rnd.integers(1, 15, 59),
+        'Coord_X': rnd.integers(0, 100, 59),
+        'Coord_Y': rnd.integers(0, 100, 59),
+    })
+    grid = TownGrid(towns)
+    indice = ConquestIndex(todas)
+    jugador, radio, desde = 4, 30, T0 + 50 * 600
+
+    filas, distancia = indice.near(grid, jugador, radio, start=desde)
+
+    propias = towns[towns['ID_Jugador'] == jugador]
+    dx = towns['Coord_X'].to_numpy()[:, None] - propias['Coord_X'].to_numpy()[None, :]
+    dy = towns['Coord_Y'].to_numpy()[:, None] - propias['Coord_Y'].to_numpy()[None, :]
+    cercania = pd.Series(np.sqrt(dx ** 2 + dy ** 2).min(axis=1), index=towns['ID_Ciudad'])
+    cercanas = cercania[cercania <= radio]
+    datos = indice.data
+    esperado = np.flatnonzero(datos['ID_Ciudad'].isin(cercanas.index) & (datos['Fecha'] >= desde))
+    assert filas.tolist() == esperado.tolist()
+    np.testing.assert_allclose(distancia, cercanas[datos['ID_Ciudad'].to_numpy()[esperado]].to_numpy())
@@ -0,0 +1,100 @@
+import glob
+import os
+import shutil
+
+import pytest
+
+from benchmarks.standin import serve_directory, write_fixture_dumps
+from grepolis_intel.fetch import DUMPS, WorldFetcher
+
+
+@pytest.fixture(scope='module')
+def dumps(tmp_path_factory):
+    root = tmp_path_factory.mktemp('dumps')
+    write_fixture_dumps(str(root), players=200, alliances=10)
+    return str(root)
+
+
+@pytest.fixture
+def servidor(dumps):
+    server, url = serve_directory(dumps)
+    yield url
+    server.shutdown()
+
+
+def test_primera_descarga_200_y_despues_304(servidor, dumps):
+    fetcher = WorldFetcher(base_url=servidor)
+    try:
+        primera = fetcher.fetch('players')
+        assert primera.status == 200 and primera.url.endswith('players.txt.gz')
+        assert primera.etag and primera.last_modified
+        with open(os.path.join(dumps, 'players.txt'), 'rb') as f:
+            assert primera.body == f.read()
+
+        # If-None-Match: sin cambios vuelve el cuerpo ya descargado
+        segunda = fetcher.fetch('players')
+        assert segunda.not_modified
+        assert segunda.body == primera.body and segunda.etag == primera.etag
+    finally:
+        fetcher.close()
+
+
+def test_304_solo_con_if_modified_since(servidor):
+    primera = WorldFetcher(base_url=servidor)
+    try:
+        resultado = primera.fetch('towns')
+    finally:
+        primera.close()
+
+    fetcher = WorldFetcher(base_url=servidor)
+    try:
+        fetcher.remember({'towns': {'url': resultado.url, 'etag': None, 'last_modified': resultado.last_modified}})
+        assert fetcher._conditional_headers(fetcher._cached['towns'], resultado.url) == {
+            'If-Modified-Since': resultado.last_modified}
+        segunda = fetcher.fetch('towns')
+        assert segunda.status == 304
+        # Sin cuerpo en memoria: el contenido es el del snapshot ya guardado
+        assert segunda.body is None
+    finally:
+        fetcher.close()
+
+
+def test_sin_gz_descarga_el_texto_plano(dumps, tmp_path):
+    sin_gzip = str(tmp_path / 'sin_gzip')
+    shutil.copytree(dumps, sin_gzip)
+    for fichero in glob.glob(os.path.join(sin_gzip, '*.gz')):
+        os.remove(fichero)
+    server, url = serve_directory(sin_gzip)
+    fetcher = WorldFetcher(base_url=url)
+    try:
+        resultado = fetcher.fetch('alliances')
+        assert resultado.status == 200 and resultado.url == f"{url}/alliances.txt"
+        with open(os.path.join(sin_gzip, 'alliances.txt'), 'rb') as f:
+            assert resultado.body == f.read()
+        # No vuelve a pedir el .gz y la siguiente es condicional sobre el texto plano
+        assert fetcher._urls('alliances') == [f"{url}/alliances.txt"]
+        assert fetcher.fetch('alliances').status == 304
+    finally:
+        fetcher.close()
+        server.shutdown()
+
+
+def test_fetch_all_y_dump_inexistente(servidor, tmp_path):
+    fetcher = WorldFetcher(base_url=servidor)
+    try:
+        resultados = fetcher.fetch_all()
+        assert set(resultados) == set(DUMPS)
+        assert all(r.status == 200 and r.ok for r in resultados.values())
+    finally:
+        fetcher.close()
+
+    vacio = str(tmp_path / 'vacio')
+    os.makedirs(vacio)
+    server, url = serve_directory(vacio)
+    fetcher = WorldFetcher(base_url=url)
+    try:
+        resultado = fetcher.fetch('players')
+        assert resultado.status == 404 and not resultado.ok
+    finally:
+        fetcher.close()
+        server.shutdown()
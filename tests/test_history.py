@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from grepolis_intel.history import HistoryStore, growth_rates, rolling_growth
+from grepolis_intel.snapshots import RetentionPolicy
+
+INICIO = datetime(2026, 8, 3, 0, 0, tzinfo=timezone.utc)  # lunes
+IDS = [5, 3, 9]
+
+
+def _snapshot(h):
+    """Jugadores a las ``h`` horas de INICIO; el 9 desaparece a mitad"""
+    ids = IDS if h < 500 else IDS[:2]
+    return pd.DataFrame({
+        'ID': ids,
+        'Nombre': [f"j{i}" for i in ids],
+        'Puntos': [1000 * i + 10 * h for i in ids],
+        'Ranking': [i + h % 3 for i in ids],
+        'Ciudades': [1 + h // 100 for _ in ids],
+        'ID_Alianza': [7 for _ in ids],
+    })
+
+
+def _esperado(horas, politica, ahora):
+    """El historial reducido a mano: todo lo reciente, el último de cada día y el de cada semana"""
+    filas = pd.concat([_snapshot(h).assign(ts=int((INICIO + timedelta(hours=h)).timestamp())) for h in horas])
+    fecha = pd.to_datetime(filas['ts'], unit='s', utc=True)
+    corte_horas = (pd.Timestamp(ahora) - pd.Timedelta(hours=politica.keep_all_hours)).floor('D')
+    dias = (pd.Timestamp(ahora) - pd.Timedelta(days=politica.keep_daily_days)).floor('D')
+    corte_dias = dias - pd.Timedelta(days=dias.weekday())
+    semana = fecha.dt.isocalendar()
+    periodo = np.where(fecha >= corte_horas, filas['ts'].astype(str),
+                       np.where(fecha >= corte_dias, fecha.dt.strftime('d%Y%m%d'),
+                                'w' + (semana['year'] * 100 + semana['week']).astype(str)))
+    filas = filas.assign(periodo=periodo).sort_values('ts')
+    filas = filas.groupby(['ID', 'periodo']).tail(1)
+    return filas.sort_values(['ID', 'ts'])[['ts', 'ID', 'Puntos', 'Ranking', 'Ciudades', 'ID_Alianza']].reset_index(drop=True)
+
+
+def test_compactar_por_niveles_igual_que_groupby(tmp_path):
+    historial = HistoryStore(str(tmp_path))
+    politica = RetentionPolicy(keep_all_hours=48, keep_daily_days=10)
+    horas = list(range(0, 24 * 30, 5))
+    ahora = INICIO + timedelta(hours=horas[-1], minutes=30)
+    # Se añade y compacta como en la app: un snapshot cada vez, compactando por el camino
+    for h in horas:
+        historial.append('es137', 'players', _snapshot(h), INICIO + timedelta(hours=h))
+        if h % 50 == 0:
+            historial.compact('es137', 'players', politica, now=INICIO + timedelta(hours=h))
+    historial.compact('es137', 'players', politica, now=ahora)
+
+    leido = historial.read('es137', 'players')
+    esperado = _esperado(horas, politica, ahora)
+    pd.testing.assert_frame_equal(leido[esperado.columns].reset_index(drop=True), esperado, check_dtype=False)
+    assert historial.last_timestamp('es137', 'players') == INICIO + timedelta(hours=horas[-1])
+
+    # Filtros por entidad e intervalo sobre todos los niveles
+    desde = INICIO + timedelta(days=20)
+    parcial = historial.read('es137', 'players', ids=[3], start=desde)
+    referencia = esperado[(esperado['ID'] == 3) & (esperado['ts'] >= int(desde.timestamp()))]
+    assert parcial['ts'].tolist() == referencia['ts'].tolist()
+
+
+def test_ritmos_igual_que_buscar_la_base_a_mano():
+    filas = pd.concat([_snapshot(h).assign(ts=int((INICIO + timedelta(hours=h)).timestamp())) for h in range(0, 400, 7)])
+    filas = filas.sort_values(['ID', 'ts'], ignore_index=True)
+    ventana = timedelta(days=7)
+    ritmo = rolling_growth(filas, 'Puntos', ventana, id_column='ID')
+    for i, fila in filas.iterrows():
+        previas = filas[(filas['ID'] == fila['ID']) & (filas['ts'] <= fila['ts'] - ventana.total_seconds())]
+        base = previas.iloc[-1] if len(previas) else filas[filas['ID'] == fila['ID']].iloc[0]
+        dias = (fila['ts'] - base['ts']) / 86400
+        esperado = (fila['Puntos'] - base['Puntos']) / dias if dias > 0 else np.nan
+        np.testing.assert_allclose(ritmo[i], esperado)
+
+    actuales = growth_rates(filas, 'players', ventana)
+    np.testing.assert_allclose(actuales['Puntos_por_dia'], ritmo[filas.groupby('ID').tail(1).index])
+    assert actuales.index.tolist() == sorted(IDS)
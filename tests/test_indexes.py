@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from grepolis_intel.indexes import RANK_JUMPS, PlayerIndex, RankGaps, SortedPages
+
+
+def _jugadores(n=300, seed=7):
+    rnd = np.random.default_rng(seed)
+    # Puntos con empates a propósito; el ranking oficial los desempata
+    puntos = rnd.integers(0, 60, n) * 100
+    orden = np.lexsort((np.arange(n), -puntos))
+    ranking = np.empty(n, dtype=np.int64)
+    ranking[orden] = np.arange(1, n + 1)
+    players = pd.DataFrame({
+        'ID': rnd.permutation(np.arange(1000, 1000 + n)),
+        'Nombre': [f"j{i % (n - 5)}" for i in range(n)],  # algunos nombres repetidos
+        'ID_Alianza': rnd.choice([0, 11, 22, 33, 44], n),
+        'Puntos': puntos,
+        'Ranking': ranking,
+        'Estado': rnd.choice(['🟢 Activo', '🟠 Inactivo', '🔴 Offline'], n),
+    })
+    alliances = pd.DataFrame({
+        'ID_Alianza': [33, 11, 44, 22],
+        'Nombre_Alianza': ['C', 'A', 'D', 'B'],
+        'Ranking_Alianza': [3, 1, 4, 2],
+    })
+    return players, alliances
+
+
+def test_player_index_igual_que_mascaras():
+    players, alliances = _jugadores()
+    indice = PlayerIndex(players, alliances)
+
+    for alianza in (0, 11, 22, 33, 44, 99):
+        esperado = players[players['ID_Alianza'] == alianza].sort_values('Ranking').index.tolist()
+        assert indice.alliance_rows(alianza).tolist() == esperado
+
+    ids = np.r_[players['ID'].to_numpy()[::7], [1, 99999]]
+    esperado = [players.index[players['ID'] == i][0] if (players['ID'] == i).any() else -1 for i in ids]
+    assert indice.rows_by_id(ids).tolist() == esperado
+
+    for nombre in ('j0', 'j3', 'j150', 'nadie'):
+        filas = players.index[players['Nombre'] == nombre]
+        esperado = players.loc[filas].sort_values('Ranking').index[0] if len(filas) else None
+        assert indice.row_by_name(nombre) == esperado
+
+    ventana = players[players['Ranking'].between(40, 60)].sort_values('Ranking').index.tolist()
+    assert indice.rank_window(40, 60).tolist() == ventana
+    assert indice.status_counts == players['Estado'].value_counts().to_dict()
+
+    assert indice.alliance_row(22) == 3
+    assert indice.alliance_row(55) is None
+    assert indice.alliance_rows_by_id([44, 55, 11]).tolist() == [2, -1, 1]
+    assert indice.alliance_rank_window(2, 3).tolist() == [3, 0]
+
+
+def test_rank_gaps_igual_que_recorrer_la_tabla():
+    players, _ = _jugadores()
+    saltos = RankGaps(players)
+    puntos = players['Puntos'].to_numpy()
+    for salto in RANK_JUMPS:
+        necesarios = saltos.needed_for(salto)
+        objetivos = saltos.targets_for(salto)
+        for fila in range(len(players)):
+            # Los que tienen más puntos, de menos a más: el salto-ésimo es el que hay que superar
+            por_encima = players[players['Puntos'] > puntos[fila]].sort_values(['Puntos', 'Ranking'], ascending=[True, False])
+            if len(por_encima) < salto:
+                assert necesarios[fila] == -1 and objetivos[fila] == -1
+            else:
+                objetivo = por_encima.iloc[salto - 1]
+                assert necesarios[fila] == objetivo['Puntos'] - puntos[fila] + 1
+                assert players['Puntos'].iloc[objetivos[fila]] == objetivo['Puntos']
+    with pytest.raises(ValueError):
+        saltos.needed_for(7)
+
+
+def test_sorted_pages_igual_que_sort_values():
+    players, _ = _jugadores()
+    paginas = SortedPages(
+        {'Puntos': (players['Puntos'], False), 'Nombre': (players['Nombre'], True)},
+        groups=players['Estado'],
+    )
+    for orden, ascendente in (('Puntos', False), ('Nombre', True)):
+        for estado in (None, '🟢 Activo', '🔴 Offline'):
+            tabla = players if estado is None else players[players['Estado'] == estado]
+            esperado = tabla.sort_values(orden, ascending=ascendente, kind='stable').index.to_numpy()
+            assert paginas.count(orden, estado) == len(esperado)
+            assert paginas.page_count(orden, 25, estado) == max(1, -(-len(esperado) // 25))
+            filas = np.concatenate([paginas.page(orden, p, 25, estado) for p in range(paginas.page_count(orden, 25, estado))])
+            assert filas.tolist() == esperado.tolist()
+    assert len(paginas.page('Puntos', 0, 25, '👻 Fantasma')) == 0
+    with pytest.raises(ValueError):
+        paginas.page('Ciudades', 0, 25)
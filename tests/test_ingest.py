@@ -0,0 +1,53 @@
+import os
+import shutil
+
+import pytest
+
+from benchmarks.standin import serve_directory, write_fixture_dumps
+from grepolis_intel.fetch import DUMPS, WorldFetcher
+from grepolis_intel.ingest import refresh_world, refresh_worlds
+from grepolis_intel.snapshots import SnapshotStore
+
+
+@pytest.fixture(scope='module')
+def servidor(tmp_path_factory):
+    dumps = tmp_path_factory.mktemp('dumps')
+    write_fixture_dumps(str(dumps), players=300, alliances=20)
+    server, url = serve_directory(str(dumps))
+    yield url
+    server.shutdown()
+
+
+def _refrescar(url, store):
+    fetcher = WorldFetcher('es137', base_url=url)
+    try:
+        return {name: r.status for name, r in refresh_world(fetcher, store).items()}
+    finally:
+        fetcher.close()
+
+
+def test_un_fetcher_nuevo_pregunta_con_los_validadores_guardados(servidor, tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    assert set(_refrescar(servidor, store).values()) == {200}
+    assert set(store.validators('es137')) == set(DUMPS)
+    snapshots = store.timestamps('es137', 'players')
+
+    # Como una ejecución nueva de la CLI o un reinicio de la app
+    assert set(_refrescar(servidor, store).values()) == {304}
+    assert store.timestamps('es137', 'players') == snapshots
+
+
+def test_sin_snapshot_no_se_usan_los_validadores(servidor, tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    _refrescar(servidor, store)
+    shutil.rmtree(os.path.join(str(tmp_path), 'es137', 'players'))
+    estados = _refrescar(servidor, store)
+    assert estados['players'] == 200 and estados['towns'] == 304
+    assert store.latest_timestamp('es137', 'players') is not None
+
+
+def test_refresco_en_procesos_reutiliza_los_validadores(servidor, tmp_path):
+    primero = dict(refresh_worlds(['es137'], str(tmp_path), base_url=servidor, processes=1))
+    segundo = dict(refresh_worlds(['es137'], str(tmp_path), base_url=servidor, processes=1))
+    assert {status for status, _ in primero['es137'].values()} == {200}
+    assert {status for status, _ in segundo['es137'].values()} == {304}
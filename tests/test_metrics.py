@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from grepolis_intel.metrics import MILITARY_LABELS, PLAYER_METRICS, add_player_metrics, player_metric, rank_percentile
+
+
+def _jugadores():
+    return pd.DataFrame({
+        'ID': [1, 2, 3, 4],
+        'Puntos': [500, 2500, 10000, 40000],
+        'Ciudades': [0, 2, 4, 10],
+        'Ranking': [4, 3, 2, 1],
+    })
+
+
+def test_columnas_registradas_y_valores():
+    assert list(PLAYER_METRICS) == ['Categoria_Militar', 'Potencial_Militar', 'Puntos_por_Ciudad', 'Percentil']
+    jugadores = _jugadores()
+    tabla = add_player_metrics(jugadores)
+
+    assert list(tabla.columns) == list(jugadores.columns) + list(PLAYER_METRICS)
+    assert tabla['Categoria_Militar'].tolist() == [MILITARY_LABELS[i] for i in (0, 1, 3, 4)]
+    assert tabla['Potencial_Militar'].tolist() == [300, 1900, 6800, 26000]
+    assert tabla['Puntos_por_Ciudad'].tolist() == [0.0, 1250.0, 2500.0, 4000.0]
+    assert tabla['Percentil'].tolist() == [0.0, 25.0, 50.0, 75.0]
+    # La tabla original no se toca
+    assert list(jugadores.columns) == ['ID', 'Puntos', 'Ciudades', 'Ranking']
+
+
+def test_solo_las_metricas_pedidas():
+    tabla = add_player_metrics(_jugadores(), metrics=['Percentil'])
+    assert 'Percentil' in tabla and 'Categoria_Militar' not in tabla
+
+
+def test_percentil_sin_jugadores_o_sin_ranking():
+    assert len(rank_percentile(_jugadores().iloc[:0])) == 0
+    assert len(add_player_metrics(_jugadores().iloc[:0])) == 0
+    jugadores = _jugadores().astype({'Ranking': np.float64})
+    jugadores.loc[2, 'Ranking'] = np.nan
+    percentil = rank_percentile(jugadores)
+    assert np.isnan(percentil[2])
+    np.testing.assert_allclose(np.delete(percentil, 2), [0.0, 25.0, 75.0])
+
+
+def test_registrar_una_metrica_nueva():
+    @player_metric('Puntos_Dobles')
+    def puntos_dobles(players_data):
+        return players_data['Puntos'] * 2
+
+    try:
+        tabla = add_player_metrics(_jugadores())
+        # Se calcula después de las ya registradas
+        assert list(tabla.columns)[-1] == 'Puntos_Dobles'
+        assert tabla['Puntos_Dobles'].tolist() == [1000, 5000, 20000, 80000]
+    finally:
+        del PLAYER_METRICS['Puntos_Dobles']
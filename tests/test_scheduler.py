@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from grepolis_intel.fetch import DUMPS
+from grepolis_intel.scheduler import PUBLISH_MARGIN, RETRY_INTERVAL, RefreshScheduler
+from grepolis_intel.snapshots import SnapshotStore
+
+AHORA = datetime(2026, 10, 17, 13, 30, tzinfo=timezone.utc)
+HORA = timedelta(hours=1)
+
+
+def _planificador(tmp_path, versiones):
+    planificador = RefreshScheduler(SimpleNamespace(world='es137'), SnapshotStore(str(tmp_path)))
+    planificador.versions = {name: versiones.get(name) for name in DUMPS}
+    return planificador
+
+
+def test_sin_snapshots_descarga_ya(tmp_path):
+    assert _planificador(tmp_path, {}).next_refresh(AHORA) == AHORA
+
+
+def test_espera_a_la_proxima_publicacion(tmp_path):
+    publicado = datetime(2026, 10, 17, 13, 0, tzinfo=timezone.utc)
+    planificador = _planificador(tmp_path, {name: publicado for name in DUMPS})
+    assert planificador.next_refresh(AHORA) == publicado + HORA + PUBLISH_MARGIN
+
+
+def test_publicacion_atrasada_reintenta(tmp_path):
+    publicado = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+    planificador = _planificador(tmp_path, {name: publicado for name in DUMPS})
+    assert planificador.next_refresh(AHORA) == AHORA + RETRY_INTERVAL
+
+
+def test_un_dump_abandonado_no_marca_el_ritmo(tmp_path):
+    publicado = datetime(2026, 10, 17, 13, 0, tzinfo=timezone.utc)
+    versiones = {name: publicado for name in DUMPS}
+    versiones['conquers'] = publicado - 5 * HORA
+    planificador = _planificador(tmp_path, versiones)
+    assert planificador.next_refresh(AHORA) == publicado + HORA + PUBLISH_MARGIN
+
+
+def test_todos_abandonados_reintenta(tmp_path):
+    planificador = _planificador(tmp_path, {name: AHORA - 24 * HORA for name in DUMPS})
+    assert planificador.next_refresh(AHORA) == AHORA + RETRY_INTERVAL
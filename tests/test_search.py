@@ -0,0 +1,62 @@
+import numpy as np
+
+from grepolis_intel.search import NameSearchIndex, normalize
+
+NOMBRES = ['Zeus Lord', 'zeúsito', 'Ares', 'Atenea', 'Poseidón', 'Hermes', 'Hera', 'Apolo', None]
+
+
+def _nombres(filas):
+    return [NOMBRES[f] for f in filas]
+
+
+def test_normalize_quita_tildes_y_mayusculas():
+    assert normalize('ZeÚs') == 'zeus'
+    assert normalize('Poseidón') == 'poseidon'
+
+
+def test_exacto_prefijo_y_contiene():
+    indice = NameSearchIndex(NOMBRES)
+    assert _nombres(indice.exact('ARES')) == ['Ares']
+    assert _nombres(indice.prefix('her')) == ['Hermes', 'Hera']
+    assert _nombres(indice.contains('EUS')) == ['Zeus Lord', 'zeúsito']
+    assert _nombres(indice.contains('posei')) == ['Poseidón']
+
+
+def test_contiene_igual_que_recorrer_los_nombres():
+    nombres = [f"jugador{i % 37}x{i % 11}" for i in range(500)]
+    indice = NameSearchIndex(nombres)
+    for consulta in ('r3', 'dor1', 'or12x', 'x10', 'zz'):
+        esperado = [i for i, n in enumerate(nombres) if consulta in n]
+        assert sorted(indice.contains(consulta).tolist()) == esperado
+
+
+def test_aproximado_tolera_transposiciones_en_nombres_cortos():
+    indice = NameSearchIndex(NOMBRES)
+    assert set(_nombres(indice.search('zues', 'Aproximado'))) >= {'Zeus Lord', 'zeúsito'}
+    assert _nombres(indice.search('Aers', 'Aproximado'))[0] == 'Ares'
+    assert _nombres(indice.search('Hemres', 'Aproximado'))[0] == 'Hermes'
+
+
+def test_aproximado_ignora_tildes():
+    indice = NameSearchIndex(NOMBRES)
+    filas, puntuacion = indice.fuzzy('zéusito')
+    assert NOMBRES[filas[0]] == 'zeúsito'
+    assert puntuacion[0] == 1.0
+    assert _nombres(indice.fuzzy('Posiedon')[0])[0] == 'Poseidón'
+
+
+def test_aproximado_sin_parecidos():
+    indice = NameSearchIndex(NOMBRES)
+    filas, puntuacion = indice.fuzzy('qqqqqq')
+    assert len(filas) == 0 and len(puntuacion) == 0
+    assert len(NameSearchIndex([]).fuzzy('zeus')[0]) == 0
+
+
+def test_contiene_con_limite_igual_que_los_primeros_sin_limite():
+    nombres = [f"{'ka' if i % 5 else 'x'}{i % 37}ka{i % 11}" for i in range(2000)]
+    prioridad = (np.arange(2000) * 7919) % 2000  # única y sin relación con el orden de las filas
+    indice = NameSearchIndex(nombres, priority=prioridad)
+    for consulta in ('k', 'ka', 'ka1', 'a3ka', 'ka12ka', 'x5ka3', 'zz'):
+        todas = indice.contains(consulta)
+        for limite in (1, 5, 20, 500):
+            assert indice.contains(consulta, limit=limite).tolist() == todas[:limite].tolist()
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from grepolis_intel.spatial import MAP_SIZE, N_OCEANS, OCEAN_SIZE, OceanDominance, ocean_of, ocean_summary
+from grepolis_intel.worldmap import ocean_box
+
+
+def _mundo(n=500, seed=11):
+    rnd = np.random.default_rng(seed)
+    players = pd.DataFrame({'ID': np.arange(1, 31), 'ID_Alianza': rnd.choice([0, 7, 8, 9], 30)})
+    towns = pd.DataFrame({
+        'ID_Ciudad': np.arange(n),
+        'ID_Jugador': rnd.integers(0, 31, n),
+        'Coord_X': rnd.integers(0, MAP_SIZE, n),
+        'Coord_Y': rnd.integers(0, MAP_SIZE, n),
+        'Puntos_Ciudad': rnd.integers(100, 10_000, n),
+    })
+    return towns, players
+
+
+def test_numeracion_de_oceanos():
+    assert N_OCEANS == 100
+    assert ocean_of(0, 0) == 0 and ocean_of(999, 999) == N_OCEANS - 1
+    assert ocean_of(543, 210) == 52
+    assert ocean_box(52) == (500, 200, 599, 299)
+    # Una caja de 3x3 océanos en la esquina se recorta al mapa
+    assert ocean_box(0, span=3) == (0, 0, 3 * OCEAN_SIZE - 1, 3 * OCEAN_SIZE - 1)
+
+
+def test_resumen_y_dominio_igual_que_groupby():
+    towns, players = _mundo()
+    oceano = ocean_of(towns['Coord_X'], towns['Coord_Y'])
+    alianza = towns['ID_Jugador'].map(players.set_index('ID')['ID_Alianza']).fillna(0).astype(int)
+    por_oceano = towns.groupby(oceano)
+
+    resumen = ocean_summary(towns).reindex(range(N_OCEANS), fill_value=0)
+    esperado = por_oceano.size().reindex(range(N_OCEANS), fill_value=0)
+    assert resumen['Ciudades'].tolist() == esperado.tolist()
+    assert resumen['Puntos'].tolist() == por_oceano['Puntos_Ciudad'].sum().reindex(range(N_OCEANS), fill_value=0).tolist()
+
+    dominio = OceanDominance(towns, players)
+    assert dominio.towns.shape == (3, N_OCEANS)
+    np.testing.assert_array_equal(dominio.ocean_towns, esperado.to_numpy())
+    puntos = towns.groupby([alianza, oceano])['Puntos_Ciudad'].sum()
+    for i, id_alianza in enumerate(dominio.alliances):
+        np.testing.assert_array_equal(
+            dominio.points[i], puntos.loc[id_alianza].reindex(range(N_OCEANS), fill_value=0).to_numpy())
+    assert (dominio.share.sum(axis=0) <= 1 + 1e-9).all()
+    assert dominio.matrix([8, 12345]).shape == (2, N_OCEANS)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from grepolis_intel.spatial import TownGrid
+from grepolis_intel.targets import candidate_mask, find_targets
+
+
+def _mundo():
+    players = pd.DataFrame({
+        'ID': [1, 2, 3],
+        'Nombre': ['Solitario', 'Vecino', 'Lejano'],
+        'ID_Alianza': [0, 0, 7],
+        'Estado': ['🟢 Activo', '🟠 Inactivo', '🟢 Activo'],
+    })
+    towns = pd.DataFrame({
+        'ID_Ciudad': [10, 11, 20, 30, 40],
+        'ID_Jugador': [1, 1, 2, 3, 0],
+        'Nombre_Ciudad': ['Propia A', 'Propia B', 'Vecina', 'Lejana', 'Fantasma'],
+        'Coord_X': [100, 101, 103, 150, 104],
+        'Coord_Y': [100, 100, 100, 150, 100],
+        'Puntos_Ciudad': [500, 300, 200, 900, 100],
+    })
+    return towns, players
+
+
+def test_sin_alianza_no_devuelve_ciudades_propias():
+    towns, players = _mundo()
+    mascara = candidate_mask(towns, players, "Puntos", max_points=1000, exclude_alliance=0)
+    resultado = find_targets(TownGrid(towns), players, [1], mascara, k=10)
+    assert not resultado['ID_Jugador'].isin([1]).any()
+    assert set(resultado['ID_Ciudad']) == {20, 30, 40}
+    assert (resultado['Distancia'] > 0).all()
+
+
+def test_objetivos_por_distancia_desde_la_ciudad_propia_mas_cercana():
+    towns, players = _mundo()
+    mascara = candidate_mask(towns, players, "Puntos", max_points=1000)
+    resultado = find_targets(TownGrid(towns), players, 1, mascara, k=2)
+    assert list(resultado['ID_Ciudad']) == [20, 40]
+    assert list(resultado['Ciudad_Origen']) == ['Propia B', 'Propia B']
+    np.testing.assert_allclose(resultado['Distancia'], [2.0, 3.0])
+
+
+def test_modo_inactivas():
+    towns, players = _mundo()
+    mascara = candidate_mask(towns, players, "Inactivas")
+    assert list(towns['ID_Ciudad'][mascara]) == [20]